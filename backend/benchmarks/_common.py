@@ -0,0 +1,37 @@
+"""ベンチマーク共通ユーティリティ"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# src/ をインポートパスに追加（uvicorn --app-dir src と同じ構成）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("MOCK_MODE", "true")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def future_move_date(days: int = 60) -> datetime:
+    """未来の引越し日を返す"""
+    return datetime.utcnow() + timedelta(days=days)
+
+
+class Timer:
+    """経過時間計測用コンテキストマネージャ"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
+
+
+def report(title: str, rows: list[tuple[str, str]]) -> None:
+    """結果を表形式で出力"""
+    print(f"\n== {title} ==")
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
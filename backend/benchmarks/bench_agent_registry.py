@@ -0,0 +1,66 @@
+"""
+エージェントレジストリのベンチマーク（モックモード）
+
+リクエストごとに Root Agent を生成する従来方式と、lifespan で生成した
+レジストリを共有する方式で requests/sec を比較します。
+
+    python benchmarks/bench_agent_registry.py [リクエスト数]
+"""
+
+import asyncio
+import sys
+
+import _common  # noqa: F401
+import httpx
+from _common import Timer, future_move_date, report
+
+from agents.mock_root_agent import MockRootAgent
+from agents.registry import AgentRegistry
+from api.dependencies import get_root_agent
+from main import app
+
+
+async def _run(client: httpx.AsyncClient, session_id: str, n: int) -> float:
+    with Timer() as t:
+        for _ in range(n):
+            r = await client.get(f"/api/v1/sessions/{session_id}/interview")
+            r.raise_for_status()
+    return n / t.elapsed
+
+
+async def main(n: int) -> None:
+    app.state.agent_registry = AgentRegistry.create()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post(
+            "/api/v1/sessions",
+            json={
+                "moveFrom": {"prefecture": "東京都", "city": "渋谷区"},
+                "moveTo": {"prefecture": "神奈川県", "city": "横浜市"},
+                "moveDate": future_move_date().isoformat(),
+            },
+        )
+        session_id = r.json()["data"]["sessionId"]
+
+        # 従来方式: リクエストごとに生成
+        app.dependency_overrides[get_root_agent] = lambda: MockRootAgent()
+        await _run(client, session_id, 50)
+        before = await _run(client, session_id, n)
+        app.dependency_overrides.clear()
+
+        # レジストリ共有方式
+        await _run(client, session_id, 50)
+        after = await _run(client, session_id, n)
+
+    report(
+        f"GET /interview x {n}",
+        [
+            ("per-request RootAgent", f"{before:,.0f} req/s"),
+            ("shared AgentRegistry", f"{after:,.0f} req/s"),
+            ("speedup", f"{after / before:.2f}x"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,123 @@
+"""
+開庁日カレンダーのベンチマーク
+
+祝日の集合を引きながら1日ずつ進める素朴な実装と、utils.business_calendar の
+年ごとの表（ビット列・累積数）を比較します。
+
+- 翌開庁日 / 2日間の開庁日数（ランダムな日付 10,000 件）
+- セッション1件分（30 件）の期限計算: calculate_deadline を1件ずつ vs calculate_deadlines
+
+    python benchmarks/bench_business_calendar.py [問い合わせ数]
+"""
+
+import random
+import sys
+from datetime import date, timedelta
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from models.domain import DeadlineType
+from utils import business_calendar
+from utils.business_calendar import (
+    business_days_between,
+    japanese_holidays,
+    next_business_day,
+)
+from utils.date_utils import calculate_deadline, calculate_deadlines
+
+_holidays: dict[int, set] = {}
+
+
+def naive_is_business_day(day: date) -> bool:
+    """曜日・年末年始・祝日の集合を1日ごとに調べる"""
+    if day.year not in _holidays:
+        _holidays[day.year] = set(japanese_holidays(day.year))
+    closed = (day.month == 12 and day.day >= 29) or (day.month == 1 and day.day <= 3)
+    return day.weekday() < 5 and not closed and day not in _holidays[day.year]
+
+
+def naive_next_business_day(day: date) -> date:
+    while not naive_is_business_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def naive_business_days_between(start: date, end: date) -> int:
+    return sum(naive_is_business_day(start + timedelta(days=i)) for i in range((end - start).days))
+
+
+def _ms(fn, *args) -> str:
+    with Timer() as t:
+        fn(*args)
+    return f"{t.elapsed * 1000:,.1f} ms"
+
+
+def main(n: int) -> None:
+    rng = random.Random(0)
+    today = date.today()
+    days = [today + timedelta(days=rng.randrange(730)) for _ in range(n)]
+    spans = [(d, d + timedelta(days=rng.randrange(120))) for d in days]
+
+    business_calendar._year_table.cache_clear()
+    with Timer() as t:
+        for year in range(today.year, today.year + 3):
+            business_calendar._year_table(year)
+    build = t.elapsed
+
+    expected = [naive_next_business_day(d) for d in days[:1000]]
+    assert [next_business_day(d) for d in days[:1000]] == expected
+    assert [business_days_between(*s) for s in spans[:200]] == [
+        naive_business_days_between(*s) for s in spans[:200]
+    ]
+
+    report(
+        f"Business day queries ({n:,} random dates)",
+        [
+            ("build tables (3 years)", f"{build * 1000:,.1f} ms"),
+            ("next business day (naive)", _ms(lambda: [naive_next_business_day(d) for d in days])),
+            ("next business day (table)", _ms(lambda: [next_business_day(d) for d in days])),
+            (
+                "next business day (batch)",
+                _ms(business_calendar.next_business_days, days),
+            ),
+            (
+                "business days between (naive)",
+                _ms(lambda: [naive_business_days_between(*s) for s in spans]),
+            ),
+            (
+                "business days between (table)",
+                _ms(lambda: [business_days_between(*s) for s in spans]),
+            ),
+        ],
+    )
+
+    move_date = future_move_date()
+    session = [
+        (rng.choice(list(DeadlineType)), rng.choice([7, 14, 15, 30])) for _ in range(30)
+    ]
+    assert [calculate_deadline(move_date, *d) for d in session] == calculate_deadlines(
+        move_date, session
+    )
+    rounds = 1000
+    report(
+        f"Session deadlines (30 procedures x {rounds:,} sessions)",
+        [
+            (
+                "calculate_deadline per procedure",
+                _ms(
+                    lambda: [
+                        calculate_deadline(move_date, *d) for _ in range(rounds) for d in session
+                    ]
+                ),
+            ),
+            (
+                "calculate_deadlines per session",
+                _ms(lambda: [calculate_deadlines(move_date, session) for _ in range(rounds)]),
+            ),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,160 @@
+"""
+依存関係グラフのベンチマーク
+
+家庭の引越し（1,000 件）と企業の拠点移転（10,000 件）を想定した手続き数で、
+従来の再帰による循環検出・キューの先頭取り出しと全件走査によるトポロジカルソートと、
+services.dependency_graph（ID 索引の隣接リストと Kahn のアルゴリズム）を比較します。
+
+    python benchmarks/bench_dependency_graph.py [手続き数 ...]
+"""
+
+import random
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, report
+
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    ProcedureCategory,
+    ProcedurePriority,
+    ProcedureSummary,
+)
+from services.dependency_graph import _analyze, analyze_dependencies, topological_order
+
+LEGACY_MAX = 10000
+
+
+def _procedure(i: int, deps: list[str]) -> ProcedureSummary:
+    return ProcedureSummary(
+        id=f"p{i}",
+        title=f"手続き{i}",
+        category=ProcedureCategory.ADMINISTRATIVE,
+        priority=ProcedurePriority.MEDIUM,
+        deadline=Deadline(type=DeadlineType.AFTER_MOVE, description=""),
+        estimated_duration=30,
+        dependencies=deps,
+    )
+
+
+def _procedures(n: int, seed: int = 0) -> list[ProcedureSummary]:
+    """各手続きが前方の手続きに 0〜3 件依存する DAG（10件ごとに直前の手続きへ依存）"""
+    rng = random.Random(seed)
+    procedures = []
+    for i in range(n):
+        if i % 10 == 0 and i:
+            deps = [f"p{i - 1}"]
+        else:
+            deps = [f"p{rng.randrange(i)}" for _ in range(rng.randint(0, 3))] if i else []
+        procedures.append(_procedure(i, deps))
+    rng.shuffle(procedures)
+    return procedures
+
+
+def _chain(n: int) -> list[ProcedureSummary]:
+    """1本の長い依存の連鎖（後ろの手続きから並べる）"""
+    return [_procedure(i, [f"p{i - 1}"] if i else []) for i in reversed(range(n))]
+
+
+def legacy_validate(procedures) -> bool:
+    """従来の FirestoreService.validate_dependencies"""
+    procedure_ids = {p.id for p in procedures}
+    visited = set()
+    rec_stack = set()
+
+    def has_cycle(proc_id: str) -> bool:
+        visited.add(proc_id)
+        rec_stack.add(proc_id)
+        proc = next((p for p in procedures if p.id == proc_id), None)
+        if proc:
+            for dep_id in proc.dependencies:
+                if dep_id not in procedure_ids:
+                    continue
+                if dep_id not in visited:
+                    if has_cycle(dep_id):
+                        return True
+                elif dep_id in rec_stack:
+                    return True
+        rec_stack.remove(proc_id)
+        return False
+
+    for procedure in procedures:
+        if procedure.id not in visited:
+            if has_cycle(procedure.id):
+                return False
+    return True
+
+
+def legacy_topological_sort(procedures):
+    """従来の ScheduleAgent._topological_sort"""
+    proc_map = {p.id: p for p in procedures}
+    in_degree = {p.id: 0 for p in procedures}
+    for proc in procedures:
+        for dep_id in proc.dependencies:
+            if dep_id in in_degree:
+                in_degree[proc.id] += 1
+    queue = [p.id for p in procedures if in_degree[p.id] == 0]
+    sorted_procedures = []
+    while queue:
+        proc_id = queue.pop(0)
+        sorted_procedures.append(proc_map[proc_id])
+        for proc in procedures:
+            if proc_id in proc.dependencies:
+                in_degree[proc.id] -= 1
+                if in_degree[proc.id] == 0:
+                    queue.append(proc.id)
+    if len(sorted_procedures) != len(procedures):
+        return procedures
+    return sorted_procedures
+
+
+def _ms(fn, *args, repeat: int = 1, setup=None) -> str:
+    """最良値（ミリ秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        try:
+            with Timer() as t:
+                fn(*args)
+        except RecursionError:
+            return "RecursionError"
+        best = min(best, t.elapsed)
+    return f"{best * 1000:,.1f} ms"
+
+
+def main(sizes: list[int]) -> None:
+    for n in sizes:
+        procedures = _procedures(n)
+        rows = []
+        if n <= LEGACY_MAX:
+            rows.append(("validate (legacy recursive)", _ms(legacy_validate, procedures)))
+            rows.append(("topological sort (legacy)", _ms(legacy_topological_sort, procedures)))
+
+        rows.append(
+            (
+                "validate (Kahn, cold)",
+                _ms(analyze_dependencies, procedures, repeat=5, setup=_analyze.cache_clear),
+            )
+        )
+        rows.append(("validate (Kahn, cached)", _ms(analyze_dependencies, procedures, repeat=5)))
+        rows.append(
+            ("topological sort (Kahn, cached)", _ms(topological_order, procedures, repeat=5))
+        )
+
+        # 循環を1つ入れて、該当する手続き ID を報告できることを確認
+        cyclic = [p.model_copy(deep=True) for p in procedures]
+        by_id = {p.id: p for p in cyclic}
+        dependent = next(p for p in cyclic if "p0" in p.dependencies)
+        by_id["p0"].dependencies = [dependent.id]
+        graph = analyze_dependencies(cyclic)
+        rows.append(("cycle found", f"{len(graph.cycle)} procedures ({graph.cycle[0]} ...)"))
+        chain = _chain(n)
+        rows.append(("validate chain of n (legacy recursive)", _ms(legacy_validate, chain)))
+        rows.append(("validate chain of n (Kahn, cold)", _ms(analyze_dependencies, chain)))
+        report(f"Dependency graph with {n:,} procedures", rows)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
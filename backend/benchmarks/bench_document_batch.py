@@ -0,0 +1,121 @@
+"""
+Document Agent の一括生成ベンチマーク
+
+1セッション分の手続き（モック約20件）の書類・手順を、手続きごとの呼び出しと
+K 件ずつの一括呼び出しで取得し、トークン数・所要時間・コストを比較します。
+Vertex AI はトークン数に比例したレイテンシを持つ疑似クライアントで置き換えます。
+
+    python benchmarks/bench_document_batch.py
+"""
+
+import asyncio
+import json
+import re
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from agents.document_agent import DocumentAgent
+from agents.mock_root_agent import MockRootAgent
+from models.domain import Location, Session
+from services.single_flight import SingleFlight
+from utils.tokens import estimate_tokens
+
+# Gemini 2.0 Flash の料金（USD / 100万トークン）
+INPUT_PRICE = 0.10
+OUTPUT_PRICE = 0.40
+
+# 疑似レイテンシ: 呼び出しごとの固定オーバーヘッド + 出力トークンあたりの生成時間
+BASE_LATENCY = 0.4
+SECONDS_PER_OUTPUT_TOKEN = 0.002
+
+DETAIL = {
+    "documents": [
+        {"name": "本人確認書類", "description": "運転免許証、マイナンバーカード等",
+         "required": True, "obtainMethod": "既に所持"},
+        {"name": "印鑑", "description": "認印可", "required": False, "obtainMethod": None},
+        {"name": "転出証明書", "description": "前住所の市区町村で発行", "required": True,
+         "obtainMethod": "転出届提出時に発行"},
+    ],
+    "steps": [
+        {"order": 1, "description": "必要書類を準備する", "estimatedDuration": 10},
+        {"order": 2, "description": "窓口で申請書を記入・提出する", "estimatedDuration": 15},
+        {"order": 3, "description": "控えを受け取る", "estimatedDuration": 5},
+    ],
+    "notes": ["平日のみ受付", "混雑する月曜・金曜は避けることをおすすめします"],
+}
+
+
+class FakeVertexAI:
+    """プロンプト内の id 一覧に応じた JSON を返す疑似 Vertex AI クライアント"""
+
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def generate_text(self, prompt, temperature=0.7, max_tokens=2048, use_cache=True):
+        ids = re.findall(r"- id: (p\d+)", prompt)
+        if ids:
+            body = {"procedures": [{"id": i, **DETAIL} for i in ids]}
+        else:
+            body = DETAIL
+        text = json.dumps(body, ensure_ascii=False)
+
+        self.calls += 1
+        self.input_tokens += estimate_tokens(prompt)
+        self.output_tokens += estimate_tokens(text)
+        await asyncio.sleep(BASE_LATENCY + estimate_tokens(text) * SECONDS_PER_OUTPUT_TOKEN)
+        return text
+
+
+async def _session_procedures():
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=future_move_date(),
+    )
+    return session, await MockRootAgent().generate_procedures(session)
+
+
+async def run(batched: bool) -> tuple[FakeVertexAI, float, int, int]:
+    session, procedures = await _session_procedures()
+    vertex_ai = FakeVertexAI()
+    agent = DocumentAgent(vertex_ai, SingleFlight())
+
+    with Timer() as t:
+        if batched:
+            await agent.get_procedure_details_batch(session, procedures)
+        else:
+            await asyncio.gather(*(agent.get_procedure_details(session, p) for p in procedures))
+
+    assert all(p.documents for p in procedures)
+    return vertex_ai, t.elapsed, agent.batch_size(), len(procedures)
+
+
+def row(vertex_ai: FakeVertexAI, elapsed: float) -> str:
+    cost = (vertex_ai.input_tokens * INPUT_PRICE + vertex_ai.output_tokens * OUTPUT_PRICE) / 1e6
+    return (
+        f"calls {vertex_ai.calls:3d}  in {vertex_ai.input_tokens:6d} tok  "
+        f"out {vertex_ai.output_tokens:6d} tok  {elapsed:5.2f} s  ${cost * 1000:.3f}/1k sessions"
+    )
+
+
+async def main() -> None:
+    single, single_elapsed, _, n = await run(batched=False)
+    batch, batch_elapsed, k, _ = await run(batched=True)
+
+    report(
+        f"Document details for one session ({n} procedures)",
+        [
+            ("per-procedure", row(single, single_elapsed)),
+            ("batched", row(batch, batch_elapsed)),
+            ("adapted K", str(k)),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
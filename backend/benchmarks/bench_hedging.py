@@ -0,0 +1,82 @@
+"""
+ヘッジリクエストの効果測定
+
+レイテンシにロングテール（一部の呼び出しだけ極端に遅い）を持つ疑似 Vertex AI に対し、
+ヘッジなし / ありで Document Agent の生成レイテンシの p50 / p95 / p99 とヘッジ率を比較します。
+
+    python benchmarks/bench_hedging.py [リクエスト数]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+import _common  # noqa: F401
+from _common import report
+
+from agents.document_agent import DocumentAgent
+from core.config import settings
+from core.metrics import metrics
+from services.single_flight import SingleFlight
+
+CONCURRENCY = 20
+
+
+class TailLatencyVertexAI:
+    """95% は 50〜100ms、5% は 1.5s で応答する疑似 Vertex AI クライアント"""
+
+    model_name = "fake-model"
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def generate_text(self, prompt, temperature=0.7, max_tokens=2048, use_cache=True):
+        self.calls += 1
+        slow = self.random.random() < 0.05
+        await asyncio.sleep(1.5 if slow else self.random.uniform(0.05, 0.1))
+        return '{"documents": [], "steps": [], "notes": []}'
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[int((len(samples) - 1) * q)]
+
+
+async def _run(n: int, hedge: bool) -> tuple[list[float], int, float]:
+    settings.LLM_HEDGE_ENABLED = hedge
+    metrics.reset()
+    vertex_ai = TailLatencyVertexAI(seed=42)
+    agent = DocumentAgent(vertex_ai, SingleFlight())
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.generate(f"手続き {i} の必要書類")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(request(i) for i in range(n)))
+    hedge_rate = metrics.get("llm_DocumentAgent_hedged_total") / n
+    return latencies, vertex_ai.calls, hedge_rate
+
+
+async def main(n: int) -> None:
+    before, calls_before, _ = await _run(n, hedge=False)
+    after, calls_after, hedge_rate = await _run(n, hedge=True)
+
+    rows = []
+    for label, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        b, a = _percentile(before, q), _percentile(after, q)
+        rows.append((f"{label} (no hedge -> hedge)", f"{b * 1000:.0f} ms -> {a * 1000:.0f} ms"))
+    rows += [
+        ("hedge rate", f"{hedge_rate:.1%}"),
+        ("upstream calls (no hedge -> hedge)", f"{calls_before} -> {calls_after}"),
+    ]
+    report(f"{n} DocumentAgent generations with a 5% / 1.5s latency tail", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
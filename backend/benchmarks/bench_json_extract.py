@@ -0,0 +1,131 @@
+"""
+JSON 抽出エンジンのファズ / ベンチマーク
+
+モックの手続きリストや書類情報から「それらしい」LLM 出力を組み立て、
+コードフェンス、前後の説明文、文字列中の括弧、途中打ち切りなどの
+変異を加えたコーパスで、従来の find/rfind 方式と比較します。
+
+    python benchmarks/bench_json_extract.py [コーパス件数]
+"""
+
+import asyncio
+import json
+import random
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from agents.mock_root_agent import MockRootAgent
+from models.domain import Location, Session
+from utils.json_extract import ExtractStatus, extract_json
+
+PREFIXES = [
+    "",
+    "以下が手続きリストです。\n",
+    "承知しました。{条件} を考慮して作成しました:\n\n",
+    "Here is the JSON [as requested]:\n",
+]
+SUFFIXES = [
+    "",
+    "\n",
+    "\n\n※ 自治体によって異なる場合があります。",
+    "\n詳細は {市区町村} の窓口にご確認ください。",
+]
+
+
+def legacy_parse(response: str):
+    """従来の BaseAgent.parse_json_response と同じ抽出"""
+    try:
+        start = response.find("{")
+        end = response.rfind("}") + 1
+        if start == -1 or end == 0:
+            start = response.find("[")
+            end = response.rfind("]") + 1
+        return json.loads(response[start:end])
+    except json.JSONDecodeError:
+        return None
+
+
+async def _seed_payloads() -> list:
+    agent = MockRootAgent()
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=future_move_date(),
+    )
+    procedures = await agent.generate_procedures(session)
+    procedure_list = [
+        p.model_dump(
+            by_alias=True,
+            mode="json",
+            include={"title", "category", "priority", "deadline", "estimated_duration"},
+        )
+        for p in procedures
+    ]
+    detail = await agent.get_procedure_detail(session, procedures[4])
+    document_payload = detail.model_dump(
+        by_alias=True, mode="json", include={"documents", "steps", "notes"}
+    )
+    document_payload["notes"].append("窓口は {平日} のみ [要予約]")
+    return [procedure_list, document_payload, detail.office.model_dump(by_alias=True)]
+
+
+def build_corpus(payloads: list, n: int, rng: random.Random) -> list[tuple[str, object, bool]]:
+    """(出力テキスト, 期待値, 打ち切りか) のリストを生成"""
+    corpus = []
+    for _ in range(n):
+        payload = rng.choice(payloads)
+        body = json.dumps(payload, ensure_ascii=False, indent=rng.choice([None, 2]))
+        truncated = isinstance(payload, list) and rng.random() < 0.15
+        if truncated:
+            body = body[: rng.randint(len(body) // 3, len(body) - 2)]
+        if rng.random() < 0.5:
+            body = f"```json\n{body}\n```" if not truncated else f"```json\n{body}"
+        text = rng.choice(PREFIXES) + body + ("" if truncated else rng.choice(SUFFIXES))
+        corpus.append((text, payload, truncated))
+    return corpus
+
+
+def score(parse, corpus) -> tuple[int, int, float]:
+    exact = partial = 0
+    with Timer() as t:
+        for text, expected, truncated in corpus:
+            value = parse(text)
+            if value == expected:
+                exact += 1
+            elif truncated and isinstance(value, list) and value:
+                partial += value == expected[: len(value)]
+    return exact, partial, t.elapsed
+
+
+async def main(n: int) -> None:
+    rng = random.Random(20260101)
+    corpus = build_corpus(await _seed_payloads(), n, rng)
+    truncated = sum(1 for _, _, t in corpus if t)
+
+    legacy = score(legacy_parse, corpus)
+    engine = score(lambda text: extract_json(text)[0], corpus)
+    statuses = [extract_json(text)[1] for text, _, _ in corpus]
+
+    def row(result):
+        exact, partial, elapsed = result
+        return (
+            f"exact {exact / n:6.1%}  recovered {partial:4d}  "
+            f"{elapsed / n * 1e6:7.1f} us/parse"
+        )
+
+    report(
+        f"JSON extraction over {n} outputs ({truncated} truncated)",
+        [
+            ("find/rfind", row(legacy)),
+            ("extract_json", row(engine)),
+            ("status ok", f"{statuses.count(ExtractStatus.OK)}"),
+            ("status recovered", f"{statuses.count(ExtractStatus.RECOVERED)}"),
+            ("status failed", f"{statuses.count(ExtractStatus.FAILED)}"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
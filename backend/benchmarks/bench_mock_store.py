@@ -0,0 +1,121 @@
+"""
+インメモリストアのマイクロベンチマーク
+
+詳細情報まで埋まった手続きを保存したセッションに対し、
+JSON 辞書で保持して読み込みごとに再検証する方式（従来）と、
+検証済みモデルを保持する InMemoryFirestoreService の読み込み速度を比較します。
+あわせて完了状態の同時更新で進捗集計が崩れないことを確認します。
+
+    python benchmarks/bench_mock_store.py [手続き数]
+"""
+
+import asyncio
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Document,
+    Location,
+    Office,
+    Procedure,
+    ProcedureCategory,
+    ProcedurePriority,
+    Session,
+    Step,
+)
+from services.mock_firestore_service import InMemoryFirestoreService
+
+ROUNDS = 2000
+
+
+def _procedure(i: int) -> Procedure:
+    return Procedure(
+        title=f"手続き{i}",
+        category=ProcedureCategory.ADMINISTRATIVE if i % 2 else ProcedureCategory.PRIVATE,
+        priority=ProcedurePriority.HIGH,
+        deadline=Deadline(
+            type=DeadlineType.AFTER_MOVE,
+            days_after=14,
+            absolute_date=future_move_date(60 + i % 30),
+            description="引越し後14日以内",
+        ),
+        estimated_duration=30,
+        documents=[Document(name=f"書類{j}", description="説明" * 10) for j in range(4)],
+        steps=[Step(order=j + 1, description="手順" * 20) for j in range(5)],
+        notes=["注意事項" * 10] * 3,
+        office=Office(name="横浜市役所", address="神奈川県横浜市", phone="045", hours="平日"),
+    )
+
+
+class RevalidatingStore:
+    """JSON 辞書で保持し、読み込みごとに Procedure を検証する従来方式"""
+
+    def __init__(self, procedures: list[Procedure]):
+        self._procedures = {p.id: p.model_dump(by_alias=True, mode="json") for p in procedures}
+
+    async def get_all_procedures(self, session_id: str) -> list[Procedure]:
+        return [Procedure(**data) for data in self._procedures.values()]
+
+
+async def _read_rate(store, session_id: str) -> float:
+    with Timer() as t:
+        for _ in range(ROUNDS):
+            await store.get_all_procedures(session_id)
+    return ROUNDS / t.elapsed
+
+
+async def main(n: int) -> None:
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=future_move_date(),
+    )
+    procedures = [_procedure(i) for i in range(n)]
+
+    store = InMemoryFirestoreService()
+    await store.save_session(session)
+    await store.save_procedures_batch(session.session_id, procedures)
+
+    before = await _read_rate(RevalidatingStore(procedures), session.session_id)
+    after = await _read_rate(store, session.session_id)
+
+    with Timer() as t:
+        for _ in range(ROUNDS):
+            await store.query_procedure_summaries(
+                session.session_id, category=ProcedureCategory.ADMINISTRATIVE.value, limit=10
+            )
+    query_rate = ROUNDS / t.elapsed
+
+    # 全手続きを同時に完了 → 半分を同時に未完了へ
+    ids = [p.id for p in procedures]
+    await asyncio.gather(
+        *(store.set_procedure_completion(session.session_id, pid, True, None) for pid in ids)
+    )
+    await asyncio.gather(
+        *(
+            store.set_procedure_completion(session.session_id, pid, False, None)
+            for pid in ids[: n // 2]
+        )
+    )
+    progress = (await store.get_session(session.session_id)).progress
+    actual = sum(p.is_completed for p in await store.get_all_procedures(session.session_id))
+
+    report(
+        f"In-memory store with {n} fully detailed procedures",
+        [
+            ("get_all_procedures (revalidate on read)", f"{before:,.0f} ops/s"),
+            ("get_all_procedures (validated models)", f"{after:,.0f} ops/s"),
+            ("speedup", f"{after / before:.1f}x"),
+            ("filtered page of 10 (bitset index)", f"{query_rate:,.0f} ops/s"),
+            ("progress after concurrent toggles", f"{progress.completed}/{progress.total}"),
+            ("completed procedures in store", f"{actual}/{n}"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 30))
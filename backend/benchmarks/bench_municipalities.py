@@ -0,0 +1,96 @@
+"""
+市区町村の正規化のベンチマーク
+
+同梱のコード表の各市区町村について表記ゆれ（正式名・都道府県付き・語幹・空白入り・
+番地付き）の入力を作り、所在地をキーにするキャッシュのキー数（= LLM 呼び出し・
+カタログ参照の種類）が正規化でどれだけ減るかと、解決の速さを比較します。
+
+- 解決: 全件を走査して前方一致を探す素朴な実装 vs トライ木
+- 正規化した Location はコードごとに同じインスタンスを共有する
+
+    python benchmarks/bench_municipalities.py
+"""
+
+import _common  # noqa: F401
+from _common import Timer, report
+
+from models.domain import Location
+from services.municipalities import MunicipalityIndex, normalize_text
+from services.office_directory import OfficeKind, office_key
+
+ROUNDS = 20
+
+
+def variants(prefecture: str, city: str) -> list[Location]:
+    """1つの市区町村の表記ゆれ"""
+    short_prefecture = prefecture if prefecture == "北海道" else prefecture[:-1]
+    stem = city[:-1] if len(city) > 2 else city
+    return [
+        Location(prefecture=prefecture, city=city),
+        Location(prefecture=prefecture, city=f"{prefecture}{city}"),
+        Location(prefecture=short_prefecture, city=stem),
+        Location(prefecture=f"{prefecture}　", city=f" {city}"),
+        Location(prefecture=prefecture, city=f"{city}本町１－２－３"),
+    ]
+
+
+def naive_resolve(index: MunicipalityIndex, prefecture: str, city: str):
+    """全件走査（都道府県名を除き、正式名または語幹の最長一致）"""
+    prefecture = normalize_text(prefecture)
+    city = normalize_text(city)
+    best, best_length = set(), 0
+    for code, name in index.municipalities.items():
+        pref_name = index.prefectures[code[:2]]
+        if prefecture and not pref_name.startswith(prefecture):
+            continue
+        text = city.removeprefix(pref_name)
+        for candidate in (name, name[:-1] if len(name) > 2 else name):
+            if text.startswith(candidate) and len(candidate) >= best_length:
+                if len(candidate) > best_length:
+                    best, best_length = set(), len(candidate)
+                best.add(code)
+    return next(iter(best)) if len(best) == 1 else None
+
+
+def main() -> None:
+    index = MunicipalityIndex.load()
+    inputs = [
+        location
+        for code in index.municipalities
+        for location in variants(index.prefectures[code[:2]], index.municipalities[code])
+    ]
+
+    raw_keys = {office_key(location, OfficeKind.CITY_HALL) for location in inputs}
+    normalized = [index.normalize(location) for location in inputs]
+    normalized_keys = {office_key(location, OfficeKind.CITY_HALL) for location in normalized}
+    resolved = sum(location.code is not None for location in normalized)
+    shared = len({id(location) for location in normalized if location.code})
+
+    with Timer() as naive:
+        for _ in range(ROUNDS):
+            for location in inputs:
+                naive_resolve(index, location.prefecture, location.city)
+    with Timer() as trie:
+        for _ in range(ROUNDS):
+            for location in inputs:
+                index.resolve(location.prefecture, location.city)
+    queries = ROUNDS * len(inputs)
+
+    report(
+        f"Municipality normalization ({len(index.municipalities)} municipalities, "
+        f"{len(inputs)} inputs)",
+        [
+            ("resolved", f"{resolved}/{len(inputs)}"),
+            ("distinct office keys (raw)", f"{len(raw_keys)}"),
+            ("distinct office keys (normalized)", f"{len(normalized_keys)}"),
+            ("key hit rate after first lookup", f"{1 - len(normalized_keys) / len(inputs):.0%}"
+             f" (raw {1 - len(raw_keys) / len(inputs):.0%})"),
+            ("Location instances", f"{shared} shared by {resolved} inputs"),
+            ("resolve (linear scan)", f"{naive.elapsed / queries * 1e6:,.1f} us/query"),
+            ("resolve (trie)", f"{trie.elapsed / queries * 1e6:,.1f} us/query"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+窓口の受付時間データのベンチマーク
+
+同梱の data/office_hours.json について、読み込み時間・共有される受付時間の数と、
+「その時刻に開いているか」の問い合わせを、JSON の値を毎回解釈する素朴な実装と比較します。
+
+    python benchmarks/bench_office_hours.py [問い合わせ数]
+"""
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+import _common  # noqa: F401
+from _common import Timer, report
+
+from models.domain import Location
+from services.office_directory import OfficeKind
+from services.office_hours import BUNDLED_OFFICE_HOURS_PATH, WEEKDAYS, OfficeHours
+from utils.business_calendar import is_holiday
+
+
+def naive_is_open_at(data: dict, location: Location, kind: str, moment: datetime) -> bool:
+    """市区町村を名前で探し、受付時間の文字列をその場で解釈する"""
+    name = f"{location.prefecture}{location.city}"
+    entry = None
+    for municipality in data["municipalities"].values():
+        if f"{municipality['prefecture']}{municipality['city']}" == name:
+            entry = municipality["offices"].get(kind)
+            break
+    entry = entry or data["defaults"][kind]
+    if is_holiday(moment.date()):
+        return False
+
+    hhmm = moment.strftime("%H:%M")
+    hours = []
+    for key, values in entry.get("weekly", {}).items():
+        first, _, last = key.partition("-")
+        days = WEEKDAYS[WEEKDAYS.index(first) : WEEKDAYS.index(last or first) + 1]
+        if WEEKDAYS[moment.weekday()] in days:
+            hours = values
+    for rule in entry.get("monthly", []):
+        week = (moment.day - 1) // 7 + 1
+        if rule["weekday"] == WEEKDAYS[moment.weekday()] and week in rule["weeks"]:
+            hours = hours + rule["hours"]
+    return any(start <= hhmm < end for start, end in (value.split("-") for value in hours))
+
+
+def main(n: int) -> None:
+    with Timer() as t:
+        office_hours = OfficeHours.load()
+    load = t.elapsed
+    data = json.loads(BUNDLED_OFFICE_HOURS_PATH.read_text(encoding="utf-8"))
+
+    rng = random.Random(0)
+    locations = [
+        Location(prefecture=m["prefecture"], city=m["city"])
+        for m in data["municipalities"].values()
+    ] + [Location(prefecture="長野県", city="松本市")]
+    kinds = [kind.name for kind in OfficeKind]
+    start = datetime(2026, 1, 1)
+    queries = [
+        (
+            rng.choice(locations),
+            rng.choice(kinds),
+            start + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+        )
+        for _ in range(n)
+    ]
+
+    assert [office_hours.is_open_at(*q) for q in queries[:2000]] == [
+        naive_is_open_at(data, *q) for q in queries[:2000]
+    ]
+
+    with Timer() as naive:
+        for q in queries:
+            naive_is_open_at(data, *q)
+    with Timer() as indexed:
+        for q in queries:
+            office_hours.is_open_at(*q)
+
+    distinct = len({id(s) for s in office_hours.schedules.values()} | {
+        id(s) for s in office_hours.defaults.values()
+    })
+    report(
+        f"Office hours ({len(office_hours.names)} municipalities, {n:,} queries)",
+        [
+            ("load", f"{load * 1000:,.1f} ms (data version {office_hours.data_version})"),
+            ("distinct schedules", f"{distinct} shared by {len(office_hours.schedules)} offices"),
+            ("is open at (parse per query)", f"{naive.elapsed / n * 1e6:,.2f} us/query"),
+            ("is open at (interval arrays)", f"{indexed.elapsed / n * 1e6:,.2f} us/query"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
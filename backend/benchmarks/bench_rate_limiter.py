@@ -0,0 +1,118 @@
+"""
+Vertex AI 流量制御の負荷テスト
+
+同時実行数に上限（クォータ）を持つ疑似モデルに大量の生成要求を流し、
+流量制御なし（リトライのみ）の場合と AIMD リミッターの場合で 429 の発生回数と完了数を比較します。
+リトライ待機はベンチマーク用に短縮しています。
+
+    python benchmarks/bench_rate_limiter.py [同時リクエスト数]
+"""
+
+import asyncio
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, report
+from google.api_core import exceptions as google_exceptions
+from tenacity import wait_fixed
+
+from core.metrics import metrics
+from services.rate_limiter import AdaptiveConcurrencyLimiter, TokenBucket
+from services.vertex_ai_service import VertexAIService
+
+QUOTA = 8
+
+
+class FakeResponse:
+    text = '{"documents": []}'
+
+
+class FakeHttpResponse:
+    headers = {"Retry-After": "0.1"}
+
+
+class NoLimit(AdaptiveConcurrencyLimiter):
+    """流量制御なし（リトライのみ）の比較用リミッター"""
+
+    async def acquire(self, timeout: float) -> None:
+        return None
+
+    async def release(self, overloaded: bool = False) -> None:
+        return None
+
+    def pause(self, seconds: float) -> None:
+        return None
+
+
+class QuotaModel:
+    """同時実行数が QUOTA を超えると 429 を返す疑似モデル"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.active = 0
+        self.calls = 0
+        self.rejected = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        if self.active >= QUOTA:
+            self.rejected += 1
+            raise google_exceptions.TooManyRequests("quota exceeded", response=FakeHttpResponse())
+        self.active += 1
+        try:
+            await asyncio.sleep(self.latency)
+            return FakeResponse()
+        finally:
+            self.active -= 1
+
+
+async def _burst(n: int, limiter: AdaptiveConcurrencyLimiter) -> dict:
+    service = VertexAIService(limiter=limiter, token_budget=TokenBucket())
+    model = QuotaModel()
+    service._model = model
+
+    async def request(i: int) -> bool:
+        try:
+            await service.generate_text(f"prompt {i}", use_cache=False)
+            return True
+        except Exception:
+            return False
+
+    with Timer() as t:
+        results = await asyncio.gather(*(request(i) for i in range(n)))
+    return {
+        "ok": sum(results),
+        "calls": model.calls,
+        "rejected": model.rejected,
+        "elapsed": t.elapsed,
+        "limit": limiter.limit,
+    }
+
+
+async def main(n: int) -> None:
+    VertexAIService._generate_content.retry.wait = wait_fixed(0.05)
+    metrics.reset()
+
+    unbounded = await _burst(n, NoLimit())
+    aimd = await _burst(n, AdaptiveConcurrencyLimiter(initial_limit=QUOTA * 2, max_limit=QUOTA * 4))
+    queue_wait = metrics.percentiles("vertex_ai_queue_wait_seconds")
+
+    report(
+        f"{n} concurrent generate_text against a {QUOTA}-concurrent quota",
+        [
+            ("completed (unbounded)", f"{unbounded['ok']}/{n}"),
+            ("completed (AIMD)", f"{aimd['ok']}/{n}"),
+            ("upstream calls (unbounded)", f"{unbounded['calls']}"),
+            ("upstream calls (AIMD)", f"{aimd['calls']}"),
+            ("429 responses (unbounded)", f"{unbounded['rejected']}"),
+            ("429 responses (AIMD)", f"{aimd['rejected']}"),
+            ("final concurrency limit (AIMD)", f"{aimd['limit']}"),
+            ("queue wait p95", f"{queue_wait.get('p95', 0) * 1000:.0f} ms"),
+            ("wall time (unbounded)", f"{unbounded['elapsed'] * 1000:.0f} ms"),
+            ("wall time (AIMD)", f"{aimd['elapsed'] * 1000:.0f} ms"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
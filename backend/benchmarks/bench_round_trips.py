@@ -0,0 +1,115 @@
+"""
+データストア往復回数のベンチマーク
+
+各エンドポイントが行うデータストア呼び出しを、従来の逐次呼び出しと
+SessionService の並行取得・更新後の内容を返す更新で比較します。
+インメモリストアの各呼び出しに固定レイテンシを加えて Firestore の往復を模擬します。
+セッションキャッシュは無効（コールド）の状態で計測します。
+
+    python benchmarks/bench_round_trips.py [往復レイテンシ(ms)]
+"""
+
+import asyncio
+import inspect
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Location,
+    Procedure,
+    ProcedureCategory,
+    ProcedurePriority,
+    Session,
+)
+from services.mock_firestore_service import InMemoryFirestoreService
+from services.session_service import SessionService
+
+
+class RoundTripStore:
+    """非同期メソッドの呼び出しごとに固定レイテンシを加え、回数を数えるストア"""
+
+    def __init__(self, store, latency: float):
+        self._store = store
+        self.latency = latency
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(self.latency)
+            return await attr(*args, **kwargs)
+
+        return call
+
+
+async def _timeline_before(service: SessionService, sid: str, pid: str) -> None:
+    await service.get_session(sid)
+    await service.get_procedures(sid)
+
+
+async def _timeline_after(service: SessionService, sid: str, pid: str) -> None:
+    await service.get_session_with_procedures(sid)
+
+
+async def _update_before(service: SessionService, sid: str, pid: str) -> None:
+    await service.get_session(sid)
+    await service.get_procedure(sid, pid)
+    await service.update_procedure_completion(sid, pid, True)
+    await service.get_procedure(sid, pid)
+
+
+async def _update_after(service: SessionService, sid: str, pid: str) -> None:
+    await service.get_session(sid)
+    await service.update_procedure_completion(sid, pid, True, return_updated=True)
+
+
+async def _measure(store: RoundTripStore, flow, sid: str, pid: str) -> tuple[int, float]:
+    service = SessionService(store)
+    store.calls = 0
+    with Timer() as t:
+        await flow(service, sid, pid)
+    return store.calls, t.elapsed
+
+
+async def main(latency_ms: float) -> None:
+    store = RoundTripStore(InMemoryFirestoreService(), latency_ms / 1000)
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=future_move_date(),
+    )
+    procedure = Procedure(
+        title="転入届の提出",
+        category=ProcedureCategory.ADMINISTRATIVE,
+        priority=ProcedurePriority.HIGH,
+        deadline=Deadline(type=DeadlineType.AFTER_MOVE, days_after=14, description=""),
+        estimated_duration=30,
+    )
+    await store.save_session(session)
+    await store.save_procedures_batch(session.session_id, [procedure])
+
+    rows = []
+    for label, before, after in (
+        ("GET /timeline, POST /chat", _timeline_before, _timeline_after),
+        ("PATCH /procedures/{pid}", _update_before, _update_after),
+    ):
+        calls_b, elapsed_b = await _measure(store, before, session.session_id, procedure.id)
+        calls_a, elapsed_a = await _measure(store, after, session.session_id, procedure.id)
+        rows.append((f"{label} round trips", f"{calls_b} -> {calls_a}"))
+        rows.append(
+            (f"{label} store latency", f"{elapsed_b * 1000:.0f} ms -> {elapsed_a * 1000:.0f} ms")
+        )
+
+    report(f"Data store round trips per endpoint ({latency_ms:.0f} ms per call)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,131 @@
+"""
+スケジューラのベンチマーク
+
+従来の ScheduleAgent（期限日ごとにまとめるだけ）と services.scheduler の
+容量・窓口を考慮した割り当てを、実行時間と品質指標で比較します。
+
+- モックの手続きリスト（約 20 件）と、合成した 30 / 1,000 件
+  （1,000 件は1日の作業時間の上限に収まらないため、期限超過は容量不足の目安）
+- 品質指標: 使う日数、窓口への訪問回数、期限超過、依存関係の違反、
+  1日の最大作業時間（移動・待ち時間を含む）、閉庁日の訪問
+
+    python benchmarks/bench_scheduler.py [手続き数 ...]
+"""
+
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from agents.mock_root_agent import MockRootAgent
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Location,
+    ProcedureCategory,
+    ProcedurePriority,
+    ProcedureSummary,
+    Session,
+)
+from services.dependency_graph import topological_order
+from services.scheduler import ScheduleOptions, optimize_schedule, schedule_stats
+
+LOCATIONS = ["旧住所の市役所", "新住所の市役所", "警察署", "運輸支局", "年金事務所", "オンライン"]
+
+
+def _deadline(rng: random.Random, move_date: datetime) -> Deadline:
+    deadline_type = rng.choice(list(DeadlineType))
+    if deadline_type == DeadlineType.BEFORE_MOVE:
+        absolute, days = move_date - timedelta(days=rng.randint(1, 14)), None
+    elif deadline_type == DeadlineType.ON_MOVE_DATE:
+        absolute, days = move_date, None
+    else:
+        days = rng.choice([7, 14, 30])
+        absolute = move_date + timedelta(days=days)
+    return Deadline(type=deadline_type, days_after=days, absolute_date=absolute, description="")
+
+
+def _procedures(n: int, move_date: datetime, seed: int = 0) -> list[ProcedureSummary]:
+    """期限・窓口・所要時間がばらついた手続き（期限が同じか早い手続きに 0〜2 件依存）"""
+    rng = random.Random(seed)
+    deadlines = sorted((_deadline(rng, move_date) for _ in range(n)), key=lambda d: d.absolute_date)
+    procedures = []
+    for i, deadline in enumerate(deadlines):
+        deps = [f"p{rng.randrange(i)}" for _ in range(rng.randint(0, 2))] if i else []
+        procedures.append(
+            ProcedureSummary(
+                id=f"p{i}",
+                title=f"手続き{i}",
+                category=rng.choice(list(ProcedureCategory)),
+                priority=rng.choice(list(ProcedurePriority)),
+                deadline=deadline,
+                estimated_duration=rng.choice([10, 15, 30, 60]),
+                dependencies=deps,
+                visit_location=rng.choice(LOCATIONS),
+            )
+        )
+    rng.shuffle(procedures)
+    return procedures
+
+
+def legacy_assignments(procedures: list[ProcedureSummary]) -> dict:
+    """従来の ScheduleAgent.generate_timeline（期限日に置く。期限日のない手続きは載らない）"""
+    return {
+        p.id: p.deadline.absolute_date.date()
+        for p in topological_order(procedures)
+        if p.deadline.absolute_date
+    }
+
+
+def _stats_row(stats, elapsed: float) -> str:
+    return (
+        f"{elapsed * 1000:7.2f} ms  placed={stats.procedures} days={stats.days_used} "
+        f"trips={stats.office_trips} late={stats.late} "
+        f"dep_violations={stats.dependency_violations} "
+        f"max_day={stats.max_daily_minutes}min closed_day={stats.closed_day_visits}"
+    )
+
+
+def compare(title: str, procedures: list[ProcedureSummary], move_date: datetime) -> None:
+    options = ScheduleOptions.from_settings()
+    day = move_date.date()
+
+    with Timer() as t:
+        legacy = legacy_assignments(procedures)
+    legacy_stats = schedule_stats(procedures, legacy, day, options)
+    legacy_time = t.elapsed
+
+    best = float("inf")
+    for _ in range(5):
+        with Timer() as t:
+            schedule = optimize_schedule(procedures, day, options)
+        best = min(best, t.elapsed)
+
+    report(
+        f"{title} ({len(procedures):,} procedures)",
+        [
+            ("legacy (bucket by deadline)", _stats_row(legacy_stats, legacy_time)),
+            ("optimizer", _stats_row(schedule.stats, best)),
+        ],
+    )
+
+
+def main(sizes: list[int]) -> None:
+    move_date = future_move_date().replace(hour=0, minute=0, second=0, microsecond=0)
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=move_date,
+    )
+    mock = asyncio.run(MockRootAgent().generate_procedures(session))
+    compare("Mock procedures", [ProcedureSummary(**p.model_dump()) for p in mock], move_date)
+
+    for n in sizes:
+        compare("Synthetic", _procedures(n, move_date), move_date)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [30, 1000])
@@ -0,0 +1,100 @@
+"""
+single-flight の負荷テスト
+
+同一手続きの詳細ページに同時アクセスが集中した状況を再現し、
+Document Agent / Location Agent の上流呼び出し回数を比較します。
+Vertex AI は固定レイテンシの疑似クライアントで置き換えます。
+
+    python benchmarks/bench_single_flight.py [同時リクエスト数]
+"""
+
+import asyncio
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from agents.document_agent import DocumentAgent
+from agents.location_agent import LocationAgent
+from core.metrics import metrics
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Location,
+    Procedure,
+    ProcedureCategory,
+    ProcedurePriority,
+    Session,
+)
+from services.single_flight import SingleFlight
+
+
+class FakeVertexAI:
+    """固定レイテンシで JSON を返す疑似 Vertex AI クライアント"""
+
+    model_name = "fake-model"
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_text(self, prompt, temperature=0.7, max_tokens=2048, use_cache=True):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return '{"documents": [], "steps": [], "notes": [], "name": "横浜市役所"}'
+
+
+class NoCoalesce:
+    """合流せず毎回実行する比較用の実装"""
+
+    async def do(self, key, fn):
+        return await fn()
+
+
+async def _burst(n: int, single_flight) -> tuple[int, float]:
+    vertex_ai = FakeVertexAI()
+    document_agent = DocumentAgent(vertex_ai, single_flight)
+    location_agent = LocationAgent(vertex_ai, single_flight)
+
+    async def request():
+        session = Session(
+            move_from=Location(prefecture="東京都", city="渋谷区"),
+            move_to=Location(prefecture="神奈川県", city="横浜市"),
+            move_date=future_move_date(),
+        )
+        procedure = Procedure(
+            title="転入届の提出",
+            category=ProcedureCategory.ADMINISTRATIVE,
+            priority=ProcedurePriority.HIGH,
+            deadline=Deadline(type=DeadlineType.AFTER_MOVE, days_after=14, description=""),
+            estimated_duration=30,
+        )
+        await asyncio.gather(
+            document_agent.get_procedure_details(session, procedure),
+            location_agent.get_office_info(session, procedure),
+        )
+
+    with Timer() as t:
+        await asyncio.gather(*(request() for _ in range(n)))
+    return vertex_ai.calls, t.elapsed
+
+
+async def main(n: int) -> None:
+    metrics.reset()
+    calls_before, elapsed_before = await _burst(n, NoCoalesce())
+    calls_after, elapsed_after = await _burst(n, SingleFlight())
+
+    report(
+        f"{n} concurrent GET /procedures/{{pid}} for the same procedure",
+        [
+            ("upstream calls (no single-flight)", f"{calls_before}"),
+            ("upstream calls (single-flight)", f"{calls_after}"),
+            ("coalesced callers", f"{metrics.get('llm_single_flight_coalesced_total'):.0f}"),
+            ("wall time (no single-flight)", f"{elapsed_before * 1000:.0f} ms"),
+            ("wall time (single-flight)", f"{elapsed_after * 1000:.0f} ms"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,115 @@
+"""
+完了状態の書き込みバッファのベンチマーク
+
+チェックボックスを続けて操作する利用者を模擬し、1操作ごとにトランザクションを
+コミットする従来方式と、CompletionWriteBuffer でまとめて書き込む方式の
+コミット回数と操作あたりの待ち時間を比較します。
+インメモリストアの書き込みに固定レイテンシを加えて Firestore のコミットを模擬します。
+
+    python benchmarks/bench_write_buffer.py [操作数] [コミットレイテンシ(ms)]
+"""
+
+import asyncio
+import sys
+
+import _common  # noqa: F401
+from _common import Timer, future_move_date, report
+
+from core.metrics import metrics
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Location,
+    Procedure,
+    ProcedureCategory,
+    ProcedurePriority,
+    Session,
+)
+from services.mock_firestore_service import InMemoryFirestoreService
+from services.session_service import SessionService
+from services.write_buffer import CompletionWriteBuffer
+
+PROCEDURES = 20
+CLICK_INTERVAL = 0.02
+
+
+class SlowCommitStore(InMemoryFirestoreService):
+    """完了状態の書き込み（コミット）ごとに固定レイテンシを加え、回数を数えるストア"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.commits = 0
+
+    async def set_procedure_completion(self, *args, **kwargs):
+        self.commits += 1
+        await asyncio.sleep(self.latency)
+        return await super().set_procedure_completion(*args, **kwargs)
+
+    async def set_procedure_completions(self, *args, **kwargs):
+        self.commits += 1
+        await asyncio.sleep(self.latency)
+        return await super().set_procedure_completions(*args, **kwargs)
+
+
+async def _run(clicks: int, latency: float, buffered: bool) -> tuple[int, float, int]:
+    store = SlowCommitStore(latency)
+    session = Session(
+        move_from=Location(prefecture="東京都", city="渋谷区"),
+        move_to=Location(prefecture="神奈川県", city="横浜市"),
+        move_date=future_move_date(),
+    )
+    procedures = [
+        Procedure(
+            title=f"手続き{i}",
+            category=ProcedureCategory.ADMINISTRATIVE,
+            priority=ProcedurePriority.HIGH,
+            deadline=Deadline(type=DeadlineType.AFTER_MOVE, days_after=14, description=""),
+            estimated_duration=30,
+        )
+        for i in range(PROCEDURES)
+    ]
+    await store.save_session(session)
+    await store.save_procedures_batch(session.session_id, procedures)
+
+    buffer = CompletionWriteBuffer(store, window_seconds=0.25) if buffered else None
+    service = SessionService(store, write_buffer=buffer)
+
+    # 利用者が一定間隔でチェックを付け外しする（付け直しも含む）
+    with Timer() as t:
+        for i in range(clicks):
+            procedure = procedures[i % PROCEDURES]
+            await service.update_procedure_completion(
+                session.session_id, procedure.id, (i // PROCEDURES) % 2 == 0
+            )
+            await asyncio.sleep(CLICK_INTERVAL)
+    per_click = (t.elapsed - clicks * CLICK_INTERVAL) / clicks
+
+    if buffer is not None:
+        await buffer.close()
+    completed = (await store.get_session(session.session_id)).progress.completed
+    return store.commits, per_click, completed
+
+
+async def main(clicks: int, latency_ms: float) -> None:
+    latency = latency_ms / 1000
+    commits_b, click_b, completed_b = await _run(clicks, latency, buffered=False)
+    metrics.reset()
+    commits_a, click_a, completed_a = await _run(clicks, latency, buffered=True)
+
+    report(
+        f"{clicks} completion toggles, {latency_ms:.0f} ms per commit",
+        [
+            ("commits (per toggle)", f"{commits_b}"),
+            ("commits (write buffer)", f"{commits_a}"),
+            ("writes saved", f"{metrics.get('completion_writes_saved_total'):.0f}"),
+            ("latency per toggle", f"{click_b * 1000:.1f} ms -> {click_a * 1000:.1f} ms"),
+            ("completed after run", f"{completed_b} / {completed_a}"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    asyncio.run(main(clicks, latency_ms))
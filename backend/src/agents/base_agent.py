@@ -1,37 +1,113 @@
 """エージェント基底クラス"""
 
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from core.config import settings
+from core.metrics import metrics
+from services.hedging import hedged_call
+from services.llm_cache import make_cache_key
+from services.single_flight import SingleFlight
 from services.vertex_ai_service import VertexAIService
+from utils.json_extract import ExtractStatus, extract_json
 
 logger = logging.getLogger(__name__)
 
+# これより速い応答はキャッシュヒットとみなし、レイテンシの標本から除外
+MIN_UPSTREAM_LATENCY_SECONDS = 0.05
+
 
 class BaseAgent:
     """エージェント基底クラス"""
 
-    def __init__(self):
-        self.vertex_ai = VertexAIService()
+    def __init__(
+        self,
+        vertex_ai: Optional[VertexAIService] = None,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        # 共有クライアントが渡されない場合のみ個別に生成
+        self.vertex_ai = vertex_ai or VertexAIService()
+        self.single_flight = single_flight or SingleFlight()
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        use_cache: bool = True,
+        max_tokens: int = 2048,
+    ) -> str:
+        """
+        Vertex AI でテキスト生成します。
+
+        同一プロンプトの同時呼び出しは1回の生成にまとめます。
+        use_cache=False の場合はキャッシュと合流の両方を迂回します。
+        応答がエージェントの p95 を超えるとヘッジリクエストを発行します。
+        """
+        if not use_cache:
+            return await self._generate_hedged(prompt, temperature, max_tokens, use_cache=False)
+
+        key = make_cache_key(prompt, self.vertex_ai.model_name, temperature, max_tokens)
+        return await self.single_flight.do(
+            key, lambda: self._generate_hedged(prompt, temperature, max_tokens, use_cache=True)
+        )
+
+    async def _generate_hedged(
+        self, prompt: str, temperature: float, max_tokens: int, use_cache: bool
+    ) -> str:
+        """ヘッジ付きで Vertex AI を呼び出し、レイテンシを記録"""
+        agent = type(self).__name__
+        start = time.monotonic()
+        text, hedged = await hedged_call(
+            lambda: self.vertex_ai.generate_text(
+                prompt, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+            ),
+            self._hedge_delay(),
+        )
+        elapsed = time.monotonic() - start
+
+        metrics.increment(f"llm_{agent}_requests_total")
+        if hedged:
+            metrics.increment(f"llm_{agent}_hedged_total")
+        if elapsed >= MIN_UPSTREAM_LATENCY_SECONDS:
+            metrics.observe(f"llm_{agent}_latency_seconds", elapsed)
+        return text
 
-    async def generate(self, prompt: str, temperature: float = 0.7) -> str:
-        """Vertex AI でテキスト生成"""
-        return await self.vertex_ai.generate_text(prompt, temperature=temperature)
+    def _hedge_delay(self) -> Optional[float]:
+        """ヘッジまでの待機秒数（標本不足や実行枠に余裕がない場合は None）"""
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+
+        stats = metrics.percentiles(f"llm_{type(self).__name__}_latency_seconds")
+        if stats.get("count", 0) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+
+        # 負荷が上限に達しているときに複製を流すと待ち行列を伸ばすだけになる
+        limiter = getattr(self.vertex_ai, "limiter", None)
+        if limiter is not None and limiter.in_flight >= limiter.limit:
+            return None
+
+        return stats["p95"]
+
+    async def generate_stream(
+        self, prompt: str, temperature: float = 0.7, use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """Vertex AI でテキストをストリーミング生成"""
+        async for chunk in self.vertex_ai.stream_text(
+            prompt, temperature=temperature, use_cache=use_cache
+        ):
+            yield chunk
 
     async def parse_json_response(self, response: str) -> Dict[str, Any]:
-        """JSON レスポンスをパース"""
-        import json
-
-        try:
-            # レスポンスから JSON 部分を抽出
-            start = response.find("{")
-            end = response.rfind("}") + 1
-            if start == -1 or end == 0:
-                start = response.find("[")
-                end = response.rfind("]") + 1
-
-            json_str = response[start:end]
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {e}")
+        """JSON レスポンスをパース（失敗時は空の dict）"""
+        data, status = extract_json(response)
+
+        agent = type(self).__name__
+        metrics.increment(f"json_parse_{agent}_{status.value}_total")
+
+        if status == ExtractStatus.FAILED:
+            logger.error(f"Failed to parse JSON response in {agent}")
             logger.error(f"Response: {response}")
             return {}
+        if status == ExtractStatus.RECOVERED:
+            logger.warning(f"Recovered {len(data)} items from truncated JSON in {agent}")
+        return data
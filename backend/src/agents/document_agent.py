@@ -1,16 +1,28 @@
 """Document Agent - 書類情報エージェント"""
 
+import asyncio
 import logging
-from typing import List
+from typing import Any, Dict, List
 from agents.base_agent import BaseAgent
+from core.metrics import metrics
 from models.domain import Session, Procedure, Document, Step
+from utils.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# まとめて生成する際の出力トークン上限と最大件数
+BATCH_OUTPUT_TOKEN_BUDGET = 8192
+MAX_BATCH_SIZE = 10
+
 
 class DocumentAgent(BaseAgent):
     """書類情報エージェント"""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 1手続きあたりの出力トークン数の推定値（初期値は経験値）
+        self._tokens_per_procedure = 600.0
+
     async def get_documents(self, session: Session, procedure: Procedure) -> List[Document]:
         """
         手続きの必要書類を特定します。
@@ -71,6 +83,13 @@ JSONのみを出力してください。
         response = await self.generate(prompt, temperature=0.5)
         data = await self.parse_json_response(response)
 
+        return self._apply_details(procedure, data)
+
+    def _apply_details(self, procedure: Procedure, data: Dict[str, Any]) -> List[Document]:
+        """LLM 出力の書類・手順・注意事項を手続きに設定し、書類のリストを返す"""
+        if not isinstance(data, dict):
+            data = {}
+
         # Document モデルに変換
         documents = []
         if isinstance(data.get("documents"), list):
@@ -103,7 +122,7 @@ JSONのみを出力してください。
                     continue
 
         # notes も返す
-        notes = data.get("notes", [])
+        notes = data.get("notes") or []
 
         # 手続きに詳細情報を設定
         procedure.documents = documents
@@ -127,3 +146,109 @@ JSONのみを出力してください。
         """
         await self.get_documents(session, procedure)
         return procedure
+
+    def batch_size(self) -> int:
+        """
+        1回の呼び出しでまとめる手続き数 K を出力トークン予算から決めます。
+
+        これまでの応答から1手続きあたりの出力トークン数を指数移動平均で推定し、
+        予算の8割に収まる件数を返します。
+        """
+        usable = BATCH_OUTPUT_TOKEN_BUDGET * 0.8
+        return max(1, min(MAX_BATCH_SIZE, int(usable // self._tokens_per_procedure)))
+
+    async def get_procedure_details_batch(
+        self, session: Session, procedures: List[Procedure]
+    ) -> List[Procedure]:
+        """
+        複数の手続きの詳細情報をまとめて取得します。
+
+        K 件ずつ1回の構造化出力で生成し、結果を id で各手続きに振り分けます。
+        応答に含まれなかった手続きは1件ずつ取得し直します。
+
+        Args:
+            session: セッション情報
+            procedures: 手続きリスト
+
+        Returns:
+            詳細情報が追加された手続きのリスト
+        """
+        size = self.batch_size()
+        chunks = [procedures[i : i + size] for i in range(0, len(procedures), size)]
+        await asyncio.gather(*(self._get_details_chunk(session, chunk) for chunk in chunks))
+        return procedures
+
+    async def _get_details_chunk(self, session: Session, procedures: List[Procedure]) -> None:
+        if len(procedures) == 1:
+            await self.get_documents(session, procedures[0])
+            return
+
+        # トークン節約のため短い id で問い合わせる
+        by_key = {f"p{i + 1}": p for i, p in enumerate(procedures)}
+        procedure_lines = "\n".join(
+            f"- id: {key} / 手続き名: {p.title} / カテゴリ: {p.category.value}"
+            for key, p in by_key.items()
+        )
+
+        prompt = f"""
+あなたは行政手続きの専門家です。以下の各手続きに必要な書類と手順を詳細に教えてください。
+
+## 引越し情報
+- 引越し元: {session.move_from.prefecture}{session.move_from.city}
+- 引越し先: {session.move_to.prefecture}{session.move_to.city}
+
+## 手続き一覧
+{procedure_lines}
+
+## 出力形式（JSON）
+手続き一覧の全ての id について1要素ずつ出力してください。
+{{
+  "procedures": [
+    {{
+      "id": "p1",
+      "documents": [
+        {{
+          "name": "本人確認書類",
+          "description": "運転免許証、パスポート、マイナンバーカードなど",
+          "required": true,
+          "obtainMethod": "既に所持"
+        }}
+      ],
+      "steps": [
+        {{
+          "order": 1,
+          "description": "必要書類を準備する",
+          "estimatedDuration": 10
+        }}
+      ],
+      "notes": [
+        "平日のみ受付"
+      ]
+    }}
+  ]
+}}
+
+JSONのみを出力してください。
+"""
+
+        response = await self.generate(
+            prompt, temperature=0.5, max_tokens=BATCH_OUTPUT_TOKEN_BUDGET
+        )
+        data = await self.parse_json_response(response)
+
+        items = data.get("procedures") if isinstance(data, dict) else None
+        filled = 0
+        for item in items if isinstance(items, list) else []:
+            procedure = by_key.pop(str(item.get("id")), None) if isinstance(item, dict) else None
+            if procedure is not None:
+                self._apply_details(procedure, item)
+                filled += 1
+
+        if filled:
+            tokens = estimate_tokens(response) / filled
+            self._tokens_per_procedure = 0.7 * self._tokens_per_procedure + 0.3 * tokens
+
+        # 応答から欠けた手続きは個別に取得
+        if by_key:
+            metrics.increment("document_batch_fallbacks_total", len(by_key))
+            await asyncio.gather(*(self.get_documents(session, p) for p in by_key.values()))
@@ -54,7 +54,8 @@ class InterviewAgent(BaseAgent):
 JSON配列のみを出力してください。
 """
 
-        response = await self.generate(prompt, temperature=0.7)
+        # 質問は多様性を重視するためキャッシュしない
+        response = await self.generate(prompt, temperature=0.7, use_cache=False)
         questions_data = await self.parse_json_response(response)
 
         # Question モデルに変換
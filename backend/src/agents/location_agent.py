@@ -3,7 +3,14 @@
 import logging
 from typing import Optional
 from agents.base_agent import BaseAgent
-from models.domain import Session, Procedure, Office
+from models.domain import Session, Procedure, Office, Location
+from services.office_hours import get_office_hours
+from services.office_directory import (
+    OfficeKind,
+    classify_office,
+    fallback_office,
+    office_location,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,24 +32,43 @@ class LocationAgent(BaseAgent):
             窓口情報
         """
         # 手続きカテゴリが民間の場合は窓口情報なし
-        if procedure.category.value == "民間":
+        kind = classify_office(procedure)
+        if kind is None:
             return None
 
+        location = office_location(session, procedure)
+        office = await self.get_office(location, kind)
+        return office or fallback_office(location, kind)
+
+    async def get_office(self, location: Location, kind: OfficeKind) -> Optional[Office]:
+        """
+        市区町村と窓口種別から窓口情報を生成します。
+
+        Args:
+            location: 窓口のある市区町村
+            kind: 窓口種別
+
+        Returns:
+            窓口情報（取得できなかった場合は None）
+        """
+        example_name = (
+            f"{location.city}役所" if kind == OfficeKind.CITY_HALL else f"〇〇{kind.value}"
+        )
+
         prompt = f"""
-あなたは行政手続きの専門家です。以下の手続きの窓口情報を教えてください。
+あなたは行政手続きの専門家です。以下の地域を管轄する窓口の情報を教えてください。
 
-## 手続き情報
-- 手続き名: {procedure.title}
-- 場所: {session.move_to.prefecture}{session.move_to.city}
+## 窓口情報
+- 窓口種別: {kind.value}
+- 場所: {location.prefecture}{location.city}
 
 ## 出力形式（JSON）
 {{
-  "name": "{session.move_to.city}役所",
-  "address": "{session.move_to.prefecture}{session.move_to.city}〇〇1-2-3",
+  "name": "{example_name}",
+  "address": "{location.prefecture}{location.city}〇〇1-2-3",
   "phone": "03-1234-5678",
-  "hours": "平日 8:30-17:15",
   "nearestStation": "〇〇駅から徒歩5分",
-  "mapUrl": "https://www.google.com/maps/search/?api=1&query={session.move_to.city}役所"
+  "mapUrl": "https://www.google.com/maps/search/?api=1&query={example_name}"
 }}
 
 JSONのみを出力してください。実在する情報に基づいて回答してください。
@@ -50,24 +76,20 @@ JSONのみを出力してください。実在する情報に基づいて回答
 
         response = await self.generate(prompt, temperature=0.3)
         data = await self.parse_json_response(response)
+        if not isinstance(data, dict) or not data.get("address"):
+            return None
 
         # Office モデルに変換
         try:
-            office = Office(
-                name=data.get("name", f"{session.move_to.city}役所"),
-                address=data.get("address", ""),
+            return Office(
+                name=data.get("name", f"{location.city}役所"),
+                address=data["address"],
                 phone=data.get("phone", ""),
-                hours=data.get("hours", "平日 8:30-17:15"),
+                # 受付時間は LLM ではなく市区町村ごとのデータから
+                hours=get_office_hours().hours_text(location, kind.name),
                 nearest_station=data.get("nearestStation"),
                 map_url=data.get("mapUrl"),
             )
-            return office
         except Exception as e:
             logger.error(f"Failed to parse office info: {e}")
-            # フォールバック
-            return Office(
-                name=f"{session.move_to.city}役所",
-                address=f"{session.move_to.prefecture}{session.move_to.city}",
-                phone="お問い合わせください",
-                hours="平日 8:30-17:15",
-            )
+            return None
@@ -1,11 +1,13 @@
 """Mock Root Agent - モックモード用オーケストレーター"""
 
 import logging
-from typing import List
-from datetime import datetime, timedelta
+from typing import AsyncIterator, List
+from datetime import timedelta
 from models.domain import (
     Session,
     Procedure,
+    ProcedureSummary,
+    ProgressCount,
     Question,
     QuestionType,
     ProcedureCategory,
@@ -16,11 +18,11 @@ from models.domain import (
     Office,
     Step,
     Timeline,
-    TimelineItem,
-    TimelineProcedure,
-    Milestone,
-    MilestoneType,
 )
+from services.office_directory import OfficeKind
+from services.office_hours import get_office_hours
+from services.scheduler import ScheduleOptions, build_timeline
+from utils.date_utils import fill_deadline_dates
 
 logger = logging.getLogger(__name__)
 
@@ -139,7 +141,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=14,
-                    absolute_date=move_date + timedelta(days=14),
                     description="引越し後14日以内",
                 ),
                 estimated_duration=30,
@@ -152,7 +153,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=14,
-                    absolute_date=move_date + timedelta(days=14),
                     description="転入届と同時に手続き",
                 ),
                 estimated_duration=15,
@@ -165,7 +165,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=14,
-                    absolute_date=move_date + timedelta(days=14),
                     description="転入届と同時に手続き",
                 ),
                 estimated_duration=15,
@@ -178,7 +177,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=14,
-                    absolute_date=move_date + timedelta(days=14),
                     description="転入届と同時に手続き",
                 ),
                 estimated_duration=10,
@@ -191,7 +189,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=30,
-                    absolute_date=move_date + timedelta(days=30),
                     description="必要に応じて早めに",
                 ),
                 estimated_duration=15,
@@ -204,7 +201,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=15,
-                    absolute_date=move_date + timedelta(days=15),
                     description="転入日の翌日から15日以内",
                 ),
                 estimated_duration=20,
@@ -217,7 +213,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=30,
-                    absolute_date=move_date + timedelta(days=30),
                     description="速やかに",
                 ),
                 estimated_duration=30,
@@ -230,7 +225,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=15,
-                    absolute_date=move_date + timedelta(days=15),
                     description="引越し後15日以内",
                 ),
                 estimated_duration=60,
@@ -243,7 +237,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=15,
-                    absolute_date=move_date + timedelta(days=15),
                     description="引越し後15日以内",
                 ),
                 estimated_duration=60,
@@ -256,7 +249,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=30,
-                    absolute_date=move_date + timedelta(days=30),
                     description="引越し後30日以内",
                 ),
                 estimated_duration=15,
@@ -330,7 +322,6 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=30,
-                    absolute_date=move_date + timedelta(days=30),
                     description="引越し後早めに",
                 ),
                 estimated_duration=20,
@@ -343,21 +334,29 @@ class MockRootAgent:
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=30,
-                    absolute_date=move_date + timedelta(days=30),
                     description="引越し後早めに",
                 ),
                 estimated_duration=15,
             ),
         ]
 
+        # 引越し後の期限は開庁日に合わせてまとめて計算
+        fill_deadline_dates(move_date, [p.deadline for p in procedures])
+
         logger.info(f"[MOCK] Generated {len(procedures)} procedures")
         return procedures
 
+    async def stream_procedures(self, session: Session) -> AsyncIterator[Procedure]:
+        """モック手続きリストを1件ずつ返す"""
+        for procedure in await self.generate_procedures(session):
+            yield procedure
+
     async def get_procedure_detail(self, session: Session, procedure: Procedure) -> Procedure:
         """モック手続き詳細を返す"""
         logger.info(f"[MOCK] Getting details for procedure {procedure.id}: {procedure.title}")
         to_city = session.move_to.city
         to_pref = session.move_to.prefecture
+        city_hall_hours = get_office_hours().hours_text(session.move_to, OfficeKind.CITY_HALL.name)
 
         # 手続きタイトルに応じたモックデータ
         detail_map = {
@@ -374,7 +373,7 @@ class MockRootAgent:
                     Step(order=3, description="転入届を記入・提出する", estimated_duration=10),
                     Step(order=4, description="住民票の写しを必要部数取得する（各種手続きに必要）", estimated_duration=5),
                 ],
-                "notes": ["平日 8:30〜17:15 のみ受付", "混雑する月曜・金曜は避けることをおすすめします", "転出届と転入届は同時にはできません"],
+                "notes": [f"受付時間: {city_hall_hours}", "混雑する月曜・金曜は避けることをおすすめします", "転出届と転入届は同時にはできません"],
             },
             "転出届の提出": {
                 "documents": [
@@ -416,16 +415,28 @@ class MockRootAgent:
                 name=f"{to_city}役所",
                 address=f"{to_pref}{to_city}",
                 phone="代表電話にお問い合わせください",
-                hours="平日 8:30〜17:15",
+                hours=city_hall_hours,
                 nearest_station=f"{to_city}の最寄り駅から徒歩圏内",
             )
 
         return procedure
 
+    async def get_procedure_details_batch(
+        self, session: Session, procedures: List[Procedure]
+    ) -> List[Procedure]:
+        """モック手続き詳細をまとめて返す"""
+        for procedure in procedures:
+            await self.get_procedure_detail(session, procedure)
+        return procedures
+
+    def detail_batch_size(self) -> int:
+        """詳細情報を一括取得する際の件数"""
+        return 5
+
     async def generate_chat_reply(
-        self, session: Session, message: str, procedures: List[Procedure]
+        self, session: Session, message: str, procedures: List[ProcedureSummary]
     ) -> dict:
-        """モックチャット回答を返す"""
+        """モックチャット回答を返す（件数はセッションの進捗集計から）"""
         logger.info(f"[MOCK] Chat message: {message}")
         to_city = session.move_to.city
         from_city = session.move_from.city
@@ -468,8 +479,11 @@ class MockRootAgent:
             )
             suggested = ["車庫証明も必要？", "車検証の住所変更は？", "他に警察署で必要な手続きは？"]
         elif "期限" in message or "いつまで" in message or "スケジュール" in message:
-            before_count = sum(1 for p in procedures if p.deadline.type.value == "引越し前" and not p.is_completed)
-            after_count = sum(1 for p in procedures if p.deadline.type.value == "引越し後" and not p.is_completed)
+            by_deadline = session.progress.by_deadline_type
+            before = by_deadline.get(DeadlineType.BEFORE_MOVE.value, ProgressCount())
+            after = by_deadline.get(DeadlineType.AFTER_MOVE.value, ProgressCount())
+            before_count = before.total - before.completed
+            after_count = after.total - after.completed
             reply = (
                 f"あなたの手続きスケジュールをまとめます。\n\n"
                 f"【引越し前】残り{before_count}件\n"
@@ -508,8 +522,8 @@ class MockRootAgent:
             )
             suggested = ["持ち物リストを教えて", "平日に行けない場合は？", "混雑を避けるコツは？"]
         else:
-            completed = sum(1 for p in procedures if p.is_completed)
-            total = len(procedures)
+            completed = session.progress.completed
+            total = session.progress.total
             reply = (
                 f"現在の進捗は {completed}/{total}件 完了です。\n\n"
                 "引越し手続きについて、以下のような質問にお答えできます：\n"
@@ -523,56 +537,11 @@ class MockRootAgent:
 
         return {"reply": reply, "suggested_questions": suggested}
 
-    async def generate_timeline(self, session: Session, procedures: List[Procedure]) -> Timeline:
-        """モックタイムラインを返す"""
+    async def generate_timeline(
+        self, session: Session, procedures: List[ProcedureSummary]
+    ) -> Timeline:
+        """モックタイムラインを返す（スケジューリングは本番と同じ）"""
         logger.info(f"[MOCK] Generating timeline for session {session.session_id}")
-        move_date = session.move_date
-
-        # 手続きを日付ごとにグループ化
-        date_groups: dict[str, list[Procedure]] = {}
-        for proc in procedures:
-            if proc.deadline.absolute_date:
-                date_key = proc.deadline.absolute_date.strftime("%Y-%m-%d")
-                if date_key not in date_groups:
-                    date_groups[date_key] = []
-                date_groups[date_key].append(proc)
-
-        timeline_items = []
-        for date_key, procs in sorted(date_groups.items()):
-            date = datetime.fromisoformat(date_key)
-            delta = (date - move_date).days
-            if delta == 0:
-                label = "引越し当日"
-            elif delta > 0:
-                label = f"引越し後{delta}日"
-            else:
-                label = f"引越し{abs(delta)}日前"
-
-            timeline_procs = [
-                TimelineProcedure(
-                    id=p.id,
-                    title=p.title,
-                    priority=p.priority,
-                    estimated_duration=p.estimated_duration,
-                    is_completed=p.is_completed,
-                )
-                for p in procs
-            ]
-            timeline_items.append(TimelineItem(date=date, label=label, procedures=timeline_procs))
-
-        milestones = [
-            Milestone(date=move_date, label="引越し当日", type=MilestoneType.MOVE_DATE),
-        ]
-        for proc in procedures:
-            if proc.priority == ProcedurePriority.HIGH and proc.deadline.absolute_date:
-                milestones.append(
-                    Milestone(
-                        date=proc.deadline.absolute_date,
-                        label=f"{proc.title}の期限",
-                        type=MilestoneType.DEADLINE,
-                    )
-                )
-
-        milestones.sort(key=lambda m: m.date)
-
-        return Timeline(items=timeline_items, milestones=milestones)
+        return build_timeline(
+            session.move_date, procedures, ScheduleOptions.for_session(session, procedures)
+        )
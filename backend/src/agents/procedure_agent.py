@@ -1,7 +1,7 @@
 """Procedure Agent - 手続き特定エージェント"""
 
 import logging
-from typing import List
+from typing import Any, AsyncIterator, List, Optional
 from agents.base_agent import BaseAgent
 from models.domain import (
     Session,
@@ -11,7 +11,8 @@ from models.domain import (
     Deadline,
     DeadlineType,
 )
-from utils.date_utils import calculate_deadline
+from utils.date_utils import fill_deadline_dates
+from utils.json_stream import JSONArrayStreamParser
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,50 @@ class ProcedureAgent(BaseAgent):
         Returns:
             手続きのリスト
         """
+        prompt = self._build_prompt(session)
+
+        response = await self.generate(prompt, temperature=0.7)
+        procedures_data = await self.parse_json_response(response)
+
+        # Procedure モデルに変換
+        procedures = []
+        if isinstance(procedures_data, list):
+            procedures = self._build_procedures(session, procedures_data)
+
+        # 最低限の手続きを保証
+        if len(procedures) == 0:
+            procedures = self._get_default_procedures(session)
+
+        return procedures
+
+    async def stream_procedures(self, session: Session) -> AsyncIterator[Procedure]:
+        """
+        手続きをストリーミングで特定します。
+
+        JSON 配列の要素が閉じた時点で Procedure を1件ずつ返します。
+
+        Args:
+            session: セッション情報
+
+        Yields:
+            手続き
+        """
+        prompt = self._build_prompt(session)
+        parser = JSONArrayStreamParser()
+        count = 0
+
+        async for chunk in self.generate_stream(prompt, temperature=0.7):
+            for procedure in self._build_procedures(session, parser.feed(chunk)):
+                count += 1
+                yield procedure
+
+        # 最低限の手続きを保証
+        if count == 0:
+            for procedure in self._get_default_procedures(session):
+                yield procedure
+
+    def _build_prompt(self, session: Session) -> str:
+        """手続き特定用のプロンプトを生成"""
         # インタビュー情報を文字列化
         interview_info = ""
         if session.interview:
@@ -90,57 +135,47 @@ class ProcedureAgent(BaseAgent):
 
 JSON配列のみを出力してください。
 """
+        return prompt
 
-        response = await self.generate(prompt, temperature=0.7)
-        procedures_data = await self.parse_json_response(response)
-
-        # Procedure モデルに変換
-        procedures = []
-        if isinstance(procedures_data, list):
-            for p_data in procedures_data:
-                try:
-                    # Deadline を構築
-                    deadline_data = p_data.get("deadline", {})
-                    deadline_type = DeadlineType(deadline_data.get("type", "引越し後"))
-                    days_after = deadline_data.get("daysAfter")
-
-                    # 絶対日付を計算
-                    absolute_date = None
-                    if deadline_type != DeadlineType.BEFORE_MOVE:
-                        absolute_date = calculate_deadline(
-                            session.move_date, deadline_type, days_after
-                        )
-
-                    deadline = Deadline(
-                        type=deadline_type,
-                        days_after=days_after,
-                        absolute_date=absolute_date,
-                        description=deadline_data.get("description", ""),
-                    )
-
-                    procedure = Procedure(
-                        title=p_data["title"],
-                        category=ProcedureCategory(p_data["category"]),
-                        priority=ProcedurePriority(p_data["priority"]),
-                        deadline=deadline,
-                        estimated_duration=p_data.get("estimatedDuration", 30),
-                        dependencies=p_data.get("dependencies", []),
-                    )
-                    procedures.append(procedure)
-                except Exception as e:
-                    logger.error(f"Failed to parse procedure: {e}")
-                    logger.error(f"Procedure data: {p_data}")
-                    continue
-
-        # 最低限の手続きを保証
-        if len(procedures) == 0:
-            procedures = self._get_default_procedures(session)
-
+    def _build_procedures(self, session: Session, items: List[Any]) -> List[Procedure]:
+        """LLM 出力の要素を Procedure に変換し、期限の絶対日付をまとめて計算"""
+        procedures = [p for p in (self._build_procedure(p_data) for p_data in items) if p]
+        fill_deadline_dates(session.move_date, [p.deadline for p in procedures])
         return procedures
 
+    def _build_procedure(self, p_data: Any) -> Optional[Procedure]:
+        """LLM 出力の1要素を Procedure に変換（失敗時は None、期限の絶対日付は未設定）"""
+        try:
+            # Deadline を構築
+            deadline_data = p_data.get("deadline", {})
+            deadline_type = DeadlineType(deadline_data.get("type", "引越し後"))
+            days_after = deadline_data.get("daysAfter")
+            if deadline_type == DeadlineType.AFTER_MOVE and days_after is None:
+                raise ValueError("AFTER_MOVE の場合は days_after が必要です")
+
+            deadline = Deadline(
+                type=deadline_type,
+                days_after=days_after,
+                description=deadline_data.get("description", ""),
+            )
+
+            procedure = Procedure(
+                title=p_data["title"],
+                category=ProcedureCategory(p_data["category"]),
+                priority=ProcedurePriority(p_data["priority"]),
+                deadline=deadline,
+                estimated_duration=p_data.get("estimatedDuration", 30),
+                dependencies=p_data.get("dependencies", []),
+            )
+            return procedure
+        except Exception as e:
+            logger.error(f"Failed to parse procedure: {e}")
+            logger.error(f"Procedure data: {p_data}")
+            return None
+
     def _get_default_procedures(self, session: Session) -> List[Procedure]:
         """デフォルトの手続き（フォールバック用）"""
-        return [
+        procedures = [
             Procedure(
                 title="転入届の提出",
                 category=ProcedureCategory.ADMINISTRATIVE,
@@ -148,7 +183,6 @@ JSON配列のみを出力してください。
                 deadline=Deadline(
                     type=DeadlineType.AFTER_MOVE,
                     days_after=14,
-                    absolute_date=calculate_deadline(session.move_date, DeadlineType.AFTER_MOVE, 14),
                     description="引越し後14日以内",
                 ),
                 estimated_duration=30,
@@ -165,3 +199,5 @@ JSON配列のみを出力してください。
                 estimated_duration=30,
             ),
         ]
+        fill_deadline_dates(session.move_date, [p.deadline for p in procedures])
+        return procedures
@@ -0,0 +1,69 @@
+"""Agent Registry - アプリケーション全体で共有するエージェント群"""
+
+import logging
+import time
+
+from core.config import settings
+from services.detail_prefetcher import DetailPrefetcher
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRegistry:
+    """
+    アプリケーションのライフタイムで共有するエージェントのレジストリ。
+
+    リクエストごとに RootAgent や VertexAIService を生成せず、
+    起動時に1度だけ初期化したインスタンスを全リクエストで使い回します。
+    """
+
+    def __init__(self, root_agent, vertex_ai=None):
+        self.root_agent = root_agent
+        self.vertex_ai = vertex_ai
+        self.prefetcher = DetailPrefetcher(
+            root_agent,
+            top_n=settings.PREFETCH_TOP_N,
+            concurrency=settings.PREFETCH_CONCURRENCY,
+            idle_timeout_seconds=settings.PREFETCH_IDLE_TIMEOUT_SECONDS,
+            wait_timeout_seconds=settings.PREFETCH_WAIT_TIMEOUT_SECONDS,
+        )
+
+    @classmethod
+    def create(cls, store=None) -> "AgentRegistry":
+        """
+        設定に応じてエージェントを初期化し、所要時間をログ出力します。
+
+        Args:
+            store: 窓口ディレクトリの保存先（Firestore サービス）
+        """
+        start = time.perf_counter()
+
+        if settings.MOCK_MODE:
+            from agents.mock_root_agent import MockRootAgent
+
+            registry = cls(root_agent=MockRootAgent())
+        else:
+            from agents.root_agent import RootAgent
+            from services.llm_cache import create_llm_cache
+            from services.procedure_catalog import ProcedureCatalog
+            from services.vertex_ai_service import VertexAIService
+
+            vertex_ai = VertexAIService(cache=create_llm_cache())
+            vertex_ai.warm_up()
+            catalog = ProcedureCatalog.load(settings.PROCEDURE_CATALOG_PATH)
+            registry = cls(
+                root_agent=RootAgent(vertex_ai=vertex_ai, catalog=catalog, office_store=store),
+                vertex_ai=vertex_ai,
+            )
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Agent registry initialized in {elapsed_ms:.1f}ms "
+            f"(mode={'mock' if settings.MOCK_MODE else 'vertex_ai'})"
+        )
+        return registry
+
+    async def close(self) -> None:
+        """シャットダウン時の後処理"""
+        await self.prefetcher.shutdown()
+        logger.info("Agent registry closed")
@@ -2,13 +2,24 @@
 
 import logging
 import asyncio
-from typing import List
+from typing import AsyncIterator, List, Optional
 from agents.interview_agent import InterviewAgent
 from agents.procedure_agent import ProcedureAgent
 from agents.document_agent import DocumentAgent
 from agents.location_agent import LocationAgent
 from agents.schedule_agent import ScheduleAgent
-from models.domain import Session, Procedure, Question, Timeline
+from core.config import settings
+from core.metrics import metrics
+from models.domain import Session, Procedure, ProcedureSummary, Question, Timeline
+from services.office_directory import (
+    OfficeDirectory,
+    classify_office,
+    fallback_office,
+    office_location,
+)
+from services.procedure_catalog import ProcedureCatalog
+from services.single_flight import SingleFlight
+from services.vertex_ai_service import VertexAIService
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +27,26 @@ logger = logging.getLogger(__name__)
 class RootAgent:
     """マルチエージェントシステムのオーケストレーター"""
 
-    def __init__(self):
-        self.interview_agent = InterviewAgent()
-        self.procedure_agent = ProcedureAgent()
-        self.document_agent = DocumentAgent()
-        self.location_agent = LocationAgent()
-        self.schedule_agent = ScheduleAgent()
+    def __init__(
+        self,
+        vertex_ai: Optional[VertexAIService] = None,
+        catalog: Optional[ProcedureCatalog] = None,
+        office_store=None,
+    ):
+        # 全エージェントで1つの Vertex AI クライアントと single-flight を共有
+        self.vertex_ai = vertex_ai or VertexAIService()
+        self.single_flight = SingleFlight()
+        self.interview_agent = InterviewAgent(self.vertex_ai, self.single_flight)
+        self.procedure_agent = ProcedureAgent(self.vertex_ai, self.single_flight)
+        self.document_agent = DocumentAgent(self.vertex_ai, self.single_flight)
+        self.location_agent = LocationAgent(self.vertex_ai, self.single_flight)
+        self.schedule_agent = ScheduleAgent(self.vertex_ai, self.single_flight)
+        self.catalog = catalog or ProcedureCatalog()
+        self.office_directory = OfficeDirectory(
+            self.location_agent,
+            store=office_store,
+            ttl_seconds=settings.OFFICE_DIRECTORY_TTL_SECONDS,
+        )
 
     async def generate_questions(self, session: Session) -> List[Question]:
         """
@@ -49,6 +74,12 @@ class RootAgent:
         """
         logger.info(f"Generating procedures for session {session.session_id}")
 
+        # 事前計算済みのカタログにあれば LLM を呼ばない
+        procedures = self.catalog.get_procedures(session)
+        if procedures is not None:
+            logger.info(f"Served {len(procedures)} procedures from catalog")
+            return procedures
+
         # Procedure Agent で手続きを特定
         procedures = await self.procedure_agent.identify_procedures(session)
 
@@ -56,11 +87,33 @@ class RootAgent:
 
         return procedures
 
+    async def stream_procedures(self, session: Session) -> AsyncIterator[Procedure]:
+        """
+        手続きリストをストリーミング生成します（1件ずつ返す）。
+
+        Args:
+            session: セッション情報
+
+        Yields:
+            手続き
+        """
+        logger.info(f"Streaming procedures for session {session.session_id}")
+
+        procedures = self.catalog.get_procedures(session)
+        if procedures is not None:
+            for procedure in procedures:
+                yield procedure
+            return
+
+        async for procedure in self.procedure_agent.stream_procedures(session):
+            yield procedure
+
     async def get_procedure_detail(self, session: Session, procedure: Procedure) -> Procedure:
         """
         手続きの詳細情報を取得します。
 
-        Document Agent + Location Agent を並列実行。
+        Document Agent と窓口ディレクトリ（Location Agent）を並列実行。
+        それぞれの期限を超えた場合は既定の結果（書類なし・代替窓口）で返します。
 
         Args:
             session: セッション情報
@@ -71,26 +124,87 @@ class RootAgent:
         """
         logger.info(f"Getting details for procedure {procedure.id}")
 
-        # Document Agent と Location Agent を並列実行（エラーハンドリング付き）
-        document_task = self.document_agent.get_procedure_details(session, procedure)
-        location_task = self.location_agent.get_office_info(session, procedure)
+        if self.catalog.apply_detail(session, procedure):
+            return procedure
+
+        # Document Agent と Location Agent を期限付きで並列実行（エラーハンドリング付き）
+        document_task = asyncio.wait_for(
+            self.document_agent.get_procedure_details(session, procedure),
+            settings.DOCUMENT_AGENT_DEADLINE_SECONDS,
+        )
+        location_task = asyncio.wait_for(
+            self.office_directory.resolve(session, procedure),
+            settings.LOCATION_AGENT_DEADLINE_SECONDS,
+        )
 
         results = await asyncio.gather(document_task, location_task, return_exceptions=True)
 
         # 結果を安全に取得
-        if not isinstance(results[0], Exception):
-            procedure = results[0]
-        else:
+        if isinstance(results[0], asyncio.TimeoutError):
+            metrics.increment("detail_deadline_exceeded_document_total")
+            logger.warning(f"Document Agent exceeded deadline for {procedure.id}")
+        elif isinstance(results[0], Exception):
             logger.error(f"Document Agent failed: {results[0]}")
-
-        if not isinstance(results[1], Exception):
-            procedure.office = results[1]
         else:
+            procedure = results[0]
+
+        if isinstance(results[1], asyncio.TimeoutError):
+            metrics.increment("detail_deadline_exceeded_location_total")
+            logger.warning(f"Location Agent exceeded deadline for {procedure.id}")
+            kind = classify_office(procedure)
+            if kind is not None:
+                procedure.office = fallback_office(office_location(session, procedure), kind)
+        elif isinstance(results[1], Exception):
             logger.error(f"Location Agent failed: {results[1]}")
+        else:
+            procedure.office = results[1]
 
         return procedure
 
-    async def generate_timeline(self, session: Session, procedures: List[Procedure]) -> Timeline:
+    async def get_procedure_details_batch(
+        self, session: Session, procedures: List[Procedure]
+    ) -> List[Procedure]:
+        """
+        複数の手続きの詳細情報をまとめて取得します（先読み用）。
+
+        書類・手順は Document Agent の一括生成、窓口は窓口ディレクトリで取得。
+
+        Args:
+            session: セッション情報
+            procedures: 手続きリスト
+
+        Returns:
+            詳細情報が追加された手続きのリスト
+        """
+        remaining = [p for p in procedures if not self.catalog.apply_detail(session, p)]
+        if not remaining:
+            return procedures
+
+        logger.info(f"Getting details for {len(remaining)} procedures in batch")
+
+        document_task = self.document_agent.get_procedure_details_batch(session, remaining)
+        location_tasks = [self.office_directory.resolve(session, p) for p in remaining]
+
+        results = await asyncio.gather(document_task, *location_tasks, return_exceptions=True)
+
+        if isinstance(results[0], Exception):
+            logger.error(f"Document Agent batch failed: {results[0]}")
+
+        for procedure, office in zip(remaining, results[1:]):
+            if isinstance(office, Exception):
+                logger.error(f"Location Agent failed: {office}")
+            else:
+                procedure.office = office
+
+        return procedures
+
+    def detail_batch_size(self) -> int:
+        """詳細情報を一括取得する際の件数"""
+        return self.document_agent.batch_size()
+
+    async def generate_timeline(
+        self, session: Session, procedures: List[ProcedureSummary]
+    ) -> Timeline:
         """
         タイムラインを生成します。
 
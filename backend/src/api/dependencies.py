@@ -1,18 +1,30 @@
 """FastAPI 依存性注入"""
 
+import hmac
 from functools import lru_cache
+from typing import Optional
+from fastapi import Header, HTTPException, Request
 from core.config import settings
 
 
 @lru_cache()
 def _get_firestore_service_singleton():
     """Firestore サービスのシングルトンを取得"""
-    if settings.MOCK_MODE:
+    backend = settings.STORAGE_BACKEND or ("memory" if settings.MOCK_MODE else "firestore")
+    if backend == "memory":
         from services.mock_firestore_service import InMemoryFirestoreService
         return InMemoryFirestoreService(collection_name=settings.FIRESTORE_COLLECTION)
+    elif backend == "sqlite":
+        from services.sqlite_store import SQLiteFirestoreService
+        return SQLiteFirestoreService(
+            path=settings.SQLITE_PATH, pool_size=settings.SQLITE_POOL_SIZE
+        )
     else:
         from services.firestore_service import FirestoreService
-        return FirestoreService(collection_name=settings.FIRESTORE_COLLECTION)
+        return FirestoreService(
+            collection_name=settings.FIRESTORE_COLLECTION,
+            offices_collection=settings.FIRESTORE_OFFICES_COLLECTION,
+        )
 
 
 def get_firestore_service():
@@ -20,18 +32,76 @@ def get_firestore_service():
     return _get_firestore_service_singleton()
 
 
+@lru_cache()
+def _get_session_cache_singleton():
+    """セッションキャッシュのシングルトンを取得（全リクエストで共有）"""
+    from services.session_cache import SessionCache
+    return SessionCache(
+        max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+        max_bytes=settings.SESSION_CACHE_MAX_BYTES,
+        revalidate_seconds=settings.SESSION_CACHE_REVALIDATE_SECONDS,
+    )
+
+
+@lru_cache()
+def _get_completion_write_buffer_singleton():
+    """完了状態の書き込みバッファのシングルトンを取得（ウィンドウ 0 で無効）"""
+    if settings.COMPLETION_WRITE_WINDOW_SECONDS <= 0:
+        return None
+    from services.write_buffer import CompletionWriteBuffer
+    return CompletionWriteBuffer(
+        store=get_firestore_service(),
+        window_seconds=settings.COMPLETION_WRITE_WINDOW_SECONDS,
+        max_batch=settings.COMPLETION_WRITE_MAX_BATCH,
+        cache=_get_session_cache_singleton(),
+    )
+
+
+def get_completion_write_buffer():
+    """完了状態の書き込みバッファを取得（無効の場合は None）"""
+    return _get_completion_write_buffer_singleton()
+
+
 def get_session_service():
     """セッションサービスを取得"""
     from services.session_service import SessionService
     firestore = get_firestore_service()
-    return SessionService(firestore=firestore)
+    return SessionService(
+        firestore=firestore,
+        cache=_get_session_cache_singleton(),
+        write_buffer=get_completion_write_buffer(),
+    )
 
 
-def get_root_agent():
-    """Root Agent を取得"""
-    if settings.MOCK_MODE:
-        from agents.mock_root_agent import MockRootAgent
-        return MockRootAgent()
-    else:
-        from agents.root_agent import RootAgent
-        return RootAgent()
+def get_agent_registry(request: Request):
+    """lifespan で初期化したエージェントレジストリを取得"""
+    return request.app.state.agent_registry
+
+
+def get_root_agent(request: Request):
+    """Root Agent を取得（アプリケーション全体で共有）"""
+    return get_agent_registry(request).root_agent
+
+
+def get_detail_prefetcher(request: Request):
+    """手続き詳細の先読みパイプラインを取得"""
+    return get_agent_registry(request).prefetcher
+
+
+def require_metrics_token(authorization: Optional[str] = Header(default=None)) -> None:
+    """
+    /metrics の認証（Authorization: Bearer <METRICS_TOKEN>）
+
+    METRICS_TOKEN が空の場合はエンドポイント自体を公開しない（404）
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "NOT_FOUND", "message": "Not Found"},
+        )
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if authorization is None or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(
+            status_code=401,
+            detail={"code": "UNAUTHORIZED", "message": "メトリクスの認証に失敗しました"},
+        )
@@ -2,6 +2,7 @@
 
 import logging
 from fastapi import APIRouter, HTTPException, Depends
+from core.exceptions import ServiceOverloadedError
 from models.requests import ChatRequest
 from models.responses import ChatResponse, ChatResponseData
 from services.session_service import SessionService
@@ -22,7 +23,10 @@ async def chat(
 ):
     """チャットメッセージを送信して回答を取得"""
     try:
-        session = await session_service.get_session(session_id)
+        # 進捗はセッションの集計を使い、手続きは概要フィールドのみ読む
+        session, procedures = await session_service.get_session_with_procedures(
+            session_id, summary=True
+        )
         if not session:
             raise HTTPException(
                 status_code=404,
@@ -32,8 +36,6 @@ async def chat(
                 },
             )
 
-        procedures = await session_service.get_procedures(session_id)
-
         result = await root_agent.generate_chat_reply(
             session, request.message, procedures
         )
@@ -44,7 +46,7 @@ async def chat(
                 suggested_questions=result.get("suggested_questions", []),
             )
         )
-    except HTTPException:
+    except (HTTPException, ServiceOverloadedError):
         raise
     except Exception as e:
         logger.exception("Failed to generate chat reply")
@@ -2,6 +2,7 @@
 
 import logging
 from fastapi import APIRouter, HTTPException, Depends
+from core.exceptions import ServiceOverloadedError
 from models.requests import InterviewAnswersRequest
 from models.responses import (
     InterviewQuestionsResponse,
@@ -50,7 +51,7 @@ async def get_interview_questions(
                 estimated_time=estimated_time,
             )
         )
-    except HTTPException:
+    except (HTTPException, ServiceOverloadedError):
         raise
     except Exception as e:
         logger.exception("Failed to generate interview questions")
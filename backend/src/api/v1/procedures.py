@@ -1,8 +1,12 @@
 """手続き関連 API エンドポイント"""
 
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from core.exceptions import ServiceOverloadedError
 from models.requests import UpdateProcedureRequest
 from models.responses import (
     ProcedureListResponse,
@@ -11,21 +15,27 @@ from models.responses import (
     ProcedureUpdateResponse,
     ProcedureUpdateData,
 )
-from models.domain import ProcedureCategory, ProcedurePriority
+from models.domain import ProcedureCategory, ProcedurePriority, Session
 from services.session_service import SessionService
+from services.detail_prefetcher import DetailPrefetcher
 from agents.root_agent import RootAgent
-from api.dependencies import get_session_service, get_root_agent
+from api.dependencies import get_session_service, get_root_agent, get_detail_prefetcher
+from utils.cursor import decode_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# ストリーミング生成時に何件ごとに保存するか
+PROCEDURE_STREAM_BATCH_SIZE = 5
+
 
 @router.post("/sessions/{session_id}/procedures", response_model=ProcedureListResponse)
 async def generate_procedures(
     session_id: str,
     session_service: SessionService = Depends(get_session_service),
     root_agent: RootAgent = Depends(get_root_agent),
+    prefetcher: DetailPrefetcher = Depends(get_detail_prefetcher),
 ):
     """手続きリストを生成"""
     try:
@@ -56,6 +66,9 @@ async def generate_procedures(
         # 手続きをサブコレクションに保存
         await session_service.add_procedures(session_id, procedures)
 
+        # 優先度の高い手続きの詳細をバックグラウンドで先読み
+        prefetcher.schedule(session, procedures, session_service)
+
         return ProcedureListResponse(
             data=ProcedureListData(
                 procedures=procedures,
@@ -63,7 +76,7 @@ async def generate_procedures(
                 completed_count=sum(1 for p in procedures if p.is_completed),
             )
         )
-    except HTTPException:
+    except (HTTPException, ServiceOverloadedError):
         raise
     except Exception as e:
         logger.exception("Failed to generate procedures")
@@ -76,18 +89,157 @@ async def generate_procedures(
         )
 
 
+@router.post("/sessions/{session_id}/procedures/stream")
+async def stream_procedures(
+    session_id: str,
+    request: Request,
+    session_service: SessionService = Depends(get_session_service),
+    root_agent: RootAgent = Depends(get_root_agent),
+    prefetcher: DetailPrefetcher = Depends(get_detail_prefetcher),
+):
+    """
+    手続きリストをストリーミング生成
+
+    既定は NDJSON（1行1イベント）。Accept: text/event-stream の場合は SSE で返します。
+    イベントは procedure（手続き1件）、done（完了）、error（失敗）の3種類です。
+    """
+    try:
+        # セッション取得
+        session = await session_service.get_session(session_id)
+        if not session:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "code": "SESSION_NOT_FOUND",
+                    "message": "セッションが見つかりません",
+                },
+            )
+
+        # インタビューが完了していることを確認
+        if not session.interview:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "INTERVIEW_NOT_COMPLETED",
+                    "message": "インタビューが完了していません",
+                },
+            )
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Failed to start procedure stream")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "code": "DATABASE_ERROR",
+                "message": "セッション取得に失敗しました",
+            },
+        )
+
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        _procedure_events(session, session_service, root_agent, prefetcher, use_sse),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _procedure_events(
+    session: Session,
+    session_service: SessionService,
+    root_agent: RootAgent,
+    prefetcher: DetailPrefetcher,
+    use_sse: bool,
+) -> AsyncIterator[str]:
+    """生成された手続きをイベントとして送出し、小分けに保存する"""
+    procedures = []
+    pending = []
+
+    try:
+        async for procedure in root_agent.stream_procedures(session):
+            procedures.append(procedure)
+            pending.append(procedure)
+            yield _format_event(
+                "procedure", procedure.model_dump(by_alias=True, mode="json"), use_sse
+            )
+
+            if len(pending) >= PROCEDURE_STREAM_BATCH_SIZE:
+                await session_service.save_procedures_chunk(session.session_id, pending)
+                pending = []
+
+        if pending:
+            await session_service.save_procedures_chunk(session.session_id, pending)
+        await session_service.complete_procedures(session.session_id, procedures)
+        prefetcher.schedule(session, procedures, session_service)
+
+        yield _format_event(
+            "done",
+            {
+                "totalCount": len(procedures),
+                "completedCount": sum(1 for p in procedures if p.is_completed),
+            },
+            use_sse,
+        )
+    except Exception:
+        logger.exception("Failed to stream procedures")
+        yield _format_event(
+            "error",
+            {"code": "AI_SERVICE_ERROR", "message": "手続き生成に失敗しました"},
+            use_sse,
+        )
+
+
+def _format_event(event: str, data: dict, use_sse: bool) -> str:
+    """イベントを SSE または NDJSON の1レコードに整形"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if use_sse:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"type": event, "data": data}, ensure_ascii=False) + "\n"
+
+
 @router.get("/sessions/{session_id}/procedures", response_model=ProcedureListResponse)
 async def get_procedures(
     session_id: str,
     category: Optional[str] = None,
     priority: Optional[str] = None,
     completed: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
     session_service: SessionService = Depends(get_session_service),
+    prefetcher: DetailPrefetcher = Depends(get_detail_prefetcher),
 ):
-    """手続きリストを取得"""
+    """
+    手続きリストを取得
+
+    絞り込みはデータストアのクエリで行い、期限日順に返します。
+    limit を指定した場合は nextCursor を次の cursor に渡して続きを取得します。
+    """
     try:
-        # セッション取得
-        session = await session_service.get_session(session_id)
+        start_after = None
+        if cursor:
+            try:
+                start_after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "code": "INVALID_CURSOR",
+                        "message": "カーソルが不正です",
+                    },
+                )
+
+        # セッションと手続き（概要のみ）を並行取得
+        session, (procedures, next_cursor) = await asyncio.gather(
+            session_service.get_session(session_id),
+            session_service.query_procedures(
+                session_id,
+                category=category,
+                priority=priority,
+                completed=completed,
+                limit=limit,
+                start_after=start_after,
+            ),
+        )
         if not session:
             raise HTTPException(
                 status_code=404,
@@ -97,22 +249,18 @@ async def get_procedures(
                 },
             )
 
-        # 手続き取得
-        procedures = await session_service.get_procedures(session_id)
-
-        # フィルタリング
-        if category:
-            procedures = [p for p in procedures if p.category.value == category]
-        if priority:
-            procedures = [p for p in procedures if p.priority.value == priority]
-        if completed is not None:
-            procedures = [p for p in procedures if p.is_completed == completed]
+        # 件数はページではなく条件に一致する全体（セッションの進捗集計から）
+        total_count, completed_count = await session_service.count_procedures(
+            session, category=category, priority=priority, completed=completed
+        )
+        prefetcher.touch(session_id)
 
         return ProcedureListResponse(
             data=ProcedureListData(
                 procedures=procedures,
-                total_count=len(procedures),
-                completed_count=sum(1 for p in procedures if p.is_completed),
+                total_count=total_count,
+                completed_count=completed_count,
+                next_cursor=next_cursor,
             )
         )
     except HTTPException:
@@ -137,6 +285,7 @@ async def get_procedure_detail(
     procedure_id: str,
     session_service: SessionService = Depends(get_session_service),
     root_agent: RootAgent = Depends(get_root_agent),
+    prefetcher: DetailPrefetcher = Depends(get_detail_prefetcher),
 ):
     """手続き詳細を取得"""
     try:
@@ -162,6 +311,12 @@ async def get_procedure_detail(
                 },
             )
 
+        # 先読み中であれば完了を待つ
+        if not procedure.documents:
+            prefetched = await prefetcher.wait_for(session_id, procedure_id)
+            if prefetched and prefetched.documents:
+                procedure = prefetched
+
         # 詳細情報が未取得の場合は生成
         if not procedure.documents:
             procedure = await root_agent.get_procedure_detail(session, procedure)
@@ -195,9 +350,8 @@ async def update_procedure(
 ):
     """手続きの完了状態を更新"""
     try:
-        # セッション取得
-        session = await session_service.get_session(session_id)
-        if not session:
+        # セッションの存在確認（書き込みバッファは書き出さない）
+        if not await session_service.session_exists(session_id):
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -206,9 +360,11 @@ async def update_procedure(
                 },
             )
 
-        # 手続き取得
-        procedure = await session_service.get_procedure(session_id, procedure_id)
-        if not procedure:
+        # 完了状態を更新し、更新後の手続きをそのまま受け取る
+        updated_procedure = await session_service.update_procedure_completion(
+            session_id, procedure_id, request.is_completed, return_updated=True
+        )
+        if not updated_procedure:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -217,14 +373,6 @@ async def update_procedure(
                 },
             )
 
-        # 完了状態を更新
-        await session_service.update_procedure_completion(
-            session_id, procedure_id, request.is_completed
-        )
-
-        # 更新後の手続きを取得
-        updated_procedure = await session_service.get_procedure(session_id, procedure_id)
-
         return ProcedureUpdateResponse(
             data=ProcedureUpdateData(
                 id=updated_procedure.id,
@@ -1,9 +1,13 @@
 """タイムライン関連 API エンドポイント"""
 
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from models.responses import TimelineResponse, TimelineData
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse, Response
+from core.metrics import metrics
+from models.responses import TimelineResponse
 from services.session_service import SessionService
+from services.timeline_view import etag_matches, timeline_etag
 from agents.root_agent import RootAgent
 from api.dependencies import get_session_service, get_root_agent
 
@@ -15,12 +19,17 @@ router = APIRouter()
 @router.get("/sessions/{session_id}/timeline", response_model=TimelineResponse)
 async def get_timeline(
     session_id: str,
+    if_none_match: Optional[str] = Header(None),
     session_service: SessionService = Depends(get_session_service),
     root_agent: RootAgent = Depends(get_root_agent),
 ):
-    """タイムラインを取得"""
+    """
+    タイムラインを取得
+
+    セッションのバージョンを ETag として返し、If-None-Match が一致すれば 304 を返します。
+    実体化したタイムラインが最新であればそのまま返し、古い場合のみ再生成して保存します。
+    """
     try:
-        # セッション取得
         session = await session_service.get_session(session_id)
         if not session:
             raise HTTPException(
@@ -31,27 +40,29 @@ async def get_timeline(
                 },
             )
 
-        # 手続き取得
-        procedures = await session_service.get_procedures(session_id)
+        headers = {"ETag": timeline_etag(session), "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, headers["ETag"]):
+            metrics.increment("timeline_not_modified_total")
+            return Response(status_code=304, headers=headers)
 
-        if not procedures:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "code": "PROCEDURES_NOT_GENERATED",
-                    "message": "手続きが生成されていません",
-                },
-            )
+        timeline = await session_service.get_timeline_view(session)
+        if timeline is None:
+            procedures = await session_service.get_procedure_summaries(session_id)
+            if not procedures:
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "code": "PROCEDURES_NOT_GENERATED",
+                        "message": "手続きが生成されていません",
+                    },
+                )
 
-        # Root Agent でタイムライン生成
-        timeline = await root_agent.generate_timeline(session, procedures)
+            # Root Agent でタイムライン生成し、バージョン付きで保存
+            generated = await root_agent.generate_timeline(session, procedures)
+            timeline = await session_service.save_timeline_view(session, generated)
 
-        return TimelineResponse(
-            data=TimelineData(
-                timeline=timeline.items,
-                milestones=timeline.milestones,
-            )
-        )
+        # 保存済みの JSON（TimelineData と同じ形）をそのまま返す
+        return JSONResponse(content={"data": timeline}, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
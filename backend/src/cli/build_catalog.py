@@ -0,0 +1,145 @@
+"""
+手続きカタログのバッチ生成
+
+引越し元・引越し先の組み合わせとインタビューフラグごとに手続きリストと
+詳細情報を生成し、PROCEDURE_CATALOG_PATH に保存します。
+既存のカタログに追記するため、途中で中断しても再実行で続きから生成できます。
+
+    cd src
+    python -m cli.build_catalog --pair 東京都/渋谷区:神奈川県/横浜市 --flags all
+    python -m cli.build_catalog --pairs-file pairs.txt --flags 0,1,5
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from core.config import settings
+from core.logging import setup_logging
+from models.domain import Location, Session
+from services.municipalities import normalize_location
+from services.procedure_catalog import (
+    ALL_FLAGS,
+    ProcedureCatalog,
+    detail_key,
+    interview_from_flags,
+    procedure_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_location(value: str) -> Location:
+    """「都道府県/市区町村」形式をパース（セッションと同じく正規化）"""
+    prefecture, _, city = value.partition("/")
+    return normalize_location(Location(prefecture=prefecture, city=city))
+
+
+def parse_pair(value: str) -> Tuple[Location, Location]:
+    """「引越し元:引越し先」形式をパース"""
+    move_from, _, move_to = value.partition(":")
+    return parse_location(move_from), parse_location(move_to)
+
+
+def parse_flags(value: str) -> List[int]:
+    """フラグ指定（all またはカンマ区切り）をパース"""
+    if value == "all":
+        return list(range(ALL_FLAGS + 1))
+    return [int(v) for v in value.split(",")]
+
+
+def create_root_agent():
+    """設定に応じた Root Agent を生成（カタログ自身は参照しない）"""
+    if settings.MOCK_MODE:
+        from agents.mock_root_agent import MockRootAgent
+
+        return MockRootAgent()
+
+    from agents.root_agent import RootAgent
+    from services.llm_cache import create_llm_cache
+    from services.vertex_ai_service import VertexAIService
+
+    return RootAgent(vertex_ai=VertexAIService(cache=create_llm_cache()))
+
+
+async def build(
+    pairs: List[Tuple[Location, Location]],
+    flags_list: List[int],
+    output: str,
+    concurrency: int,
+) -> None:
+    catalog = ProcedureCatalog.load(output)
+    root_agent = create_root_agent()
+    semaphore = asyncio.Semaphore(concurrency)
+    move_date = datetime.utcnow() + timedelta(days=60)
+
+    async def fill_detail(session: Session, procedure) -> None:
+        if detail_key(session.move_to, procedure.title) in catalog.details:
+            return
+        async with semaphore:
+            detailed = await root_agent.get_procedure_detail(session, procedure)
+        catalog.add_detail(session, detailed)
+
+    for move_from, move_to in pairs:
+        for flags in flags_list:
+            session = Session(
+                move_from=move_from,
+                move_to=move_to,
+                move_date=move_date,
+                interview=interview_from_flags(flags),
+            )
+            if procedure_key(session) in catalog.procedures:
+                continue
+
+            start = time.perf_counter()
+            async with semaphore:
+                procedures = await root_agent.generate_procedures(session)
+            catalog.add_procedures(session, procedures)
+            await asyncio.gather(*(fill_detail(session, p) for p in procedures))
+
+            # 1組ごとに保存して中断に備える
+            catalog.save(output)
+            logger.info(
+                f"Cataloged {procedure_key(session)}: {len(procedures)} procedures "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+    logger.info(
+        f"Catalog written to {output}: {len(catalog.procedures)} procedure sets, "
+        f"{len(catalog.details)} details"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="手続きカタログをバッチ生成します")
+    parser.add_argument("--pair", action="append", default=[], help="東京都/渋谷区:神奈川県/横浜市")
+    parser.add_argument("--pairs-file", help="1行1組の引越し元:引越し先ファイル")
+    parser.add_argument("--flags", default="0", help="インタビューフラグ（all または 0,1,5）")
+    parser.add_argument("--output", default=settings.PROCEDURE_CATALOG_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    setup_logging(log_level=settings.LOG_LEVEL)
+
+    pair_values = list(args.pair)
+    if args.pairs_file:
+        with open(args.pairs_file, encoding="utf-8") as f:
+            pair_values.extend(line.strip() for line in f if line.strip())
+    if not pair_values:
+        parser.error("--pair または --pairs-file を指定してください")
+
+    asyncio.run(
+        build(
+            [parse_pair(v) for v in pair_values],
+            parse_flags(args.flags),
+            args.output,
+            args.concurrency,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+全国地方公共団体コード表の生成
+
+総務省の「全国地方公共団体コード」一覧を CSV で保存したもの（列: 団体コード,
+都道府県名（漢字）, 市区町村名（漢字）, ...）から data/municipalities.json を生成します。
+市区町村名が空の行は都道府県として扱います。
+
+    cd src
+    python -m cli.build_municipalities --csv 000730858.csv --data-version 2026-10
+"""
+
+import argparse
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Tuple
+
+from core.config import settings
+from core.logging import setup_logging
+from services.municipalities import BUNDLED_MUNICIPALITIES_PATH, MUNICIPALITIES_VERSION
+
+logger = logging.getLogger(__name__)
+
+NOTE = (
+    "全国地方公共団体コード（JIS X 0402、検査数字付き6桁）。"
+    "総務省の一覧（CSV）から python -m cli.build_municipalities で生成。"
+)
+
+
+def read_codes(path: str, encoding: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """CSV から (都道府県コード → 名前, 市区町村コード → 名前) を読み込む"""
+    prefectures: Dict[str, str] = {}
+    municipalities: Dict[str, str] = {}
+    with open(path, encoding=encoding, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or not row[0].strip().isdigit():
+                continue  # 見出し行
+            code, prefecture, city = (value.strip() for value in row[:3])
+            code = code.zfill(6)
+            if city:
+                municipalities[code] = city
+            else:
+                prefectures[code[:2]] = prefecture
+    return prefectures, municipalities
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="全国地方公共団体コード表を生成します")
+    parser.add_argument("--csv", required=True, help="総務省の一覧を CSV で保存したファイル")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV の文字コード（cp932 など）")
+    parser.add_argument("--data-version", required=True, help="データの版（例: 2026-10）")
+    parser.add_argument("--output", default=str(BUNDLED_MUNICIPALITIES_PATH))
+    args = parser.parse_args()
+
+    setup_logging(log_level=settings.LOG_LEVEL)
+    prefectures, municipalities = read_codes(args.csv, args.encoding)
+    data = {
+        "version": MUNICIPALITIES_VERSION,
+        "dataVersion": args.data_version,
+        "note": NOTE,
+        "prefectures": dict(sorted(prefectures.items())),
+        "municipalities": dict(sorted(municipalities.items())),
+    }
+    Path(args.output).write_text(
+        json.dumps(data, ensure_ascii=False, indent=1) + "\n", encoding="utf-8"
+    )
+    logger.info(
+        f"Wrote {len(prefectures)} prefectures and {len(municipalities)} municipalities "
+        f"to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
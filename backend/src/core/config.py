@@ -19,11 +19,70 @@ class Settings(BaseSettings):
     # Google Cloud
     GOOGLE_CLOUD_PROJECT: str = ""
     FIRESTORE_COLLECTION: str = "sessions"
+    FIRESTORE_OFFICES_COLLECTION: str = "offices"
+
+    # データストア（firestore / memory / sqlite、空なら MOCK_MODE に従う）
+    STORAGE_BACKEND: str = ""
+    SQLITE_PATH: str = "data/tetsunavi.db"
+    SQLITE_POOL_SIZE: int = 4
+
+    # /metrics の認証トークン（空の場合はエンドポイントを公開しない）
+    METRICS_TOKEN: str = ""
 
     # Vertex AI
     VERTEX_AI_LOCATION: str = "asia-northeast1"
     VERTEX_AI_MODEL: str = "gemini-2.0-flash-001"
 
+    # Vertex AI 流量制御（同時実行数は AIMD で調整、TPM 0 で無制限）
+    VERTEX_AI_INITIAL_CONCURRENCY: int = 8
+    VERTEX_AI_MAX_CONCURRENCY: int = 32
+    VERTEX_AI_TOKENS_PER_MINUTE: int = 0
+    VERTEX_AI_QUEUE_TIMEOUT_SECONDS: float = 10.0
+
+    # ヘッジリクエスト（p95 超過で2本目を発行）と詳細取得の期限
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    DOCUMENT_AGENT_DEADLINE_SECONDS: float = 8.0
+    LOCATION_AGENT_DEADLINE_SECONDS: float = 6.0
+
+    # LLM レスポンスキャッシュ（memory / redis / none）
+    LLM_CACHE_BACKEND: str = "memory"
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # セッションのプロセス内キャッシュ（保持期間後は updatedAt で照合）
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+    SESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    SESSION_CACHE_REVALIDATE_SECONDS: float = 60.0
+
+    # 完了状態の書き込みバッファ（ウィンドウ内の更新をまとめて書き込む、0 で無効）
+    COMPLETION_WRITE_WINDOW_SECONDS: float = 0.25
+    COMPLETION_WRITE_MAX_BATCH: int = 200
+
+    # スケジューリング（1日に手続きに使える時間と、窓口1か所の訪問ごとの移動・待ち時間）
+    SCHEDULE_DAILY_BUDGET_MINUTES: int = 240
+    SCHEDULE_VISIT_OVERHEAD_MINUTES: int = 60
+
+    # 事前計算した手続きカタログ（python -m cli.build_catalog で生成）
+    PROCEDURE_CATALOG_PATH: str = "data/procedure_catalog.json"
+
+    # 窓口ディレクトリの保持期間
+    OFFICE_DIRECTORY_TTL_SECONDS: int = 30 * 86400
+
+    # 市区町村ごとの窓口の受付時間（空の場合は同梱の src/data/office_hours.json）
+    OFFICE_HOURS_PATH: str = ""
+
+    # 全国地方公共団体コード表（空の場合は同梱の src/data/municipalities.json）
+    MUNICIPALITIES_PATH: str = ""
+
+    # 手続き詳細の先読み
+    PREFETCH_TOP_N: int = 10
+    PREFETCH_CONCURRENCY: int = 4
+    PREFETCH_IDLE_TIMEOUT_SECONDS: int = 600
+    # 詳細画面が先読みの完了を待つ上限（過ぎたらその手続きだけ生成）
+    PREFETCH_WAIT_TIMEOUT_SECONDS: float = 5.0
+
     # Google Maps API
     GOOGLE_MAPS_API_KEY: str = ""
 
@@ -31,6 +31,19 @@ class AIServiceError(AppError):
         super().__init__(message, code="AI_SERVICE_ERROR")
 
 
+class ServiceOverloadedError(AIServiceError):
+    """AI サービスの処理能力超過（負荷制限による拒否）"""
+
+    def __init__(
+        self,
+        message: str = "現在混み合っています。しばらくしてから再度お試しください",
+        retry_after: float = 5.0,
+    ):
+        super().__init__(message)
+        self.code = "AI_SERVICE_OVERLOADED"
+        self.retry_after = retry_after
+
+
 class DatabaseError(AppError):
     """データベースエラー"""
 
@@ -0,0 +1,74 @@
+"""プロセス内メトリクス"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+class Metrics:
+    """カウンターとゲージを保持するシンプルなメトリクスレジストリ"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """カウンターを加算"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """ゲージを設定"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """観測値を記録（直近 1024 件からパーセンタイルを算出）"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=1024)
+            samples.append(value)
+
+    def percentiles(self, name: str) -> Dict[str, float]:
+        """観測値の p50 / p95 / p99"""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return {}
+        last = len(samples) - 1
+        return {
+            "count": len(samples),
+            "p50": samples[int(last * 0.50)],
+            "p95": samples[int(last * 0.95)],
+            "p99": samples[int(last * 0.99)],
+        }
+
+    def get(self, name: str) -> float:
+        """カウンターまたはゲージの現在値を取得"""
+        with self._lock:
+            return self._counters.get(name, self._gauges.get(name, 0))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """全メトリクスのスナップショットを取得"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            names = list(self._samples)
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {name: self.percentiles(name) for name in names},
+        }
+
+    def reset(self) -> None:
+        """全メトリクスをリセット（ベンチマーク用）"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._samples.clear()
+
+
+metrics = Metrics()
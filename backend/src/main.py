@@ -1,7 +1,8 @@
 """FastAPI アプリケーションエントリーポイント"""
 
 import logging
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -11,19 +12,48 @@ from slowapi.errors import RateLimitExceeded
 from core.config import settings
 from core.logging import setup_logging
 from core.middleware import RequestLoggingMiddleware
-from core.exceptions import AppError
+from core.exceptions import AppError, ServiceOverloadedError
+from core.metrics import metrics
+from agents.registry import AgentRegistry
+from api.dependencies import (
+    get_completion_write_buffer,
+    get_firestore_service,
+    require_metrics_token,
+)
 from api.v1 import sessions, interview, procedures, timeline, chat
 
 # ロギング設定
 setup_logging(log_level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションのライフサイクル管理"""
+    # エージェントと Vertex AI クライアントはプロセス起動時に1度だけ生成
+    store = get_firestore_service()
+    app.state.agent_registry = AgentRegistry.create(store=store)
+    try:
+        yield
+    finally:
+        await app.state.agent_registry.close()
+        # バッファ中の完了状態をストアを閉じる前に書き出す
+        write_buffer = get_completion_write_buffer()
+        if write_buffer is not None:
+            await write_buffer.close()
+        # SQLite ストアは接続を閉じて WAL をチェックポイントする
+        close_store = getattr(store, "close", None)
+        if close_store is not None:
+            await close_store()
+
+
 # FastAPI アプリケーション
 app = FastAPI(
     title=settings.APP_NAME,
     version="1.0.0",
     description="ライフイベント×行政手続きAIエージェント",
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
 # レート制限
@@ -68,6 +98,22 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 
+@app.exception_handler(ServiceOverloadedError)
+async def overloaded_error_handler(request: Request, exc: ServiceOverloadedError):
+    """負荷遮断は 503 と Retry-After で返す"""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        content={
+            "error": {
+                "code": exc.code,
+                "message": exc.message,
+                "request_id": getattr(request.state, "request_id", None),
+            }
+        },
+    )
+
+
 @app.exception_handler(AppError)
 async def app_error_handler(request: Request, exc: AppError):
     """アプリケーションエラーハンドラー"""
@@ -114,6 +160,13 @@ async def health_check():
     return {"status": "ok", "service": settings.APP_NAME}
 
 
+# メトリクス（内部向け、METRICS_TOKEN で認証）
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def get_metrics():
+    """プロセス内メトリクスを取得"""
+    return metrics.snapshot()
+
+
 # ルート
 @app.get("/")
 async def root():
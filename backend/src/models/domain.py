@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 import uuid
 
@@ -13,6 +13,11 @@ class Location(BaseModel):
 
     prefecture: str = Field(..., min_length=1, max_length=10)
     city: str = Field(..., min_length=1, max_length=50)
+    # 全国地方公共団体コード（services.municipalities で解決できた場合）
+    code: Optional[str] = Field(default=None, pattern=r"^\d{6}$")
+
+    # 正規化済みの Location はコードごとに共有するため変更不可
+    model_config = ConfigDict(frozen=True)
 
 
 # セッション型
@@ -34,6 +39,25 @@ class SessionMeta(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
+class ProgressCount(BaseModel):
+    """手続き件数と完了件数"""
+
+    total: int = 0
+    completed: int = 0
+
+
+class SessionProgress(ProgressCount):
+    """手続きの進捗集計（手続きの保存・完了更新時にセッション文書上で加算）"""
+
+    by_category: Dict[str, ProgressCount] = Field(alias="byCategory", default_factory=dict)
+    by_priority: Dict[str, ProgressCount] = Field(alias="byPriority", default_factory=dict)
+    by_deadline_type: Dict[str, ProgressCount] = Field(
+        alias="byDeadlineType", default_factory=dict
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class Session(BaseModel):
     """セッション"""
 
@@ -48,6 +72,8 @@ class Session(BaseModel):
 
     interview: Optional["Interview"] = None
 
+    progress: SessionProgress = Field(default_factory=SessionProgress)
+
     meta: SessionMeta = Field(default_factory=SessionMeta)
 
     model_config = ConfigDict(populate_by_name=True)
@@ -201,8 +227,8 @@ class RelatedLink(BaseModel):
     url: str
 
 
-class Procedure(BaseModel):
-    """手続き"""
+class ProcedureSummary(BaseModel):
+    """手続きの概要（一覧・タイムライン表示用、詳細情報を含まない）"""
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -214,6 +240,17 @@ class Procedure(BaseModel):
     # 訪問先（グルーピング用）
     visit_location: Optional[str] = Field(alias="visitLocation", default=None)
 
+    dependencies: List[str] = []
+
+    is_completed: bool = Field(alias="isCompleted", default=False)
+    completed_at: Optional[datetime] = Field(alias="completedAt", default=None)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class Procedure(ProcedureSummary):
+    """手続き"""
+
     # 詳細情報（lazy load）
     documents: Optional[List[Document]] = None
     office: Optional[Office] = None
@@ -221,15 +258,23 @@ class Procedure(BaseModel):
     notes: Optional[List[str]] = None
     related_links: Optional[List[RelatedLink]] = Field(alias="relatedLinks", default=None)
 
-    dependencies: List[str] = []
-
-    is_completed: bool = Field(alias="isCompleted", default=False)
-    completed_at: Optional[datetime] = Field(alias="completedAt", default=None)
-
     created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
     updated_at: datetime = Field(default_factory=datetime.utcnow, alias="updatedAt")
 
-    model_config = ConfigDict(populate_by_name=True)
+
+# 概要の読み込みで取得するフィールド（Firestore の select() 用）
+PROCEDURE_SUMMARY_FIELDS = [
+    field.alias or name for name, field in ProcedureSummary.model_fields.items()
+]
+
+# 手続き一覧の並び順（期限日、同日は ID 順）
+PROCEDURE_ORDER_FIELDS = ["deadline.absoluteDate", "id"]
+
+
+def procedure_order_key(procedure: ProcedureSummary) -> list:
+    """並び順のキー（保存形式と同じ JSON 表現。カーソルに使用）"""
+    absolute_date = procedure.deadline.absolute_date
+    return [absolute_date.isoformat() if absolute_date else None, procedure.id]
 
 
 # タイムライン型
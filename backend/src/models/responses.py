@@ -7,6 +7,7 @@ from models.domain import (
     SessionStatus,
     Question,
     Procedure,
+    ProcedureSummary,
     TimelineItem,
     Milestone,
 )
@@ -76,9 +77,10 @@ class InterviewAnswersResponse(BaseModel):
 class ProcedureListData(BaseModel):
     """手続きリストデータ"""
 
-    procedures: List[Procedure]
+    procedures: List[ProcedureSummary]
     total_count: int = Field(alias="totalCount")
     completed_count: int = Field(alias="completedCount")
+    next_cursor: Optional[str] = Field(alias="nextCursor", default=None)
 
     model_config = ConfigDict(populate_by_name=True)
 
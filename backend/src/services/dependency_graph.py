@@ -0,0 +1,139 @@
+"""手続きの依存関係グラフ
+
+手続き ID で引ける隣接リストを作り、Kahn のアルゴリズム（反復処理）で
+トポロジカル順序を求めます。循環がある場合は循環を構成する手続き ID を返します。
+計算量は O(手続き数 + 依存数) で、再帰を使わないため深い依存の連鎖でも失敗しません。
+
+結果は手続きの集合（ID と依存関係）のバージョンごとにキャッシュし、
+同じ手続きリストに対する検証とスケジューリングで再計算しません。
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, TypeVar
+
+from models.domain import ProcedureSummary
+
+logger = logging.getLogger(__name__)
+
+P = TypeVar("P", bound=ProcedureSummary)
+
+# 手続き集合のバージョン: ((手続きID, (依存先ID, ...)), ...)
+GraphVersion = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True)
+class DependencyGraph:
+    """依存関係グラフの解析結果"""
+
+    # 依存先が先に来る順序（循環がある場合は循環に関わらない手続きのみ）
+    order: Tuple[str, ...]
+    # 循環を構成する手続き ID（依存先の順、循環がなければ空）
+    cycle: Tuple[str, ...]
+
+    @property
+    def is_acyclic(self) -> bool:
+        return not self.cycle
+
+
+def graph_version(procedures: Sequence[ProcedureSummary]) -> GraphVersion:
+    """手続き集合のバージョン（ID と依存関係が同じなら同じ値）"""
+    return tuple((p.id, tuple(p.dependencies)) for p in procedures)
+
+
+def analyze_dependencies(procedures: Sequence[ProcedureSummary]) -> DependencyGraph:
+    """
+    手続きの依存関係を解析します（手続き集合のバージョンごとにキャッシュ）。
+
+    存在しない手続きへの依存は無視します。同じ順位の手続きは入力順を保ちます。
+    同じ ID の手続きが複数ある場合は1つの手続きとして扱い（位置は最初、依存関係は最後のもの。
+    ストアが同じ ID を上書きするのと同じ）、警告ログを出します。
+    """
+    return _analyze(graph_version(procedures))
+
+
+def check_dependencies(procedures: Sequence[ProcedureSummary]) -> bool:
+    """依存関係に循環がないか検証（循環があれば該当する手続き ID を警告ログに出す）"""
+    graph = analyze_dependencies(procedures)
+    if graph.cycle:
+        logger.warning(
+            f"Circular dependency detected: {' -> '.join(graph.cycle + graph.cycle[:1])}"
+        )
+    return graph.is_acyclic
+
+
+def topological_order(procedures: Sequence[P]) -> List[P]:
+    """
+    依存先が先に来るように手続きを並べ替えます。
+
+    Returns:
+        並べ替えた手続きリスト（循環がある場合は元の順序。同じ ID の手続きはまとめて並べる）
+    """
+    graph = analyze_dependencies(procedures)
+    if not graph.is_acyclic:
+        return list(procedures)
+    by_id: Dict[str, List[P]] = {}
+    for procedure in procedures:
+        by_id.setdefault(procedure.id, []).append(procedure)
+    return [p for procedure_id in graph.order for p in by_id[procedure_id]]
+
+
+@lru_cache(maxsize=256)
+def _analyze(version: GraphVersion) -> DependencyGraph:
+    # 同じ ID は1つにまとめる（位置は最初、依存関係は最後のもの）
+    nodes: Dict[str, Tuple[str, ...]] = {}
+    for procedure_id, deps in version:
+        nodes[procedure_id] = deps
+    if len(nodes) < len(version):
+        logger.warning(f"Duplicate procedure ids: {len(version) - len(nodes)} merged")
+    ids = list(nodes)
+    known = set(ids)
+
+    # 依存先 → 依存元 の隣接リストと入次数（重複した依存は1本として扱う）
+    dependents: Dict[str, List[str]] = {procedure_id: [] for procedure_id in ids}
+    dependencies: Dict[str, List[str]] = {}
+    in_degree: Dict[str, int] = {}
+    for procedure_id, deps in nodes.items():
+        unique = [d for d in dict.fromkeys(deps) if d in known]
+        dependencies[procedure_id] = unique
+        in_degree[procedure_id] = len(unique)
+        for dep_id in unique:
+            dependents[dep_id].append(procedure_id)
+
+    queue = deque(procedure_id for procedure_id in ids if in_degree[procedure_id] == 0)
+    order: List[str] = []
+    while queue:
+        procedure_id = queue.popleft()
+        order.append(procedure_id)
+        for dependent in dependents[procedure_id]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                queue.append(dependent)
+
+    if len(order) == len(ids):
+        return DependencyGraph(order=tuple(order), cycle=())
+    return DependencyGraph(order=tuple(order), cycle=_find_cycle(dependencies, in_degree))
+
+
+def _find_cycle(dependencies: Dict[str, List[str]], in_degree: Dict[str, int]) -> Tuple[str, ...]:
+    """
+    Kahn のアルゴリズムで取り残された手続きから循環を1つ取り出す
+
+    取り残された手続きは必ず取り残された依存先を持つため、依存先をたどると循環に行き着きます。
+    """
+    remaining = {procedure_id for procedure_id, degree in in_degree.items() if degree > 0}
+    current = next((procedure_id for procedure_id in in_degree if procedure_id in remaining), None)
+    path: List[str] = []
+    position: Dict[str, int] = {}
+    while current is not None and current not in position:
+        position[current] = len(path)
+        path.append(current)
+        current = next((d for d in dependencies[current] if d in remaining), None)
+    if current is None:
+        # 入次数と依存関係が食い違う場合（通常は起こらない）は循環を特定しない
+        return ()
+    cycle = path[position[current]:]
+    # 依存先の順（a が b に依存 → b が先）で返す
+    return tuple(reversed(cycle))
@@ -0,0 +1,174 @@
+"""手続き詳細のバックグラウンド先読み"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from core.metrics import metrics
+from models.domain import Procedure, ProcedurePriority, Session
+
+logger = logging.getLogger(__name__)
+
+_PRIORITY_ORDER = {
+    ProcedurePriority.HIGH: 0,
+    ProcedurePriority.MEDIUM: 1,
+    ProcedurePriority.LOW: 2,
+}
+
+
+class DetailPrefetcher:
+    """
+    手続きリスト生成後に、優先度の高い手続きの詳細を先に生成して保存します。
+
+    同時実行数はプロセス全体で制限し、一定時間アクセスのないセッションの
+    先読みは打ち切ります。詳細画面が先読み中の手続きを開いた場合は、
+    同じ生成を重複して行わずに先読みの完了を待ちます。待つのは wait_timeout_seconds までで、
+    それを過ぎた場合（他のセッションの先読みの後ろで順番待ちしている場合など）は
+    呼び出し元がその手続きだけを生成します。
+    """
+
+    def __init__(
+        self,
+        root_agent,
+        top_n: int = 10,
+        concurrency: int = 4,
+        idle_timeout_seconds: float = 600,
+        wait_timeout_seconds: float = 5.0,
+    ):
+        self.root_agent = root_agent
+        self.top_n = top_n
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._last_seen: Dict[str, float] = {}
+
+    def schedule(self, session: Session, procedures: List[Procedure], session_service) -> None:
+        """セッションの先読みを開始（実行中の先読みは置き換える）"""
+        session_id = session.session_id
+        self.cancel(session_id)
+
+        targets = sorted(
+            (p for p in procedures if not p.documents),
+            key=lambda p: (
+                _PRIORITY_ORDER[p.priority],
+                p.deadline.absolute_date is None,
+                p.deadline.absolute_date or session.move_date,
+            ),
+        )[: self.top_n]
+        if not targets:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._pending[session_id] = {p.id: loop.create_future() for p in targets}
+        self._last_seen[session_id] = time.monotonic()
+
+        task = asyncio.create_task(self._run(session, targets, session_service))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda t: self._finish(session_id, t))
+        self._update_queue_depth()
+
+        logger.info(f"Prefetching details of {len(targets)} procedures for session {session_id}")
+
+    def touch(self, session_id: str) -> None:
+        """セッションへのアクセスを記録（先読みの継続判定に使用）"""
+        if session_id in self._last_seen:
+            self._last_seen[session_id] = time.monotonic()
+
+    async def wait_for(self, session_id: str, procedure_id: str) -> Optional[Procedure]:
+        """先読み中の手続きがあれば完了を待って返す（対象外・失敗・待機の期限切れは None）"""
+        future = self._pending.get(session_id, {}).get(procedure_id)
+        if future is None:
+            return None
+
+        self.touch(session_id)
+        metrics.increment("detail_prefetch_waits_total")
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.wait_timeout_seconds)
+        except asyncio.TimeoutError:
+            metrics.increment("detail_prefetch_wait_timeouts_total")
+            return None
+
+    def cancel(self, session_id: str) -> None:
+        """セッションの先読みを中止"""
+        task = self._tasks.get(session_id)
+        if task and not task.done():
+            task.cancel()
+            metrics.increment("detail_prefetch_cancelled_sessions_total")
+
+    async def shutdown(self) -> None:
+        """全ての先読みを中止して終了を待つ"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _is_abandoned(self, session_id: str) -> bool:
+        last_seen = self._last_seen.get(session_id, 0)
+        return time.monotonic() - last_seen > self.idle_timeout_seconds
+
+    async def _run(self, session: Session, targets: List[Procedure], session_service) -> None:
+        session_id = session.session_id
+        futures = self._pending[session_id]
+
+        # Document Agent の一括生成に合わせて K 件ずつ処理
+        size = self.root_agent.detail_batch_size()
+        chunks = [targets[i : i + size] for i in range(0, len(targets), size)]
+
+        async def prefetch(chunk: List[Procedure]) -> None:
+            try:
+                async with self._semaphore:
+                    if self._is_abandoned(session_id):
+                        metrics.increment("detail_prefetch_abandoned_total", len(chunk))
+                        return
+
+                    # 詳細画面で既に生成済みのものはスキップ
+                    currents = await asyncio.gather(
+                        *(session_service.get_procedure(session_id, p.id) for p in chunk)
+                    )
+                    remaining = []
+                    for procedure, current in zip(chunk, currents):
+                        if current is None or current.documents:
+                            metrics.increment("detail_prefetch_skipped_total")
+                            futures[procedure.id].set_result(current)
+                        else:
+                            remaining.append(current)
+
+                    if not remaining:
+                        return
+
+                    detailed = await self.root_agent.get_procedure_details_batch(
+                        session, remaining
+                    )
+                    for procedure in detailed:
+                        await session_service.firestore.save_procedure(session_id, procedure)
+                        futures[procedure.id].set_result(procedure)
+
+                metrics.increment("detail_prefetch_completed_total", len(detailed))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.increment("detail_prefetch_failed_total", len(chunk))
+                logger.warning(f"Detail prefetch failed for session {session_id}: {e}")
+            finally:
+                # 待機中の呼び出し元は None を受け取り、自身で生成する
+                for procedure in chunk:
+                    future = futures.pop(procedure.id, None)
+                    if future and not future.done():
+                        future.set_result(None)
+                self._update_queue_depth()
+
+        await asyncio.gather(*(prefetch(chunk) for chunk in chunks))
+
+    def _finish(self, session_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(session_id) is task:
+            del self._tasks[session_id]
+            self._pending.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+        self._update_queue_depth()
+
+    def _update_queue_depth(self) -> None:
+        depth = sum(len(futures) for futures in self._pending.values())
+        metrics.set_gauge("detail_prefetch_queue_depth", depth)
@@ -1,10 +1,28 @@
 """Firestore データアクセスサービス"""
 
 from google.cloud import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 import logging
-from models.domain import Session, Procedure
+from models.domain import (
+    Session,
+    SessionProgress,
+    Procedure,
+    ProcedureSummary,
+    PROCEDURE_ORDER_FIELDS,
+    PROCEDURE_SUMMARY_FIELDS,
+)
+from services.dependency_graph import check_dependencies
+from services.progress import (
+    FieldPathTuple,
+    compute_progress,
+    has_progress,
+    progress_increments,
+)
+from services.session_cache import session_version
+from services.timeline_view import TIMELINE_VIEW_ID, patch_completions
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +30,10 @@ logger = logging.getLogger(__name__)
 class FirestoreService:
     """Firestore データアクセスサービス"""
 
-    def __init__(self, collection_name: str = "sessions"):
+    def __init__(self, collection_name: str = "sessions", offices_collection: str = "offices"):
         self.db = firestore.AsyncClient()
         self.sessions_collection = self.db.collection(collection_name)
+        self.offices_collection = self.db.collection(offices_collection)
 
     async def save_session(self, session: Session) -> None:
         """セッションを Firestore に保存（procedures は除外）"""
@@ -37,6 +56,17 @@ class FirestoreService:
         session_data = doc.to_dict()
         return Session(**session_data)
 
+    async def get_session_version(self, session_id: str) -> Optional[datetime]:
+        """セッションの updatedAt のみを取得（キャッシュの照合用）"""
+        doc = await self.sessions_collection.document(session_id).get(field_paths=["updatedAt"])
+        if not doc.exists:
+            return None
+
+        updated_at = doc.to_dict().get("updatedAt")
+        if isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        return updated_at
+
     async def update_session(self, session_id: str, updates: dict) -> None:
         """セッションを部分的に更新"""
         doc_ref = self.sessions_collection.document(session_id)
@@ -44,27 +74,55 @@ class FirestoreService:
         await doc_ref.update(updates)
 
     async def save_procedure(self, session_id: str, procedure: Procedure) -> None:
-        """手続きをサブコレクションに保存"""
+        """
+        手続きの詳細をサブコレクションに保存
+
+        完了状態は update_procedure_completion だけが更新するため上書きしません
+        （先読み中に完了が切り替わっても巻き戻らず、進捗集計とも整合します）。
+        """
         procedure.updated_at = datetime.utcnow()
 
         procedures_ref = self.sessions_collection.document(session_id).collection("procedures")
         doc_ref = procedures_ref.document(procedure.id)
 
-        procedure_dict = procedure.model_dump(by_alias=True, mode="json")
-        await doc_ref.set(procedure_dict)
+        procedure_dict = procedure.model_dump(
+            by_alias=True, mode="json", exclude={"is_completed", "completed_at"}
+        )
+        await doc_ref.set(procedure_dict, merge=True)
 
     async def save_procedures_batch(self, session_id: str, procedures: List[Procedure]) -> None:
-        """複数の手続きを一括でサブコレクションに保存"""
-        batch = self.db.batch()
-        procedures_ref = self.sessions_collection.document(session_id).collection("procedures")
-
-        for procedure in procedures:
-            procedure.updated_at = datetime.utcnow()
-            doc_ref = procedures_ref.document(procedure.id)
-            procedure_dict = procedure.model_dump(by_alias=True, mode="json")
-            batch.set(doc_ref, procedure_dict)
+        """
+        複数の手続きを一括でサブコレクションに保存
 
-        await batch.commit()
+        既存の文書との差分をセッションの進捗集計に同じトランザクションで加算します。
+        """
+        session_ref = self.sessions_collection.document(session_id)
+        procedures_ref = session_ref.collection("procedures")
+        doc_refs = [procedures_ref.document(p.id) for p in procedures]
+
+        @firestore.async_transactional
+        async def _save(transaction) -> None:
+            existing = []
+            session_data = None
+            async for snapshot in await transaction.get_all([session_ref, *doc_refs]):
+                if not snapshot.exists:
+                    continue
+                if snapshot.reference.path == session_ref.path:
+                    session_data = snapshot.to_dict()
+                else:
+                    existing.append(ProcedureSummary(**snapshot.to_dict()))
+            now = datetime.utcnow()
+            for procedure, doc_ref in zip(procedures, doc_refs):
+                procedure.updated_at = now
+                transaction.set(doc_ref, procedure.model_dump(by_alias=True, mode="json"))
+
+            increments = progress_increments(added=procedures, removed=existing)
+            if increments and session_data is not None:
+                if not has_progress(session_data):
+                    increments = {}  # 集計のないセッションは次の取得時に集計し直す
+                transaction.update(session_ref, _increment_updates(increments))
+
+        await _save(self.db.transaction())
 
     async def get_procedure(self, session_id: str, procedure_id: str) -> Optional[Procedure]:
         """特定の手続きをサブコレクションから取得"""
@@ -91,6 +149,58 @@ class FirestoreService:
 
         return procedures
 
+    async def get_procedure_summaries(self, session_id: str) -> List[ProcedureSummary]:
+        """セッションの全手続きを概要フィールドのみ取得（select() で詳細情報を転送しない）"""
+        procedures_ref = self.sessions_collection.document(session_id).collection("procedures")
+        docs = procedures_ref.select(PROCEDURE_SUMMARY_FIELDS).stream()
+
+        summaries = []
+        async for doc in docs:
+            summaries.append(ProcedureSummary(**doc.to_dict()))
+
+        return summaries
+
+    async def query_procedure_summaries(
+        self,
+        session_id: str,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+        start_after: Optional[list] = None,
+        limit: Optional[int] = None,
+    ) -> List[ProcedureSummary]:
+        """
+        手続きの概要を条件で絞り込み、期限順に取得
+
+        絞り込みは Firestore のクエリで行います（firestore.indexes.json の複合インデックスが必要）。
+
+        Args:
+            session_id: セッションID
+            category: カテゴリ
+            priority: 優先度
+            completed: 完了状態
+            start_after: この並びキー（[期限日, ID]）より後から取得
+            limit: 最大件数
+        """
+        query = self.sessions_collection.document(session_id).collection("procedures")
+        filters = {"category": category, "priority": priority, "isCompleted": completed}
+        for field, value in filters.items():
+            if value is not None:
+                query = query.where(filter=FieldFilter(field, "==", value))
+
+        for field in PROCEDURE_ORDER_FIELDS:
+            query = query.order_by(field)
+        if start_after is not None:
+            query = query.start_after(start_after)
+        if limit is not None:
+            query = query.limit(limit)
+
+        summaries = []
+        async for doc in query.select(PROCEDURE_SUMMARY_FIELDS).stream():
+            summaries.append(ProcedureSummary(**doc.to_dict()))
+
+        return summaries
+
     async def update_procedure(self, session_id: str, procedure_id: str, updates: dict) -> None:
         """手続きを更新（サブコレクション構造のため、トランザクション不要）"""
         doc_ref = (
@@ -102,54 +212,195 @@ class FirestoreService:
         updates["updatedAt"] = datetime.utcnow()
         await doc_ref.update(updates)
 
-    def validate_dependencies(self, procedures: List[Procedure]) -> bool:
+    async def set_procedure_completion(
+        self,
+        session_id: str,
+        procedure_id: str,
+        is_completed: bool,
+        completed_at: Optional[datetime],
+    ) -> Optional[Procedure]:
         """
-        手続きの依存関係を検証し、循環依存がないことを確認します。
-        トポロジカルソートを使用して有向非巡回グラフ（DAG）を検証します。
+        手続きの完了状態をトランザクション内で更新し、更新後の内容を返す
+
+        状態が変わった場合のみ、セッションの進捗集計を同じトランザクションで加算します。
+        手続きが存在しない場合は None を返します。
+        """
+        results, _ = await self._set_completions(
+            session_id, {procedure_id: (is_completed, completed_at)}
+        )
+        data = results.get(procedure_id)
+        return Procedure(**data) if data is not None else None
+
+    async def set_procedure_completions(
+        self, session_id: str, changes: Dict[str, Tuple[bool, Optional[datetime]]]
+    ) -> int:
+        """
+        複数の手続きの完了状態を1トランザクション（1回のコミット）で更新
+
+        Args:
+            session_id: セッションID
+            changes: {手続きID: (完了状態, 完了日時)}
 
         Returns:
-            bool: 依存関係が有効な場合は True、循環依存がある場合は False
-        """
-        # 手続きIDのセット
-        procedure_ids = {p.id for p in procedures}
-
-        # 依存関係の検証（参照先が存在しない場合は警告）
-        for procedure in procedures:
-            for dep_id in procedure.dependencies:
-                if dep_id not in procedure_ids:
-                    logger.warning(
-                        f"Procedure {procedure.id} has invalid dependency: {dep_id}"
-                    )
-
-        # トポロジカルソートで循環依存をチェック
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle(proc_id: str) -> bool:
-            visited.add(proc_id)
-            rec_stack.add(proc_id)
-
-            # 依存先を再帰的にチェック
-            proc = next((p for p in procedures if p.id == proc_id), None)
-            if proc:
-                for dep_id in proc.dependencies:
-                    if dep_id not in procedure_ids:
-                        continue  # 存在しない依存関係はスキップ
-
-                    if dep_id not in visited:
-                        if has_cycle(dep_id):
-                            return True
-                    elif dep_id in rec_stack:
-                        return True
-
-            rec_stack.remove(proc_id)
-            return False
-
-        # 全ての手続きをチェック
-        for procedure in procedures:
-            if procedure.id not in visited:
-                if has_cycle(procedure.id):
-                    logger.error("Circular dependency detected in procedures")
-                    return False
-
-        return True
+            状態が変わった手続きの数（存在しない手続きは無視）
+        """
+        _, changed = await self._set_completions(session_id, changes)
+        return changed
+
+    async def _set_completions(
+        self, session_id: str, changes: Dict[str, Tuple[bool, Optional[datetime]]]
+    ) -> Tuple[Dict[str, dict], int]:
+        """
+        完了状態の更新、進捗集計の加算、実体化したタイムラインの書き換えを1トランザクションで行う
+
+        タイムラインはセッションと同じバージョンの場合のみ書き換えます（古ければ次の取得時に再生成）。
+
+        Returns:
+            ({手続きID: 更新後の文書}, 状態が変わった手続きの数)
+        """
+        session_ref = self.sessions_collection.document(session_id)
+        timeline_ref = self._timeline_ref(session_id)
+        procedures_ref = session_ref.collection("procedures")
+        doc_refs = {procedure_id: procedures_ref.document(procedure_id) for procedure_id in changes}
+
+        @firestore.async_transactional
+        async def _update(transaction) -> Tuple[Dict[str, dict], int]:
+            refs = [session_ref, timeline_ref, *doc_refs.values()]
+            snapshots = {
+                snapshot.reference.path: snapshot
+                async for snapshot in await transaction.get_all(refs)
+            }
+
+            now = datetime.utcnow()
+            results: Dict[str, dict] = {}
+            added, removed = [], []
+            for procedure_id, doc_ref in doc_refs.items():
+                snapshot = snapshots.get(doc_ref.path)
+                if snapshot is None or not snapshot.exists:
+                    continue
+                data = snapshot.to_dict()
+                is_completed, completed_at = changes[procedure_id]
+                if data.get("isCompleted", False) != is_completed:
+                    removed.append(ProcedureSummary(**data))
+                    updates = {
+                        "isCompleted": is_completed,
+                        "completedAt": completed_at,
+                        "updatedAt": now,
+                    }
+                    data.update(updates)
+                    added.append(ProcedureSummary(**data))
+                    transaction.update(doc_ref, updates)
+                results[procedure_id] = data
+
+            increments = progress_increments(added=added, removed=removed)
+            session_snapshot = snapshots.get(session_ref.path)
+            if not increments or session_snapshot is None or not session_snapshot.exists:
+                return results, len(added)
+            if not has_progress(session_snapshot.to_dict()):
+                increments = {}  # 集計のないセッションは次の取得時に集計し直す
+            transaction.update(session_ref, _increment_updates(increments, now))
+
+            timeline_snapshot = snapshots.get(timeline_ref.path)
+            if timeline_snapshot is not None and timeline_snapshot.exists:
+                view = timeline_snapshot.to_dict()
+                current = session_snapshot.to_dict().get("updatedAt")
+                if current and session_version(view["version"]) == session_version(current):
+                    patch_completions(view["timeline"], {p.id: p.is_completed for p in added})
+                    transaction.set(timeline_ref, {"version": now, "timeline": view["timeline"]})
+            return results, len(added)
+
+        return await _update(self.db.transaction())
+
+    async def backfill_progress(self, session_id: str) -> Optional[SessionProgress]:
+        """
+        progress のないセッション（集計の導入前に作成）の集計を手続きから作り直して保存
+
+        セッションと手続きの読み込みと書き込みを1トランザクションで行い、その間に
+        コミットされた更新とは衝突として再試行します。
+
+        Returns:
+            保存した集計（セッションがない・すでに集計がある場合は None）
+        """
+        session_ref = self.sessions_collection.document(session_id)
+        procedures_ref = session_ref.collection("procedures")
+
+        @firestore.async_transactional
+        async def _backfill(transaction) -> Optional[SessionProgress]:
+            snapshot = await session_ref.get(transaction=transaction)
+            if not snapshot.exists or has_progress(snapshot.to_dict()):
+                return None
+            summaries = [
+                ProcedureSummary(**doc.to_dict())
+                async for doc in procedures_ref.select(PROCEDURE_SUMMARY_FIELDS).stream(
+                    transaction=transaction
+                )
+            ]
+            progress = compute_progress(summaries)
+            transaction.update(
+                session_ref,
+                {"progress": progress.model_dump(by_alias=True), "updatedAt": datetime.utcnow()},
+            )
+            return progress
+
+        return await _backfill(self.db.transaction())
+
+    def _timeline_ref(self, session_id: str):
+        """実体化したタイムラインの文書（sessions/{id}/views/timeline）"""
+        return (
+            self.sessions_collection.document(session_id)
+            .collection("views")
+            .document(TIMELINE_VIEW_ID)
+        )
+
+    async def get_timeline(self, session_id: str) -> Optional[dict]:
+        """実体化したタイムラインを取得（{"version", "timeline"}）"""
+        doc = await self._timeline_ref(session_id).get()
+        if not doc.exists:
+            return None
+        return doc.to_dict()
+
+    async def save_timeline(self, session_id: str, version: datetime, timeline: dict) -> None:
+        """実体化したタイムラインを保存"""
+        await self._timeline_ref(session_id).set({"version": version, "timeline": timeline})
+
+    async def get_office(self, key: str) -> Optional[dict]:
+        """窓口ディレクトリから取得（期限切れは None）"""
+        doc = await self.offices_collection.document(_office_doc_id(key)).get()
+        if not doc.exists:
+            return None
+
+        data = doc.to_dict()
+        expires_at = data.get("expiresAt")
+        if expires_at and expires_at.replace(tzinfo=None) < datetime.utcnow():
+            return None
+        return data.get("office")
+
+    async def save_office(self, key: str, office: dict, expires_at: datetime) -> None:
+        """
+        窓口ディレクトリに保存
+
+        expiresAt に Firestore の TTL ポリシーを設定すると期限切れの文書は自動削除されます。
+        """
+        doc_ref = self.offices_collection.document(_office_doc_id(key))
+        await doc_ref.set({"key": key, "office": office, "expiresAt": expires_at})
+
+    def validate_dependencies(self, procedures: List[Procedure]) -> bool:
+        """依存関係に循環がないか検証（循環があれば該当する手続き ID をログに出す）"""
+        return check_dependencies(procedures)
+
+
+def _increment_updates(
+    increments: Dict[FieldPathTuple, int], updated_at: Optional[datetime] = None
+) -> dict:
+    """進捗集計の差分を Firestore の Increment に変換（日本語のキーはエスケープ）"""
+    updates = {
+        FieldPath(*path).to_api_repr(): firestore.Increment(delta)
+        for path, delta in increments.items()
+    }
+    updates["updatedAt"] = updated_at or datetime.utcnow()
+    return updates
+
+
+def _office_doc_id(key: str) -> str:
+    """窓口ディレクトリのキーを Firestore の文書 ID に変換（/ は使用不可）"""
+    return key.replace("/", "_")
@@ -0,0 +1,52 @@
+"""ヘッジリクエスト
+
+一定時間（通常はそのエージェントの p95 レイテンシ）を過ぎても応答がない場合に
+同じ呼び出しをもう1本発行し、先に成功した方の結果を採用します。
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+async def hedged_call(
+    fn: Callable[[], Awaitable[T]], hedge_after: Optional[float]
+) -> Tuple[T, bool]:
+    """
+    fn を実行し、hedge_after 秒以内に完了しなければ2本目を発行します。
+
+    Args:
+        fn: 呼び出すたびに新しいコルーチンを返す関数
+        hedge_after: ヘッジまでの待機秒数（None でヘッジしない）
+
+    Returns:
+        (結果, ヘッジを発行したか)
+    """
+    primary = asyncio.ensure_future(fn())
+    tasks = {primary}
+    try:
+        if hedge_after is None:
+            return await primary, False
+
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done:
+            return primary.result(), False
+
+        tasks.add(asyncio.ensure_future(fn()))
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True
+                # 先に発行した方のエラーを優先して返す
+                if error is None or task is primary:
+                    error = task.exception()
+        raise error
+    finally:
+        # 敗者と、呼び出し元がキャンセルされた場合の残りを止める
+        for task in tasks:
+            if not task.done():
+                task.cancel()
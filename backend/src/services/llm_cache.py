@@ -0,0 +1,151 @@
+"""LLM レスポンスキャッシュ"""
+
+import hashlib
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from core.config import settings
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"[ \t　]+")
+
+
+def make_cache_key(prompt: str, model_name: str, temperature: float, max_tokens: int) -> str:
+    """
+    正規化したプロンプトのハッシュとモデル設定からキャッシュキーを生成します。
+
+    行頭・行末の空白、連続する空白、空行の違いは同一プロンプトとして扱います。
+    """
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in prompt.splitlines())
+    normalized = "\n".join(line for line in lines if line)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"llm:{model_name}:{temperature:.2f}:{max_tokens}:{digest}"
+
+
+class LLMCacheBackend(ABC):
+    """キャッシュバックエンドの基底クラス（未実装のメソッドがあれば生成時に失敗する）"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """キャッシュ済みの値（なければ None）"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """値を保存"""
+
+
+class InMemoryLLMCache(LLMCacheBackend):
+    """プロセス内キャッシュ（TTL + LRU 退避）"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.increment("llm_cache_evictions_total")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisLLMCache(LLMCacheBackend):
+    """
+    Redis プロトコル互換キャッシュ（Redis / Valkey / Memorystore）。
+
+    TTL は SET EX で付与します。LRU 退避はサーバー側の
+    maxmemory-policy（allkeys-lru など）に委ねます。
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = 86400):
+        import redis.asyncio as redis
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self._client.set(key, value, ex=self.ttl_seconds)
+
+
+class LLMResponseCache:
+    """バックエンドを差し替え可能な LLM レスポンスキャッシュ"""
+
+    def __init__(self, backend: LLMCacheBackend):
+        self.backend = backend
+
+    async def get(self, key: str) -> Optional[str]:
+        """キャッシュを参照（バックエンド障害時はミス扱い）"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache get failed: {e}")
+            value = None
+
+        if value is None:
+            metrics.increment("llm_cache_misses_total")
+        else:
+            metrics.increment("llm_cache_hits_total")
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        """キャッシュに保存（バックエンド障害時は無視）"""
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"LLM cache set failed: {e}")
+
+    @property
+    def stats(self) -> dict:
+        """ヒット・ミス数とヒット率"""
+        hits = metrics.get("llm_cache_hits_total")
+        misses = metrics.get("llm_cache_misses_total")
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+def create_llm_cache() -> Optional[LLMResponseCache]:
+    """設定に応じて LLM キャッシュを生成（"none" の場合は None）"""
+    backend_name = settings.LLM_CACHE_BACKEND.lower()
+
+    if backend_name == "none":
+        return None
+    if backend_name == "redis":
+        backend = RedisLLMCache(settings.REDIS_URL, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
+    else:
+        backend = InMemoryLLMCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        )
+
+    logger.info(f"LLM response cache enabled (backend={backend_name})")
+    return LLMResponseCache(backend)
@@ -1,104 +1,362 @@
 """インメモリ Firestore サービス（モックモード用）"""
 
+import asyncio
+import copy
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 import logging
-from models.domain import Session, Procedure
+from models.domain import (
+    Session,
+    SessionProgress,
+    Procedure,
+    ProcedureSummary,
+    procedure_order_key,
+)
+from services.dependency_graph import check_dependencies
+from services.progress import (
+    apply_increments,
+    compute_progress,
+    has_progress,
+    progress_increments,
+)
+from services.timeline_view import patch_completions
 
 logger = logging.getLogger(__name__)
 
 
+def _sortable(key: list) -> tuple:
+    """並びキーを比較可能にする（Firestore と同じく null は先頭）"""
+    absolute_date, procedure_id = key
+    return (absolute_date is not None, absolute_date or "", procedure_id)
+
+
+class ProcedureIndex:
+    """
+    セッション内の手続きの二次インデックス
+
+    手続きに追加順の序数を振り、(フィールド, 値) ごとに序数のビットセットを保持します。
+    複数条件の絞り込みはビットセットの AND で、結果 k 件の取り出しは O(k) です。
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._ordinals: Dict[str, int] = {}
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._bits: Dict[tuple, int] = {}
+
+    def update(self, procedure: ProcedureSummary) -> None:
+        """手続きの保存・更新を反映"""
+        ordinal = self._ordinals.get(procedure.id)
+        if ordinal is None:
+            ordinal = self._ordinals[procedure.id] = len(self._ids)
+            self._ids.append(procedure.id)
+        bit = 1 << ordinal
+
+        previous = self._values.get(procedure.id, {})
+        values = {
+            "category": procedure.category.value,
+            "priority": procedure.priority.value,
+            "isCompleted": procedure.is_completed,
+        }
+        for field, value in values.items():
+            if field in previous:
+                if previous[field] == value:
+                    continue
+                self._bits[(field, previous[field])] &= ~bit
+            self._bits[(field, value)] = self._bits.get((field, value), 0) | bit
+        self._values[procedure.id] = values
+
+    def select(self, filters: Dict[str, Any]) -> Iterator[str]:
+        """条件（フィールド → 値）にすべて一致する手続き ID を返す"""
+        mask = (1 << len(self._ids)) - 1
+        for field, value in filters.items():
+            mask &= self._bits.get((field, value), 0)
+        while mask:
+            lowest = mask & -mask
+            yield self._ids[lowest.bit_length() - 1]
+            mask ^= lowest
+
+
 class InMemoryFirestoreService:
-    """インメモリ Firestore サービス（GCP 不要で動作）"""
+    """
+    インメモリ Firestore サービス（GCP 不要で動作）
+
+    検証済みのモデルインスタンスをそのまま保持し、読み込み時に再検証しません。
+    保持しているインスタンスは変更せず、書き込みのたびに新しいインスタンスと
+    新しい辞書（スナップショット）に差し替えます（コピーオンライト）。
+    読み込みは浅いコピーを返すため、呼び出し側が属性を差し替えても保存内容には影響しません。
+    書き込みはセッション単位の asyncio.Lock で直列化します。
+    """
 
     def __init__(self, collection_name: str = "sessions"):
-        self._sessions: dict[str, dict] = {}
-        self._procedures: dict[str, dict[str, dict]] = {}
+        self._sessions: dict[str, Session] = {}
+        self._procedures: dict[str, dict[str, Procedure]] = {}
+        self._indexes: dict[str, ProcedureIndex] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._timelines: dict[str, dict] = {}
+        self._offices: dict[str, tuple[datetime, dict]] = {}
         self.collection_name = collection_name
         logger.info("InMemoryFirestoreService initialized (mock mode)")
 
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
     async def save_session(self, session: Session) -> None:
         """セッションをメモリに保存"""
         session.updated_at = datetime.utcnow()
-        session_dict = session.model_dump(by_alias=True, mode="json")
-        self._sessions[session.session_id] = session_dict
+        # Firestore・SQLite に保存する文書と同じく、未設定の progress も保存する
+        stored = session.model_copy(deep=True)
+        stored = stored.model_copy(update={"progress": stored.progress})
+        async with self._lock(session.session_id):
+            self._sessions[session.session_id] = stored
 
     async def get_session(self, session_id: str) -> Optional[Session]:
         """セッションをメモリから取得"""
-        session_data = self._sessions.get(session_id)
-        if not session_data:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        return session.model_copy()
+
+    async def get_session_version(self, session_id: str) -> Optional[datetime]:
+        """セッションの updatedAt のみを取得"""
+        session = self._sessions.get(session_id)
+        if session is None:
             return None
-        return Session(**session_data)
+        return session.updated_at
 
     async def update_session(self, session_id: str, updates: dict) -> None:
         """セッションを部分的に更新"""
-        if session_id not in self._sessions:
-            return
-        updates["updatedAt"] = datetime.utcnow().isoformat()
-        self._sessions[session_id].update(updates)
+        async with self._lock(session_id):
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            data = _session_document(session)
+            data.update(updates)
+            data["updatedAt"] = datetime.utcnow()
+            self._sessions[session_id] = Session.model_validate(data)
 
     async def save_procedure(self, session_id: str, procedure: Procedure) -> None:
-        """手続きをメモリに保存"""
+        """手続きの詳細をメモリに保存（完了状態は上書きしない）"""
         procedure.updated_at = datetime.utcnow()
-        if session_id not in self._procedures:
-            self._procedures[session_id] = {}
-        procedure_dict = procedure.model_dump(by_alias=True, mode="json")
-        self._procedures[session_id][procedure.id] = procedure_dict
+        async with self._lock(session_id):
+            procs = self._procedures.get(session_id, {})
+            stored = procedure.model_copy(deep=True)
+            current = procs.get(procedure.id)
+            if current is not None:
+                stored.is_completed = current.is_completed
+                stored.completed_at = current.completed_at
+            self._put_procedures(session_id, [stored])
 
     async def save_procedures_batch(self, session_id: str, procedures: List[Procedure]) -> None:
-        """複数の手続きを一括でメモリに保存"""
-        if session_id not in self._procedures:
-            self._procedures[session_id] = {}
+        """複数の手続きを一括でメモリに保存し、進捗集計に差分を加算"""
+        now = datetime.utcnow()
         for procedure in procedures:
-            procedure.updated_at = datetime.utcnow()
-            procedure_dict = procedure.model_dump(by_alias=True, mode="json")
-            self._procedures[session_id][procedure.id] = procedure_dict
+            procedure.updated_at = now
+        async with self._lock(session_id):
+            procs = self._procedures.get(session_id, {})
+            existing = [procs[p.id] for p in procedures if p.id in procs]
+            self._put_procedures(session_id, [p.model_copy(deep=True) for p in procedures])
+            self._increment_progress(
+                session_id, progress_increments(added=procedures, removed=existing)
+            )
 
     async def get_procedure(self, session_id: str, procedure_id: str) -> Optional[Procedure]:
         """特定の手続きをメモリから取得"""
-        procs = self._procedures.get(session_id, {})
-        proc_data = procs.get(procedure_id)
-        if not proc_data:
+        procedure = self._procedures.get(session_id, {}).get(procedure_id)
+        if procedure is None:
             return None
-        return Procedure(**proc_data)
+        return procedure.model_copy()
 
     async def get_all_procedures(self, session_id: str) -> List[Procedure]:
         """セッションの全手続きをメモリから取得"""
         procs = self._procedures.get(session_id, {})
-        return [Procedure(**data) for data in procs.values()]
+        return [procedure.model_copy() for procedure in procs.values()]
+
+    async def get_procedure_summaries(self, session_id: str) -> List[ProcedureSummary]:
+        """セッションの全手続きを概要として取得（Procedure は ProcedureSummary の派生型）"""
+        return await self.get_all_procedures(session_id)
+
+    async def query_procedure_summaries(
+        self,
+        session_id: str,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+        start_after: Optional[list] = None,
+        limit: Optional[int] = None,
+    ) -> List[ProcedureSummary]:
+        """手続きの概要を二次インデックスで絞り込み、期限順に取得（Firestore のクエリと同じ意味）"""
+        index = self._indexes.get(session_id)
+        if index is None:
+            return []
+
+        filters = {"category": category, "priority": priority, "isCompleted": completed}
+        procs = self._procedures[session_id]
+        keys = sorted(
+            _sortable(procedure_order_key(procs[pid]))
+            for pid in index.select({f: v for f, v in filters.items() if v is not None})
+        )
+
+        if start_after is not None:
+            after = _sortable(start_after)
+            keys = [key for key in keys if key > after]
+        if limit is not None:
+            keys = keys[:limit]
+        return [procs[key[-1]].model_copy() for key in keys]
 
     async def update_procedure(self, session_id: str, procedure_id: str, updates: dict) -> None:
         """手続きを更新"""
-        procs = self._procedures.get(session_id, {})
-        if procedure_id not in procs:
+        async with self._lock(session_id):
+            procedure = self._procedures.get(session_id, {}).get(procedure_id)
+            if procedure is None:
+                return
+            data = procedure.model_dump(by_alias=True)
+            data.update(updates)
+            data["updatedAt"] = datetime.utcnow()
+            self._put_procedures(session_id, [Procedure.model_validate(data)])
+
+    async def set_procedure_completion(
+        self,
+        session_id: str,
+        procedure_id: str,
+        is_completed: bool,
+        completed_at: Optional[datetime],
+    ) -> Optional[Procedure]:
+        """手続きの完了状態を更新し、更新後の内容を返す（状態が変わった場合のみ集計を加算）"""
+        async with self._lock(session_id):
+            before = self._procedures.get(session_id, {}).get(procedure_id)
+            if before is None:
+                return None
+            if before.is_completed == is_completed:
+                return before.model_copy()
+
+            after = before.model_copy(
+                update={
+                    "is_completed": is_completed,
+                    "completed_at": completed_at,
+                    "updated_at": datetime.utcnow(),
+                }
+            )
+            self._put_procedures(session_id, [after])
+            self._increment_progress(
+                session_id,
+                progress_increments(added=[after], removed=[before]),
+                completions={procedure_id: is_completed},
+            )
+            return after.model_copy()
+
+    async def set_procedure_completions(
+        self, session_id: str, changes: Dict[str, Tuple[bool, Optional[datetime]]]
+    ) -> int:
+        """複数の手続きの完了状態をまとめて更新し、状態が変わった手続きの数を返す"""
+        async with self._lock(session_id):
+            procs = self._procedures.get(session_id, {})
+            now = datetime.utcnow()
+            added, removed = [], []
+            for procedure_id, (is_completed, completed_at) in changes.items():
+                before = procs.get(procedure_id)
+                if before is None or before.is_completed == is_completed:
+                    continue
+                removed.append(before)
+                added.append(
+                    before.model_copy(
+                        update={
+                            "is_completed": is_completed,
+                            "completed_at": completed_at,
+                            "updated_at": now,
+                        }
+                    )
+                )
+            if added:
+                self._put_procedures(session_id, added)
+                self._increment_progress(
+                    session_id,
+                    progress_increments(added=added, removed=removed),
+                    completions={p.id: p.is_completed for p in added},
+                )
+            return len(added)
+
+    def _put_procedures(self, session_id: str, procedures: List[Procedure]) -> None:
+        """新しいスナップショットに差し替え、インデックスを更新（ロック内で呼ぶ）"""
+        procs = dict(self._procedures.get(session_id, {}))
+        index = self._indexes.get(session_id)
+        if index is None:
+            index = self._indexes[session_id] = ProcedureIndex()
+        for procedure in procedures:
+            procs[procedure.id] = procedure
+            index.update(procedure)
+        self._procedures[session_id] = procs
+
+    def _increment_progress(
+        self, session_id: str, increments: dict, completions: Optional[Dict[str, bool]] = None
+    ) -> None:
+        """
+        進捗集計に差分を加算（ロック内で呼ぶ）
+
+        completions を渡した場合、実体化したタイムラインが最新なら完了状態を書き換えて
+        セッションと同じバージョンに進めます。
+        """
+        session = self._sessions.get(session_id)
+        if session is None or not increments:
             return
-        updates["updatedAt"] = datetime.utcnow().isoformat()
-        procs[procedure_id].update(updates)
+        data = _session_document(session)
+        # 集計のないセッションは加算せず、次の取得時に集計し直す（backfill_progress）
+        if has_progress(data):
+            apply_increments(data, increments)
+        data["updatedAt"] = datetime.utcnow()
+        self._sessions[session_id] = Session.model_validate(data)
+
+        view = self._timelines.get(session_id)
+        if completions and view is not None and view["version"] == session.updated_at:
+            timeline = copy.deepcopy(view["timeline"])
+            patch_completions(timeline, completions)
+            self._timelines[session_id] = {"version": data["updatedAt"], "timeline": timeline}
+
+    async def backfill_progress(self, session_id: str) -> Optional[SessionProgress]:
+        """
+        progress のないセッションの集計を手続きから作り直して保存（セッションのロック内）
+
+        Returns:
+            保存した集計（セッションがない・すでに集計がある場合は None）
+        """
+        async with self._lock(session_id):
+            session = self._sessions.get(session_id)
+            if session is None or "progress" in session.model_fields_set:
+                return None
+            progress = compute_progress(self._procedures.get(session_id, {}).values())
+            self._sessions[session_id] = session.model_copy(
+                update={"progress": progress, "updated_at": datetime.utcnow()}
+            )
+            return progress
+
+    async def get_timeline(self, session_id: str) -> Optional[dict]:
+        """実体化したタイムラインを取得（{"version", "timeline"}、変更しないこと）"""
+        return self._timelines.get(session_id)
+
+    async def save_timeline(self, session_id: str, version: datetime, timeline: dict) -> None:
+        """実体化したタイムラインを保存"""
+        self._timelines[session_id] = {"version": version, "timeline": timeline}
+
+    async def get_office(self, key: str) -> Optional[dict]:
+        """窓口ディレクトリから取得（期限切れは None）"""
+        entry = self._offices.get(key)
+        if not entry or entry[0] < datetime.utcnow():
+            return None
+        return entry[1]
+
+    async def save_office(self, key: str, office: dict, expires_at: datetime) -> None:
+        """窓口ディレクトリに保存"""
+        self._offices[key] = (expires_at, office)
 
     def validate_dependencies(self, procedures: List[Procedure]) -> bool:
-        """依存関係を検証（FirestoreService と同じロジック）"""
-        procedure_ids = {p.id for p in procedures}
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle(proc_id: str) -> bool:
-            visited.add(proc_id)
-            rec_stack.add(proc_id)
-            proc = next((p for p in procedures if p.id == proc_id), None)
-            if proc:
-                for dep_id in proc.dependencies:
-                    if dep_id not in procedure_ids:
-                        continue
-                    if dep_id not in visited:
-                        if has_cycle(dep_id):
-                            return True
-                    elif dep_id in rec_stack:
-                        return True
-            rec_stack.remove(proc_id)
-            return False
+        """依存関係に循環がないか検証（循環があれば該当する手続き ID をログに出す）"""
+        return check_dependencies(procedures)
 
-        for procedure in procedures:
-            if procedure.id not in visited:
-                if has_cycle(procedure.id):
-                    return False
-        return True
+
+def _session_document(session: Session) -> dict:
+    """セッションを dict にする（progress が未設定なら含めない。文書に集計がない状態と同じ）"""
+    exclude = None if "progress" in session.model_fields_set else {"progress"}
+    return session.model_dump(by_alias=True, exclude=exclude)
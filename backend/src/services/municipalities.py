@@ -0,0 +1,251 @@
+"""市区町村の正規化（全国地方公共団体コード）
+
+入力された都道府県・市区町村の表記ゆれ（「渋谷区」「東京都渋谷区」「渋谷」「東京 渋谷区」など）を
+同梱のコード表（data/municipalities.json）で市区町村コードに解決し、
+コードごとに1つの正規化済み Location を共有（intern）します。
+プロンプト・カタログ・窓口ディレクトリなど所在地をキーにするものは、
+正規化後の表記で同じキーになります。
+
+名前は文字ごとのトライ木に登録します。登録するのは正式名（渋谷区）と、
+末尾の市・区・町・村を除いた語幹（渋谷）です。入力をトライ木でたどり、
+
+- 最も長く一致した名前（「渋谷区神南1丁目」→ 渋谷区）
+- 入力を最後までたどれた場合は、その先にある名前（「さいたま」→ さいたま市）
+
+の順に候補を探し、都道府県で絞って1つに決まれば解決します。
+語幹で一致した場合は、残りが空・番地・区名のときだけ採用します
+（「大阪狭山市」を 大阪市、「府中町」を 府中市 としない）。
+同梱の表は全件ではないため、都道府県が分からない場合は解決しません（「中央区」だけでは決めない）。
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from core.config import settings
+from models.domain import Location
+
+logger = logging.getLogger(__name__)
+
+MUNICIPALITIES_VERSION = 1
+BUNDLED_MUNICIPALITIES_PATH = (
+    Path(__file__).resolve().parent.parent / "data" / "municipalities.json"
+)
+
+_CITY_SUFFIXES = ("市", "区", "町", "村")
+# 表記ゆれをそろえる文字（NFKC の後に適用）
+_FOLD = str.maketrans({"ヶ": "ケ", "ヵ": "カ", "髙": "高", "﨑": "崎"})
+_SPACES = re.compile(r"\s+")
+# 語幹の後に続いてよいもの: 番地（数字）・政令指定都市の区名（横浜中区）
+_ADDRESS_START = re.compile(r"\d|[^\d市区町村]{1,4}区")
+
+
+def clean_text(value: str) -> str:
+    """全角英数をそろえ、空白を除く"""
+    return _SPACES.sub("", unicodedata.normalize("NFKC", value))
+
+
+def normalize_text(value: str) -> str:
+    """照合用に clean_text に加えて異体字もそろえる"""
+    return clean_text(value).translate(_FOLD)
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.codes: Set[str] = set()
+
+
+class _Trie:
+    """文字ごとのトライ木（名前 → コードの集合）"""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, name: str, code: str) -> None:
+        node = self.root
+        for char in name:
+            node = node.children.setdefault(char, _TrieNode())
+        node.codes.add(code)
+
+    def longest_prefix(self, text: str) -> Tuple[Set[str], int]:
+        """text の先頭に最も長く一致する名前のコードと、一致した長さ"""
+        node = self.root
+        best: Set[str] = set()
+        length = 0
+        for i, char in enumerate(text):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.codes:
+                best, length = node.codes, i + 1
+        return best, length
+
+    def completions(self, prefix: str) -> Set[str]:
+        """prefix で始まる名前のコード"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        codes: Set[str] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            codes |= node.codes
+            stack.extend(node.children.values())
+        return codes
+
+
+def _stem(name: str) -> Optional[str]:
+    """末尾の市・区・町・村を除いた語幹（1文字になる場合は None）"""
+    if name.endswith(_CITY_SUFFIXES) and len(name) > 2:
+        return name[:-1]
+    return None
+
+
+def _is_boundary(matched: str, rest: str) -> bool:
+    """一致した名前の後で市区町村名が終わっているか（語幹の後に別の名前が続かない）"""
+    return not rest or matched.endswith(_CITY_SUFFIXES) or bool(_ADDRESS_START.match(rest))
+
+
+class MunicipalityIndex:
+    """市区町村コード表とその索引"""
+
+    def __init__(
+        self,
+        prefectures: Optional[Dict[str, str]] = None,
+        municipalities: Optional[Dict[str, str]] = None,
+        data_version: str = "",
+    ):
+        # 都道府県コード（2桁）→ 都道府県名
+        self.prefectures = prefectures or {}
+        # 市区町村コード（6桁）→ 市区町村名
+        self.municipalities = municipalities or {}
+        self.data_version = data_version
+
+        # 正式名（東京都）と、北海道以外は末尾の都府県を除いた名前（東京）
+        self._prefecture_trie = _Trie()
+        self._prefecture_names = {normalize_text(name) for name in self.prefectures.values()}
+        for code, name in self.prefectures.items():
+            self._prefecture_trie.add(normalize_text(name), code)
+            if name != "北海道":
+                self._prefecture_trie.add(normalize_text(name[:-1]), code)
+        self._city_trie = _Trie()
+        for code, name in self.municipalities.items():
+            name = normalize_text(name)
+            self._city_trie.add(name, code)
+            stem = _stem(name)
+            if stem:
+                self._city_trie.add(stem, code)
+        self._interned: Dict[str, Location] = {}
+
+    @classmethod
+    def load(cls, path: str = "") -> "MunicipalityIndex":
+        """JSON ファイルから読み込む（空の場合は同梱のデータ、読めなければ空）"""
+        municipalities_path = Path(path) if path else BUNDLED_MUNICIPALITIES_PATH
+        try:
+            data = json.loads(municipalities_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Municipality codes not loaded from {municipalities_path}: {e}")
+            return cls()
+        if data.get("version") != MUNICIPALITIES_VERSION:
+            logger.warning(f"Ignoring municipality codes with version {data.get('version')}")
+            return cls()
+
+        index = cls(
+            prefectures=data.get("prefectures", {}),
+            municipalities=data.get("municipalities", {}),
+            data_version=data.get("dataVersion", ""),
+        )
+        logger.info(
+            f"Municipality codes loaded: {len(index.municipalities)} municipalities "
+            f"(data version {index.data_version})"
+        )
+        return index
+
+    def _resolve_prefecture(self, text: str) -> Tuple[Optional[str], int]:
+        """text の先頭の都道府県名 (コード, 長さ)"""
+        codes, length = self._prefecture_trie.longest_prefix(text)
+        if len(codes) == 1:
+            return next(iter(codes)), length
+        return None, 0
+
+    def _resolve_city(self, prefecture_code: Optional[str], city: str) -> Optional[str]:
+        codes, length = self._city_trie.longest_prefix(city)
+        if codes and not _is_boundary(city[:length], city[length:]):
+            codes = set()
+        if not codes:
+            codes = self._city_trie.completions(city)
+        if prefecture_code is not None:
+            codes = {code for code in codes if code.startswith(prefecture_code)}
+        if len(codes) == 1:
+            return next(iter(codes))
+        return None
+
+    def resolve(self, prefecture: str, city: str) -> Optional[str]:
+        """
+        都道府県・市区町村の表記から市区町村コードを解決します。
+
+        Returns:
+            市区町村コード（見つからない・1つに決まらない・都道府県が分からない場合は None）
+        """
+        prefecture_code, _ = self._resolve_prefecture(normalize_text(prefecture))
+        city = normalize_text(city)
+
+        # 市区町村欄が都道府県から始まる場合（東京都渋谷区・東京渋谷区）
+        city_prefecture, length = self._resolve_prefecture(city)
+        if city_prefecture is None or prefecture_code not in (None, city_prefecture):
+            if prefecture_code is None:
+                return None
+            return self._resolve_city(prefecture_code, city)
+        rest = city[length:]
+        # 都道府県の正式名で始まる場合は先に除く（福島県郡山市 を 福島市 としない）
+        if city[:length] in self._prefecture_names and rest:
+            return self._resolve_city(city_prefecture, rest)
+        return self._resolve_city(city_prefecture, city) or (
+            self._resolve_city(city_prefecture, rest) if rest else None
+        )
+
+    def location(self, code: str) -> Location:
+        """市区町村コードの正規化済み Location（同じコードには同じインスタンス）"""
+        location = self._interned.get(code)
+        if location is None:
+            location = self._interned[code] = Location(
+                prefecture=self.prefectures[code[:2]],
+                city=self.municipalities[code],
+                code=code,
+            )
+        return location
+
+    def normalize(self, location: Location) -> Location:
+        """
+        Location を正規化します。
+
+        コード表で解決できた場合は正規化済みの共有インスタンスを、
+        できなかった場合は入力の表記のまま（コードなし）の Location を返します。
+        """
+        code = location.code if location.code in self.municipalities else None
+        code = code or self.resolve(location.prefecture, location.city)
+        if code is not None:
+            return self.location(code)
+        if location.code is None:
+            return location
+        return location.model_copy(update={"code": None})
+
+
+@lru_cache(maxsize=1)
+def get_municipality_index() -> MunicipalityIndex:
+    """プロセスで共有するコード表（最初の呼び出しで読み込む）"""
+    return MunicipalityIndex.load(settings.MUNICIPALITIES_PATH)
+
+
+def normalize_location(location: Location) -> Location:
+    """Location を正規化（get_municipality_index().normalize の短縮形）"""
+    return get_municipality_index().normalize(location)
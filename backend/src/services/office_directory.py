@@ -0,0 +1,148 @@
+"""窓口ディレクトリ（市区町村 × 窓口種別 → 窓口情報）"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from core.metrics import metrics
+from models.domain import (
+    DeadlineType,
+    Location,
+    Office,
+    Procedure,
+    ProcedureCategory,
+    Session,
+)
+from services.office_hours import get_office_hours
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class OfficeKind(str, Enum):
+    """窓口種別"""
+
+    CITY_HALL = "市区町村役所"
+    POLICE = "警察署"
+    LICENSE_CENTER = "運転免許センター"
+    TRANSPORT_BUREAU = "運輸支局"
+    PENSION_OFFICE = "年金事務所"
+
+
+# 手続き名・訪問先に含まれるキーワード → 窓口種別（上から順に判定）
+_KIND_KEYWORDS = [
+    ("運転免許", OfficeKind.LICENSE_CENTER),
+    ("免許", OfficeKind.LICENSE_CENTER),
+    ("車庫", OfficeKind.POLICE),
+    ("警察", OfficeKind.POLICE),
+    ("運輸支局", OfficeKind.TRANSPORT_BUREAU),
+    ("自動車の変更登録", OfficeKind.TRANSPORT_BUREAU),
+    ("車検", OfficeKind.TRANSPORT_BUREAU),
+    ("年金事務所", OfficeKind.PENSION_OFFICE),
+]
+
+
+def classify_office(procedure: Procedure) -> Optional[OfficeKind]:
+    """手続きを窓口種別に分類（民間手続きは None）"""
+    if procedure.category == ProcedureCategory.PRIVATE:
+        return None
+
+    text = f"{procedure.title} {procedure.visit_location or ''}"
+    for keyword, kind in _KIND_KEYWORDS:
+        if keyword in text:
+            return kind
+    return OfficeKind.CITY_HALL
+
+
+def office_location(session: Session, procedure: Procedure) -> Location:
+    """手続きを行う市区町村（引越し前の手続きは旧住所、それ以外は新住所）"""
+    if procedure.deadline.type == DeadlineType.BEFORE_MOVE:
+        return session.move_from
+    return session.move_to
+
+
+def office_key(location: Location, kind: OfficeKind) -> str:
+    """窓口ディレクトリのキー"""
+    return f"{location.prefecture}{location.city}:{kind.name}"
+
+
+def fallback_office(location: Location, kind: OfficeKind) -> Office:
+    """窓口情報を取得できなかった場合の既定値"""
+    name = f"{location.city}役所" if kind == OfficeKind.CITY_HALL else kind.value
+    return Office(
+        name=name,
+        address=f"{location.prefecture}{location.city}",
+        phone="お問い合わせください",
+        hours=get_office_hours().hours_text(location, kind.name),
+    )
+
+
+class OfficeDirectory:
+    """
+    窓口情報を (都道府県, 市区町村, 窓口種別) 単位で解決・共有します。
+
+    転入届・国民健康保険・印鑑登録など同じ役所で行う手続きは1回の問い合わせで済み、
+    結果は TTL 付きでデータストアに保存して全セッションで再利用します。
+    プロセス内にも同じ TTL で保持し、同時の問い合わせは1回にまとめます。
+    """
+
+    def __init__(self, location_agent, store=None, ttl_seconds: int = 30 * 86400):
+        self.location_agent = location_agent
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.single_flight = SingleFlight(name="office")
+        self._local: Dict[str, Tuple[float, Office]] = {}
+
+    async def resolve(self, session: Session, procedure: Procedure) -> Optional[Office]:
+        """手続きの窓口情報を取得"""
+        kind = classify_office(procedure)
+        if kind is None:
+            return None
+
+        location = office_location(session, procedure)
+        key = office_key(location, kind)
+
+        entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            metrics.increment("office_directory_local_hits_total")
+            return entry[1]
+
+        return await self.single_flight.do(key, lambda: self._lookup(key, location, kind))
+
+    async def _lookup(self, key: str, location: Location, kind: OfficeKind) -> Office:
+        if self.store is not None:
+            try:
+                data = await self.store.get_office(key)
+            except Exception as e:
+                logger.warning(f"Office directory read failed: {e}")
+                data = None
+            if data is not None:
+                metrics.increment("office_directory_store_hits_total")
+                # 受付時間は保存時点の値ではなく同梱データの最新の値を使う
+                hours = get_office_hours().hours_text(location, kind.name)
+                office = Office(**{**data, "hours": hours})
+                self._remember(key, office)
+                return office
+
+        metrics.increment("office_directory_lookups_total")
+        office = await self.location_agent.get_office(location, kind)
+        if office is None:
+            # 取得に失敗した場合は保存せず既定値を返す
+            return fallback_office(location, kind)
+
+        self._remember(key, office)
+        if self.store is not None:
+            try:
+                await self.store.save_office(
+                    key,
+                    office.model_dump(by_alias=True, mode="json"),
+                    datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+                )
+            except Exception as e:
+                logger.warning(f"Office directory write failed: {e}")
+        return office
+
+    def _remember(self, key: str, office: Office) -> None:
+        self._local[key] = (time.monotonic() + self.ttl_seconds, office)
@@ -0,0 +1,277 @@
+"""窓口の受付時間（市区町村コード × 窓口種別）
+
+同梱のデータ（data/office_hours.json）を起動後の最初の参照で1回だけ読み込みます。
+市区町村ごとの値がない窓口は、窓口種別ごとの既定値を使います。
+
+受付時間は「月曜 0:00 からの分」を [開始, 終了) の順に並べた配列で持ち、
+ある時刻に開いているかは二分探索（O(log 区間数)）で判定します。
+同じ受付時間の窓口は1つのオブジェクトを共有し、文字列は intern します。
+祝日と年末年始（12/29〜1/3）は utils.business_calendar に従って常に閉庁です。
+
+データの形式:
+
+    "CITY_HALL": {
+        "weekly": {"mon-fri": ["08:30-17:15"], "fri": ["08:30-19:00"]},  # 後の指定が優先
+        "monthly": [{"weekday": "sat", "weeks": [2, 4], "hours": ["09:00-12:00"]}],
+        "closed": ["2026-11-14"]
+    }
+"""
+
+import bisect
+import json
+import logging
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from core.config import settings
+from models.domain import Location
+from utils.business_calendar import is_holiday
+
+logger = logging.getLogger(__name__)
+
+OFFICE_HOURS_VERSION = 1
+BUNDLED_OFFICE_HOURS_PATH = Path(__file__).resolve().parent.parent / "data" / "office_hours.json"
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_WEEKDAY_LABELS = ("月", "火", "水", "木", "金", "土", "日")
+_MINUTES_PER_DAY = 24 * 60
+
+
+def _parse_minutes(value: str) -> int:
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def _parse_intervals(values: List[str]) -> List[Tuple[int, int]]:
+    """["08:30-17:15", ...] → [(510, 1035), ...]"""
+    intervals = []
+    for value in values:
+        start, end = (_parse_minutes(part) for part in value.split("-"))
+        if not 0 <= start < end <= _MINUTES_PER_DAY:
+            raise ValueError(f"Invalid office hours: {value}")
+        intervals.append((start, end))
+    return sorted(intervals)
+
+
+def _parse_weekdays(key: str) -> List[int]:
+    """"mon-fri" / "sat" → 曜日番号のリスト"""
+    if "-" in key:
+        first, last = (WEEKDAYS.index(part) for part in key.split("-"))
+        return list(range(first, last + 1))
+    return [WEEKDAYS.index(key)]
+
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def _format_intervals(intervals: Tuple[Tuple[int, int], ...]) -> str:
+    return "・".join(f"{_format_minutes(s)}〜{_format_minutes(e)}" for s, e in intervals)
+
+
+@dataclass(frozen=True)
+class MonthlyHours:
+    """毎月第 n 週の特定の曜日の受付時間（休日開庁など）"""
+
+    weekday: int
+    weeks: FrozenSet[int]
+    intervals: Tuple[Tuple[int, int], ...]
+
+    def applies(self, day: date) -> bool:
+        return day.weekday() == self.weekday and (day.day - 1) // 7 + 1 in self.weeks
+
+
+class OfficeSchedule:
+    """1つの窓口の受付時間"""
+
+    __slots__ = ("weekly", "monthly", "closed", "_boundaries", "_daily_minutes")
+
+    def __init__(
+        self,
+        weekly: Tuple[Tuple[Tuple[int, int], ...], ...],
+        monthly: Tuple[MonthlyHours, ...] = (),
+        closed: FrozenSet[date] = frozenset(),
+    ):
+        self.weekly = weekly
+        self.monthly = monthly
+        self.closed = closed
+        # 月曜 0:00 からの分で [開始, 終了, 開始, 終了, ...]
+        self._boundaries = array(
+            "H",
+            [
+                weekday * _MINUTES_PER_DAY + minute
+                for weekday, intervals in enumerate(weekly)
+                for interval in intervals
+                for minute in interval
+            ],
+        )
+        self._daily_minutes = tuple(sum(e - s for s, e in intervals) for intervals in weekly)
+
+    def is_closed_day(self, day: date) -> bool:
+        """祝日・年末年始・臨時の閉庁日か"""
+        return is_holiday(day) or day in self.closed
+
+    def is_open_at(self, moment: datetime) -> bool:
+        """その時刻に受付しているか"""
+        day = moment.date()
+        if self.is_closed_day(day):
+            return False
+        minute = moment.hour * 60 + moment.minute
+        index = bisect.bisect_right(self._boundaries, day.weekday() * _MINUTES_PER_DAY + minute)
+        if index % 2 == 1:
+            return True
+        return any(
+            rule.applies(day) and any(s <= minute < e for s, e in rule.intervals)
+            for rule in self.monthly
+        )
+
+    def minutes_on(self, day: date) -> int:
+        """その日の受付時間の合計（分、閉庁日は 0）"""
+        if self.is_closed_day(day):
+            return 0
+        minutes = self._daily_minutes[day.weekday()]
+        for rule in self.monthly:
+            if rule.applies(day):
+                minutes += sum(e - s for s, e in rule.intervals)
+        return minutes
+
+    def describe(self) -> str:
+        """Office.hours 用の表記（例: 平日 8:30〜17:15 / 第2・第4土曜 9:00〜12:00）"""
+        parts = []
+        weekday = 0
+        while weekday < 7:
+            intervals = self.weekly[weekday]
+            last = weekday
+            while last + 1 < 7 and self.weekly[last + 1] == intervals:
+                last += 1
+            if intervals:
+                if (weekday, last) == (0, 4):
+                    label = "平日"
+                elif weekday == last:
+                    label = _WEEKDAY_LABELS[weekday]
+                else:
+                    label = f"{_WEEKDAY_LABELS[weekday]}〜{_WEEKDAY_LABELS[last]}"
+                parts.append(f"{label} {_format_intervals(intervals)}")
+            weekday = last + 1
+        for rule in self.monthly:
+            weeks = "・".join(f"第{week}" for week in sorted(rule.weeks))
+            label = f"{weeks}{_WEEKDAY_LABELS[rule.weekday]}曜"
+            parts.append(f"{label} {_format_intervals(rule.intervals)}")
+        return " / ".join(parts) or "お問い合わせください"
+
+
+# 同じ受付時間の窓口で共有するインスタンス
+_schedules: Dict[tuple, OfficeSchedule] = {}
+
+
+def parse_schedule(data: Dict[str, Any]) -> OfficeSchedule:
+    """データ1件を受付時間に変換（同じ内容なら同じインスタンスを返す）"""
+    weekly: List[Tuple[Tuple[int, int], ...]] = [()] * 7
+    for key, values in data.get("weekly", {}).items():
+        for weekday in _parse_weekdays(key):
+            weekly[weekday] = tuple(_parse_intervals(values))
+    monthly = tuple(
+        MonthlyHours(
+            weekday=WEEKDAYS.index(rule["weekday"]),
+            weeks=frozenset(rule["weeks"]),
+            intervals=tuple(_parse_intervals(rule["hours"])),
+        )
+        for rule in data.get("monthly", [])
+    )
+    closed = frozenset(date.fromisoformat(value) for value in data.get("closed", []))
+
+    key = (tuple(weekly), monthly, closed)
+    schedule = _schedules.get(key)
+    if schedule is None:
+        schedule = _schedules[key] = OfficeSchedule(tuple(weekly), monthly, closed)
+    return schedule
+
+
+# 窓口種別ごとの既定値（データに既定値がない場合）
+DEFAULT_SCHEDULE = parse_schedule({"weekly": {"mon-fri": ["08:30-17:15"]}})
+
+
+class OfficeHours:
+    """
+    市区町村コード × 窓口種別（OfficeKind の名前）→ 受付時間。
+
+    市区町村コードは JIS X 0402 の検査数字付き6桁です。
+    """
+
+    def __init__(
+        self,
+        defaults: Optional[Dict[str, OfficeSchedule]] = None,
+        schedules: Optional[Dict[Tuple[str, str], OfficeSchedule]] = None,
+        names: Optional[Dict[str, str]] = None,
+        data_version: str = "",
+    ):
+        self.defaults = defaults or {}
+        self.schedules = schedules or {}
+        # "都道府県市区町村" → 市区町村コード
+        self.names = names or {}
+        self.data_version = data_version
+
+    @classmethod
+    def load(cls, path: str = "") -> "OfficeHours":
+        """JSON ファイルから読み込む（空の場合は同梱のデータ、読めなければ既定値のみ）"""
+        office_hours_path = Path(path) if path else BUNDLED_OFFICE_HOURS_PATH
+        try:
+            data = json.loads(office_hours_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Office hours not loaded from {office_hours_path}: {e}")
+            return cls()
+        if data.get("version") != OFFICE_HOURS_VERSION:
+            logger.warning(f"Ignoring office hours with version {data.get('version')}")
+            return cls()
+
+        defaults = {
+            sys.intern(kind): parse_schedule(value)
+            for kind, value in data.get("defaults", {}).items()
+        }
+        schedules = {}
+        names = {}
+        for code, entry in data.get("municipalities", {}).items():
+            code = sys.intern(code)
+            names[sys.intern(f"{entry['prefecture']}{entry['city']}")] = code
+            for kind, value in entry.get("offices", {}).items():
+                schedules[(code, sys.intern(kind))] = parse_schedule(value)
+
+        office_hours = cls(defaults, schedules, names, data.get("dataVersion", ""))
+        logger.info(
+            f"Office hours loaded: {len(names)} municipalities, "
+            f"{len(set(map(id, schedules.values())))} distinct schedules "
+            f"(data version {office_hours.data_version})"
+        )
+        return office_hours
+
+    def municipality_code(self, location: Location) -> Optional[str]:
+        """市区町村コード（正規化済みの Location はそのコード、それ以外は名前から）"""
+        return location.code or self.names.get(f"{location.prefecture}{location.city}")
+
+    def schedule(self, location: Location, kind: str) -> OfficeSchedule:
+        """窓口の受付時間（市区町村の値 → 窓口種別の既定値 → 平日 8:30〜17:15）"""
+        code = self.municipality_code(location)
+        if code is not None:
+            schedule = self.schedules.get((code, kind))
+            if schedule is not None:
+                return schedule
+        return self.defaults.get(kind, DEFAULT_SCHEDULE)
+
+    def is_open_at(self, location: Location, kind: str, moment: datetime) -> bool:
+        """その時刻に窓口が受付しているか"""
+        return self.schedule(location, kind).is_open_at(moment)
+
+    def hours_text(self, location: Location, kind: str) -> str:
+        """Office.hours 用の表記"""
+        return self.schedule(location, kind).describe()
+
+
+@lru_cache(maxsize=1)
+def get_office_hours() -> OfficeHours:
+    """プロセスで共有する受付時間データ（最初の呼び出しで読み込む）"""
+    return OfficeHours.load(settings.OFFICE_HOURS_PATH)
@@ -0,0 +1,246 @@
+"""手続きカタログ（事前計算した手続きリストと詳細情報）"""
+
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.metrics import metrics
+from models.domain import (
+    Deadline,
+    Document,
+    Interview,
+    Location,
+    Office,
+    Procedure,
+    Session,
+    Step,
+)
+from utils.date_utils import fill_deadline_dates
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+# インタビュー回答のビットマスク
+FLAG_HAS_CAR = 1 << 0
+FLAG_HAS_PET = 1 << 1
+FLAG_HAS_MY_NUMBER = 1 << 2
+FLAG_HAS_CHILDREN = 1 << 3
+FLAG_HAS_SPOUSE = 1 << 4
+FLAG_HAS_ELDERLY = 1 << 5
+ALL_FLAGS = (1 << 6) - 1
+
+
+def interview_flags(interview: Optional[Interview]) -> int:
+    """インタビュー結果を手続きに影響する属性のビットマスクに変換"""
+    if interview is None:
+        return 0
+
+    family = " ".join(interview.family)
+    flags = 0
+    if interview.has_car:
+        flags |= FLAG_HAS_CAR
+    if interview.has_pet:
+        flags |= FLAG_HAS_PET
+    if interview.has_my_number:
+        flags |= FLAG_HAS_MY_NUMBER
+    if "子供" in family:
+        flags |= FLAG_HAS_CHILDREN
+    if "配偶者" in family:
+        flags |= FLAG_HAS_SPOUSE
+    if "高齢者" in family:
+        flags |= FLAG_HAS_ELDERLY
+    return flags
+
+
+def interview_from_flags(flags: int) -> Interview:
+    """ビットマスクから代表的なインタビュー結果を生成（カタログ生成用）"""
+    family = []
+    if flags & FLAG_HAS_SPOUSE:
+        family.append("配偶者")
+    if flags & FLAG_HAS_CHILDREN:
+        family.append("子供（小学生）")
+    if flags & FLAG_HAS_ELDERLY:
+        family.append("高齢者（65歳以上）")
+
+    return Interview(
+        family=family or ["本人のみ"],
+        has_car=bool(flags & FLAG_HAS_CAR),
+        has_pet=bool(flags & FLAG_HAS_PET),
+        has_my_number=bool(flags & FLAG_HAS_MY_NUMBER),
+    )
+
+
+def classify_city(location: Location) -> str:
+    """引越し先の市区町村を区分に分類"""
+    city = location.city
+    if city.endswith("区"):
+        return "special_ward" if location.prefecture == "東京都" else "ward"
+    if city.endswith("市"):
+        return "city"
+    if city.endswith("町"):
+        return "town"
+    if city.endswith("村"):
+        return "village"
+    return "other"
+
+
+def procedure_key(session: Session) -> str:
+    """手続きリストのキー: (引越し元, 引越し先の区分, インタビューフラグ)"""
+    move_from = session.move_from
+    return (
+        f"{move_from.prefecture}{move_from.city}"
+        f"|{classify_city(session.move_to)}"
+        f"|{interview_flags(session.interview)}"
+    )
+
+
+def detail_key(location: Location, title: str) -> str:
+    """手続き詳細のキー: (引越し先, 手続き名)"""
+    return f"{location.prefecture}{location.city}|{title}"
+
+
+class ProcedureCatalog:
+    """
+    オフラインで生成した手続きカタログ。
+
+    手続きリストは (引越し元, 引越し先の区分, インタビューフラグ) ごとに、
+    引越し日からの相対日数と市区町村名のプレースホルダーを含むテンプレートとして保持し、
+    リクエスト時にセッションの引越し日・市区町村で具体化します。
+    窓口情報は市区町村ごとに異なるため、手続き詳細は (引越し先, 手続き名) で保持します。
+    """
+
+    def __init__(
+        self,
+        procedures: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        details: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.procedures = procedures or {}
+        self.details = details or {}
+
+    @classmethod
+    def load(cls, path: str) -> "ProcedureCatalog":
+        """JSON ファイルからカタログを読み込む（存在しなければ空）"""
+        catalog_path = Path(path)
+        if not catalog_path.exists():
+            logger.info(f"Procedure catalog not found at {path}, starting empty")
+            return cls()
+
+        data = json.loads(catalog_path.read_text(encoding="utf-8"))
+        if data.get("version") != CATALOG_VERSION:
+            logger.warning(f"Ignoring procedure catalog with version {data.get('version')}")
+            return cls()
+
+        catalog = cls(procedures=data.get("procedures", {}), details=data.get("details", {}))
+        logger.info(
+            f"Procedure catalog loaded: {len(catalog.procedures)} procedure sets, "
+            f"{len(catalog.details)} details"
+        )
+        return catalog
+
+    def save(self, path: str) -> None:
+        """カタログを JSON ファイルに保存"""
+        data = {
+            "version": CATALOG_VERSION,
+            "generatedAt": datetime.utcnow().isoformat(),
+            "procedures": self.procedures,
+            "details": self.details,
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self.procedures) + len(self.details)
+
+    # --- リクエスト時の参照 ---
+
+    def get_procedures(self, session: Session) -> Optional[List[Procedure]]:
+        """カタログから手続きリストを具体化して返す（なければ None）"""
+        templates = self.procedures.get(procedure_key(session))
+        if templates is None:
+            metrics.increment("procedure_catalog_misses_total")
+            return None
+
+        metrics.increment("procedure_catalog_hits_total")
+        procedures = [self._hydrate(session, template) for template in templates]
+        fill_deadline_dates(session.move_date, [p.deadline for p in procedures])
+        return procedures
+
+    def apply_detail(self, session: Session, procedure: Procedure) -> bool:
+        """カタログに詳細があれば手続きに設定して True を返す"""
+        detail = self.details.get(detail_key(session.move_to, procedure.title))
+        if detail is None:
+            metrics.increment("procedure_catalog_detail_misses_total")
+            return False
+
+        metrics.increment("procedure_catalog_detail_hits_total")
+        procedure.documents = [Document(**d) for d in detail.get("documents") or []]
+        procedure.steps = [Step(**s) for s in detail.get("steps") or []]
+        procedure.notes = list(detail.get("notes") or [])
+        procedure.office = Office(**detail["office"]) if detail.get("office") else None
+        return True
+
+    # --- カタログ生成 ---
+
+    def add_procedures(self, session: Session, procedures: List[Procedure]) -> None:
+        """生成済みの手続きリストをテンプレート化して登録"""
+        self.procedures[procedure_key(session)] = [
+            self._templatize(session, procedure) for procedure in procedures
+        ]
+
+    def add_detail(self, session: Session, procedure: Procedure) -> None:
+        """詳細情報を取得済みの手続きを登録"""
+        self.details[detail_key(session.move_to, procedure.title)] = procedure.model_dump(
+            by_alias=True,
+            mode="json",
+            include={"documents", "steps", "notes", "office"},
+        )
+
+    def _templatize(self, session: Session, procedure: Procedure) -> Dict[str, Any]:
+        data = procedure.model_dump(
+            by_alias=True,
+            mode="json",
+            exclude={
+                "id",
+                "documents",
+                "office",
+                "steps",
+                "notes",
+                "is_completed",
+                "completed_at",
+                "created_at",
+                "updated_at",
+            },
+        )
+
+        absolute_date = procedure.deadline.absolute_date
+        data["deadline"].pop("absoluteDate", None)
+        data["deadline"]["offsetDays"] = (
+            (absolute_date - session.move_date).days if absolute_date else None
+        )
+
+        if procedure.visit_location:
+            data["visitLocation"] = procedure.visit_location.replace(
+                session.move_from.city, "{from_city}"
+            ).replace(session.move_to.city, "{to_city}")
+        return data
+
+    def _hydrate(self, session: Session, template: Dict[str, Any]) -> Procedure:
+        deadline = dict(template["deadline"])
+        offset_days = deadline.pop("offsetDays", None)
+        # 日数の決まった期限は引越し日に合わせて開庁日で計算し直す（fill_deadline_dates）
+        if offset_days is not None and deadline.get("daysAfter") is None:
+            deadline["absoluteDate"] = session.move_date + timedelta(days=offset_days)
+
+        data = {**template, "id": str(uuid.uuid4()), "deadline": Deadline(**deadline)}
+        if template.get("visitLocation"):
+            # LLM の生成した文字列に { } が含まれても壊れないよう format は使わない
+            data["visitLocation"] = (
+                template["visitLocation"]
+                .replace("{from_city}", session.move_from.city)
+                .replace("{to_city}", session.move_to.city)
+            )
+        return Procedure(**data)
@@ -0,0 +1,61 @@
+"""手続きの進捗集計
+
+セッション文書の progress フィールドに加算する差分を計算します。
+キーはフィールドパスのタプルで、ストアごとに Increment や dict の加算に変換します。
+progress がない（集計の導入前に作られた）セッションは compute_progress で集計し直します。
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Tuple
+
+from models.domain import ProcedureSummary, SessionProgress
+
+FieldPathTuple = Tuple[str, ...]
+
+
+def _buckets(procedure: ProcedureSummary) -> Iterable[FieldPathTuple]:
+    yield ("progress",)
+    yield ("progress", "byCategory", procedure.category.value)
+    yield ("progress", "byPriority", procedure.priority.value)
+    yield ("progress", "byDeadlineType", procedure.deadline.type.value)
+
+
+def progress_increments(
+    added: Iterable[ProcedureSummary] = (),
+    removed: Iterable[ProcedureSummary] = (),
+) -> Dict[FieldPathTuple, int]:
+    """
+    手続きの追加・削除（上書きは削除＋追加）による集計の差分を計算します。
+
+    Returns:
+        {("progress", "byCategory", "行政", "completed"): 1, ...}（差分 0 は含まない）
+    """
+    deltas: Dict[FieldPathTuple, int] = defaultdict(int)
+    for procedures, sign in ((added, 1), (removed, -1)):
+        for procedure in procedures:
+            for bucket in _buckets(procedure):
+                deltas[bucket + ("total",)] += sign
+                if procedure.is_completed:
+                    deltas[bucket + ("completed",)] += sign
+    return {path: delta for path, delta in deltas.items() if delta}
+
+
+def apply_increments(document: dict, increments: Dict[FieldPathTuple, int]) -> None:
+    """差分を dict のセッション文書に直接加算（インメモリストア用）"""
+    for path, delta in increments.items():
+        node = document
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = node.get(path[-1], 0) + delta
+
+
+def has_progress(document: dict) -> bool:
+    """セッション文書に進捗集計があるか（ない場合は差分を加算せず、取得時に集計し直す）"""
+    return "progress" in document
+
+
+def compute_progress(procedures: Iterable[ProcedureSummary]) -> SessionProgress:
+    """手続き一覧から進捗集計を作り直す"""
+    document: dict = {}
+    apply_increments(document, progress_increments(added=procedures))
+    return SessionProgress.model_validate(document.get("progress", {}))
@@ -0,0 +1,185 @@
+"""Vertex AI 呼び出しの流量制御
+
+AIMD（加算増加・乗算減少）で同時実行数の上限を調整する AdaptiveConcurrencyLimiter と、
+1分あたりのトークン予算を管理する TokenBucket を提供します。
+どちらも待ち時間の期限を超えると ServiceOverloadedError で要求を破棄（負荷遮断）します。
+"""
+
+import asyncio
+import logging
+import time
+
+from core.exceptions import ServiceOverloadedError
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD で上限を調整する同時実行リミッター"""
+
+    def __init__(
+        self,
+        name: str = "vertex_ai",
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiting = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """現在の同時実行上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """実行中のリクエスト数"""
+        return self._in_flight
+
+    async def acquire(self, timeout: float) -> None:
+        """
+        実行枠を取得します。
+
+        Args:
+            timeout: 待ち行列で待機できる最大秒数
+
+        Raises:
+            ServiceOverloadedError: 期限内に実行枠を取得できなかった場合
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        self._waiting += 1
+        self._publish()
+        try:
+            async with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        metrics.increment(f"{self.name}_shed_total")
+                        raise ServiceOverloadedError(retry_after=self._retry_after(now))
+                    # Retry-After による一時停止中、または上限到達中は待機
+                    if now >= self._paused_until and self._in_flight < self.limit:
+                        break
+                    wake_at = deadline
+                    if now < self._paused_until:
+                        wake_at = min(deadline, self._paused_until)
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), max(wake_at - now, 0.001))
+                    except asyncio.TimeoutError:
+                        pass
+                self._in_flight += 1
+        finally:
+            self._waiting -= 1
+            self._publish()
+
+        metrics.observe(f"{self.name}_queue_wait_seconds", time.monotonic() - start)
+
+    async def release(self, overloaded: bool = False) -> None:
+        """
+        実行枠を返却し、結果に応じて上限を調整します。
+
+        Args:
+            overloaded: 上流がレート制限（429）を返した場合 True
+        """
+        async with self._cond:
+            self._in_flight -= 1
+            if overloaded:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+            else:
+                # 上限ぶん成功するごとにおよそ +1
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+        self._publish()
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After に従い、指定秒数は新規リクエストを発行しない"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        metrics.increment(f"{self.name}_rate_limited_total")
+        logger.warning(f"{self.name} rate limited, pausing for {seconds:.1f}s (limit={self.limit})")
+
+    def _retry_after(self, now: float) -> float:
+        return max(self._paused_until - now, 1.0)
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self.name}_inflight", self._in_flight)
+        metrics.set_gauge(f"{self.name}_queue_waiting", self._waiting)
+        metrics.set_gauge(f"{self.name}_concurrency_limit", self.limit)
+
+
+class TokenBucket:
+    """1分あたりのトークン予算（0 以下で無制限）"""
+
+    def __init__(self, name: str = "vertex_ai", tokens_per_minute: int = 0):
+        self.name = name
+        self.capacity = float(tokens_per_minute)
+        self._tokens = self.capacity
+        self._rate = self.capacity / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    async def acquire(self, tokens: int, timeout: float) -> None:
+        """
+        トークンを予約します。予算が回復するまで待機します。
+
+        Args:
+            tokens: 予約するトークン数
+            timeout: 待機できる最大秒数
+
+        Raises:
+            ServiceOverloadedError: 期限内に予算が回復しない場合
+        """
+        if not self.enabled:
+            return
+
+        tokens = min(float(tokens), self.capacity)
+        deadline = time.monotonic() + timeout
+        # 先着順に予約させるためロック内で待つ
+        async with self._lock:
+            while True:
+                now = self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                wait = (tokens - self._tokens) / self._rate
+                if now + wait > deadline:
+                    metrics.increment(f"{self.name}_token_budget_shed_total")
+                    raise ServiceOverloadedError(retry_after=wait)
+                await asyncio.sleep(wait)
+        metrics.set_gauge(f"{self.name}_token_budget_remaining", self._tokens)
+
+    def refund(self, tokens: int) -> None:
+        """予約したが使わなかったトークンを戻す（acquire と同じく容量で頭打ち）"""
+        if not self.enabled:
+            return
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + min(float(tokens), self.capacity))
+        metrics.set_gauge(f"{self.name}_token_budget_remaining", self._tokens)
+
+    def charge(self, tokens: int) -> None:
+        """実際に消費したトークン（出力分など）を後から差し引く"""
+        if not self.enabled:
+            return
+        self._refill()
+        self._tokens -= tokens
+        metrics.set_gauge(f"{self.name}_token_budget_remaining", self._tokens)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        return now
@@ -0,0 +1,415 @@
+"""手続きのスケジューリング
+
+手続きを実施日に割り当て、タイムラインを組み立てます。
+
+- 依存関係: 依存先と同じ日かそれ以降に置き、同じ日の中では依存先を先に並べる
+- 期限: 期限の早い順（同じなら優先度の高い順）に、置ける最も早い日へ置く
+- 窓口: 窓口への訪問は、その窓口の受付時間（services.office_hours）に収まる日に限る
+  （既定は平日 8:30〜17:15、祝日・年末年始は閉庁）
+- 1日の作業時間: estimated_duration の合計が1日の上限を超えないように分散する
+  （上限は目安のため、期限内に収まる日がなければ上限を超えても期限内の最も空いている日に置く）
+- 訪問の集約: 同じ窓口の手続きは、期限内にすでに訪問する日があればその日にまとめる
+
+期限の近い順に1件ずつ置く貪欲法で、計算量はおおよそ O(手続き数 × 日数) です。
+割り当ては手続きの完了状態に依存しないため、完了の切り替えで並びは変わりません。
+"""
+
+import bisect
+import heapq
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from models.domain import (
+    DeadlineType,
+    Milestone,
+    MilestoneType,
+    ProcedurePriority,
+    ProcedureSummary,
+    Session,
+    Timeline,
+    TimelineItem,
+    TimelineProcedure,
+)
+from services.dependency_graph import analyze_dependencies
+from services.office_directory import classify_office
+from services.office_directory import office_location as office_municipality
+from services.office_hours import DEFAULT_SCHEDULE, OfficeSchedule, get_office_hours
+from utils.business_calendar import next_business_day
+
+logger = logging.getLogger(__name__)
+
+# 引越し前の手続きを始められるのは引越し日の何日前からか（転出届などの受付開始）
+BEFORE_MOVE_WINDOW_DAYS = 14
+# 期限日数のない引越し後の手続きの期限
+DEFAULT_AFTER_MOVE_DAYS = 14
+
+# 訪問を伴わない手続きの visit_location に含まれる語
+REMOTE_LOCATION_KEYWORDS = ("オンライン", "電話", "郵送", "ウェブ", "Web")
+
+_PRIORITY_RANK = {
+    ProcedurePriority.HIGH: 0,
+    ProcedurePriority.MEDIUM: 1,
+    ProcedurePriority.LOW: 2,
+}
+
+
+@dataclass
+class ScheduleOptions:
+    """スケジューリングの条件"""
+
+    # 1日に手続きに使える時間（分）
+    daily_budget_minutes: int = 240
+    # 窓口1か所を訪問するごとの移動・待ち時間（分）
+    visit_overhead_minutes: int = 60
+    # 訪問先（visit_location）→ 受付時間（ない訪問先は平日 8:30〜17:15）
+    office_hours: Dict[str, OfficeSchedule] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> "ScheduleOptions":
+        """設定（SCHEDULE_*）から作成"""
+        return cls(
+            daily_budget_minutes=settings.SCHEDULE_DAILY_BUDGET_MINUTES,
+            visit_overhead_minutes=settings.SCHEDULE_VISIT_OVERHEAD_MINUTES,
+        )
+
+    @classmethod
+    def for_session(
+        cls, session: Session, procedures: Sequence[ProcedureSummary]
+    ) -> "ScheduleOptions":
+        """設定と、セッションの市区町村の窓口の受付時間から作成"""
+        options = cls.from_settings()
+        office_hours = get_office_hours()
+        for procedure in procedures:
+            location = office_location(procedure)
+            kind = classify_office(procedure)
+            if location is None or kind is None or location in options.office_hours:
+                continue
+            options.office_hours[location] = office_hours.schedule(
+                office_municipality(session, procedure), kind.name
+            )
+        return options
+
+    def schedule_for(self, location: str) -> OfficeSchedule:
+        return self.office_hours.get(location, DEFAULT_SCHEDULE)
+
+
+@dataclass
+class ScheduleStats:
+    """スケジュールの品質指標"""
+
+    procedures: int
+    days_used: int
+    office_trips: int
+    late: int
+    dependency_violations: int
+    max_daily_minutes: int
+    closed_day_visits: int
+
+
+@dataclass
+class Schedule:
+    """スケジュール（手続き ID → 実施日）"""
+
+    assignments: Dict[str, date]
+    stats: ScheduleStats
+    days: Dict[date, List[ProcedureSummary]] = field(default_factory=dict)
+
+
+def office_location(procedure: ProcedureSummary) -> Optional[str]:
+    """訪問が必要な窓口（オンライン・電話などは None）"""
+    location = procedure.visit_location
+    if not location or any(keyword in location for keyword in REMOTE_LOCATION_KEYWORDS):
+        return None
+    return location
+
+
+def deadline_window(procedure: ProcedureSummary, move_date: date) -> Tuple[date, date]:
+    """手続きを実施できる期間 (開始日, 期限日)"""
+    deadline = procedure.deadline
+    if deadline.type == DeadlineType.BEFORE_MOVE:
+        release = move_date - timedelta(days=BEFORE_MOVE_WINDOW_DAYS)
+        due = move_date - timedelta(days=1)
+    elif deadline.type == DeadlineType.ON_MOVE_DATE:
+        release = due = move_date
+    else:
+        # 転入届などは引越しの翌日から
+        release = move_date + timedelta(days=1)
+        # 期限が閉庁日なら翌開庁日まで（utils.date_utils.calculate_deadline と同じ）
+        due = next_business_day(
+            move_date + timedelta(days=deadline.days_after or DEFAULT_AFTER_MOVE_DAYS)
+        )
+
+    if deadline.absolute_date is not None:
+        due = deadline.absolute_date.date()
+    return min(release, due), due
+
+
+def optimize_schedule(
+    procedures: Sequence[ProcedureSummary],
+    move_date: date,
+    options: Optional[ScheduleOptions] = None,
+) -> Schedule:
+    """
+    手続きを実施日に割り当てます。
+
+    Args:
+        procedures: 手続きリスト（概要のみで可）
+        move_date: 引越し日
+        options: スケジューリングの条件
+
+    Returns:
+        スケジュール（期限までに窓口の開いている日がない手続きだけ期限後の最も早い日に置き、
+        late に数える）
+    """
+    options = options or ScheduleOptions()
+    by_id = {p.id: p for p in procedures}
+
+    graph = analyze_dependencies(procedures)
+    if graph.is_acyclic:
+        order = list(graph.order)
+        deps = {
+            pid: [d for d in dict.fromkeys(by_id[pid].dependencies) if d in by_id]
+            for pid in order
+        }
+    else:
+        # 循環依存がある場合は依存関係を使わずに置く
+        order = list(by_id)
+        deps = {pid: [] for pid in order}
+    rank = {pid: i for i, pid in enumerate(order)}
+
+    release: Dict[str, date] = {}
+    due: Dict[str, date] = {}
+    for pid in order:
+        release[pid], due[pid] = deadline_window(by_id[pid], move_date)
+        location = office_location(by_id[pid])
+        if location is not None:
+            # 窓口の開いている最後の日までに置く（依存先の期限もそれに合わせて早める）
+            schedule = options.schedule_for(location)
+            last_open = _last_day(release[pid], due[pid], schedule.minutes_on)
+            if last_open is not None:
+                due[pid] = last_open
+    # 依存先より前には始められず、依存先は依存元の期限までに済ませる
+    for pid in order:
+        for dep in deps[pid]:
+            release[pid] = max(release[pid], release[dep])
+    for pid in reversed(order):
+        for dep in deps[pid]:
+            due[dep] = min(due[dep], due[pid])
+
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    waiting = {pid: len(deps[pid]) for pid in order}
+    for pid in order:
+        for dep in deps[pid]:
+            dependents[dep].append(pid)
+
+    def priority(pid: str) -> tuple:
+        return (due[pid], _PRIORITY_RANK.get(by_id[pid].priority, 1), rank[pid])
+
+    ready = [priority(pid) + (pid,) for pid in order if waiting[pid] == 0]
+    heapq.heapify(ready)
+
+    minutes: Dict[date, int] = defaultdict(int)
+    office_minutes: Dict[date, int] = defaultdict(int)
+    visits: Dict[str, List[date]] = defaultdict(list)
+    assignments: Dict[str, date] = {}
+
+    def fits(day: date, cost: int, location: Optional[str]) -> bool:
+        # 1件で上限を超える手続きは空いている日に置く
+        if location is not None:
+            open_minutes = options.schedule_for(location).minutes_on(day)
+            if not open_minutes or (
+                office_minutes[day] and office_minutes[day] + cost > open_minutes
+            ):
+                return False
+        return minutes[day] == 0 or minutes[day] + cost <= options.daily_budget_minutes
+
+    while ready:
+        pid = heapq.heappop(ready)[-1]
+        procedure = by_id[pid]
+        earliest = max([release[pid]] + [assignments[dep] for dep in deps[pid]])
+        location = office_location(procedure)
+        cost = procedure.estimated_duration
+        day = None
+
+        if location is not None:
+            # 期限内に同じ窓口を訪問する日があれば相乗り（移動時間は追加しない）
+            days = visits[location]
+            i = bisect.bisect_left(days, earliest)
+            while i < len(days) and days[i] <= due[pid]:
+                if fits(days[i], cost, location):
+                    day = days[i]
+                    break
+                i += 1
+
+        if day is None:
+            if location is not None:
+                cost += options.visit_overhead_minutes
+            day = _first_day(earliest, due[pid], lambda d: fits(d, cost, location))
+            if day is None:
+                # 期限が優先: 1日の上限を超えても、期限内で受付している最も空いている日に置く
+                open_days = [
+                    d
+                    for d in _days(earliest, due[pid])
+                    if location is None or options.schedule_for(location).minutes_on(d)
+                ]
+                day = min(open_days, key=lambda d: minutes[d], default=None)
+            if day is None:
+                # 期限内に受付している日がない場合だけ期限後に置く
+                day = max(earliest, due[pid] + timedelta(days=1))
+                while not fits(day, cost, location):
+                    day += timedelta(days=1)
+            if location is not None:
+                bisect.insort(visits[location], day)
+
+        assignments[pid] = day
+        minutes[day] += cost
+        if location is not None:
+            office_minutes[day] += cost
+
+        for dependent in dependents[pid]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(ready, priority(dependent) + (dependent,))
+
+    days: Dict[date, List[ProcedureSummary]] = defaultdict(list)
+    for pid in sorted(assignments, key=lambda pid: (assignments[pid], rank[pid])):
+        days[assignments[pid]].append(by_id[pid])
+
+    return Schedule(
+        assignments=assignments,
+        stats=schedule_stats(procedures, assignments, move_date, options),
+        days=dict(days),
+    )
+
+
+def _days(first: date, last: date) -> List[date]:
+    """first から last までの日付（first が後なら空）"""
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def _first_day(first: date, last: date, accept) -> Optional[date]:
+    """first から last までで accept を満たす最初の日"""
+    day = first
+    while day <= last:
+        if accept(day):
+            return day
+        day += timedelta(days=1)
+    return None
+
+
+def _last_day(first: date, last: date, accept) -> Optional[date]:
+    """first から last までで accept を満たす最後の日"""
+    day = last
+    while day >= first:
+        if accept(day):
+            return day
+        day -= timedelta(days=1)
+    return None
+
+
+def schedule_stats(
+    procedures: Sequence[ProcedureSummary],
+    assignments: Dict[str, date],
+    move_date: date,
+    options: Optional[ScheduleOptions] = None,
+) -> ScheduleStats:
+    """任意の割り当て（手続き ID → 実施日）の品質指標を計算"""
+    options = options or ScheduleOptions()
+    by_id = {p.id: p for p in procedures}
+    minutes: Dict[date, int] = defaultdict(int)
+    trips = set()
+    late = violations = closed = 0
+
+    for procedure in procedures:
+        day = assignments.get(procedure.id)
+        if day is None:
+            continue
+        minutes[day] += procedure.estimated_duration
+        location = office_location(procedure)
+        if location is not None:
+            if (day, location) not in trips:
+                trips.add((day, location))
+                minutes[day] += options.visit_overhead_minutes
+            if not options.schedule_for(location).minutes_on(day):
+                closed += 1
+        if day > deadline_window(procedure, move_date)[1]:
+            late += 1
+        for dep in procedure.dependencies:
+            if dep in by_id and dep in assignments and assignments[dep] > day:
+                violations += 1
+
+    return ScheduleStats(
+        procedures=len(assignments),
+        days_used=len(minutes),
+        office_trips=len(trips),
+        late=late,
+        dependency_violations=violations,
+        max_daily_minutes=max(minutes.values(), default=0),
+        closed_day_visits=closed,
+    )
+
+
+def build_timeline(
+    move_date: datetime,
+    procedures: Sequence[ProcedureSummary],
+    options: Optional[ScheduleOptions] = None,
+) -> Timeline:
+    """
+    手続きを実施日に割り当て、タイムラインを組み立てます。
+
+    Args:
+        move_date: 引越し日
+        procedures: 手続きリスト（概要のみで可）
+        options: スケジューリングの条件
+
+    Returns:
+        実施日ごとの手続きと、引越し日・優先度「高」の期限のマイルストーン
+    """
+    schedule = optimize_schedule(procedures, move_date.date(), options)
+
+    items = [
+        TimelineItem(
+            date=datetime.combine(day, time()),
+            label=date_label(move_date.date(), day),
+            procedures=[
+                TimelineProcedure(
+                    id=p.id,
+                    title=p.title,
+                    priority=p.priority,
+                    estimated_duration=p.estimated_duration,
+                    is_completed=p.is_completed,
+                )
+                for p in procs
+            ],
+        )
+        for day, procs in sorted(schedule.days.items())
+    ]
+
+    milestones = [Milestone(date=move_date, label="引越し当日", type=MilestoneType.MOVE_DATE)]
+    for procedure in procedures:
+        if procedure.priority == ProcedurePriority.HIGH and procedure.deadline.absolute_date:
+            milestones.append(
+                Milestone(
+                    date=procedure.deadline.absolute_date,
+                    label=f"{procedure.title}の期限",
+                    type=MilestoneType.DEADLINE,
+                )
+            )
+    milestones.sort(key=lambda m: m.date)
+
+    return Timeline(items=items, milestones=milestones)
+
+
+def date_label(move_date: date, day: date) -> str:
+    """引越し日からの相対ラベル"""
+    delta = (day - move_date).days
+    if delta == 0:
+        return "引越し当日"
+    elif delta > 0:
+        return f"引越し後{delta}日"
+    else:
+        return f"引越し{abs(delta)}日前"
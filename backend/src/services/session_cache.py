@@ -0,0 +1,139 @@
+"""セッションのプロセス内キャッシュ
+
+検証済みの Session をバージョン（updatedAt）付きで保持する LRU キャッシュです。
+件数とおおよそのメモリ量で上限を設け、超えた分は古いものから破棄します。
+保持期間を過ぎたエントリは updatedAt だけを読んで照合し、
+他インスタンスで更新されていなければ再利用します。
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from core.metrics import metrics
+from models.domain import Session
+
+logger = logging.getLogger(__name__)
+
+
+def session_version(updated_at: datetime) -> datetime:
+    """バージョン比較用に updatedAt をタイムゾーンなし（UTC）に揃える"""
+    return updated_at.replace(tzinfo=None)
+
+
+@dataclass
+class _Entry:
+    session: Session
+    version: datetime
+    size: int
+    checked_at: float
+
+
+class SessionCache:
+    """バージョン付きセッション LRU キャッシュ"""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 32 * 1024 * 1024,
+        revalidate_seconds: float = 60.0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    async def get(self, session_id: str, store) -> Optional[Session]:
+        """
+        セッションを取得します（キャッシュになければストアから読み込み）。
+
+        Args:
+            session_id: セッションID
+            store: FirestoreService 互換のデータストア
+
+        Returns:
+            セッションのコピー（存在しない場合は None）
+        """
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+            writes = self._writes
+
+        if entry is not None:
+            if time.monotonic() - entry.checked_at < self.revalidate_seconds:
+                metrics.increment("session_cache_hits_total")
+                return entry.session.model_copy(deep=True)
+
+            # 保持期間切れ: updatedAt だけ読んで他インスタンスの更新を確認
+            metrics.increment("session_cache_revalidations_total")
+            version = await store.get_session_version(session_id)
+            if version is not None and session_version(version) == entry.version:
+                entry.checked_at = time.monotonic()
+                return entry.session.model_copy(deep=True)
+
+        metrics.increment("session_cache_misses_total")
+        session = await store.get_session(session_id)
+        if session is None:
+            self.invalidate(session_id)
+            return None
+
+        self._put(session, writes)
+        return session.model_copy(deep=True)
+
+    def put(self, session: Session) -> None:
+        """保存直後のセッションを登録"""
+        with self._lock:
+            self._writes += 1
+            writes = self._writes
+        self._put(session, writes)
+
+    def contains(self, session_id: str) -> bool:
+        """セッションがキャッシュにあるか（読み込みもヒット率の計上もしない）"""
+        with self._lock:
+            return session_id in self._entries
+
+    def invalidate(self, session_id: str) -> None:
+        """更新されたセッションを破棄"""
+        with self._lock:
+            self._writes += 1
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry.size
+            self._publish()
+
+    def _put(self, session: Session, writes: int) -> None:
+        entry = _Entry(
+            session=session.model_copy(deep=True),
+            version=session_version(session.updated_at),
+            size=len(session.model_dump_json(by_alias=True)),
+            checked_at=time.monotonic(),
+        )
+        with self._lock:
+            # 読み込み中に更新が入った場合は古い可能性があるため登録しない
+            if writes != self._writes:
+                return
+            previous = self._entries.pop(session.session_id, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[session.session_id] = entry
+            self._bytes += entry.size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                metrics.increment("session_cache_evictions_total")
+            self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("session_cache_entries", len(self._entries))
+        metrics.set_gauge("session_cache_bytes", self._bytes)
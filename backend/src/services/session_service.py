@@ -1,11 +1,27 @@
 """セッション管理サービス"""
 
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
+import asyncio
 import logging
 from datetime import datetime
-from models.domain import Session, Procedure, Interview, SessionStatus
+from core.metrics import metrics
+from models.domain import (
+    ProgressCount,
+    Session,
+    SessionProgress,
+    Procedure,
+    ProcedureSummary,
+    Interview,
+    SessionStatus,
+    Timeline,
+    procedure_order_key,
+)
 from models.requests import CreateSessionRequest
 from services.firestore_service import FirestoreService
+from services.municipalities import normalize_location
+from services.session_cache import SessionCache, session_version
+from services.write_buffer import CompletionWriteBuffer
+from utils.cursor import encode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -13,30 +29,88 @@ logger = logging.getLogger(__name__)
 class SessionService:
     """セッション管理サービス"""
 
-    def __init__(self, firestore: FirestoreService):
+    def __init__(
+        self,
+        firestore: FirestoreService,
+        cache: Optional[SessionCache] = None,
+        write_buffer: Optional[CompletionWriteBuffer] = None,
+    ):
         self.firestore = firestore
+        self.cache = cache
+        self.write_buffer = write_buffer
 
     async def create_session(self, request: CreateSessionRequest) -> Session:
-        """新規セッションを作成"""
+        """新規セッションを作成（引越し元・先は市区町村コードで正規化）"""
         session = Session(
-            move_from=request.move_from,
-            move_to=request.move_to,
+            move_from=normalize_location(request.move_from),
+            move_to=normalize_location(request.move_to),
             move_date=request.move_date,
+            # 保存する文書に必ず progress を含める（未設定は集計の導入前のセッション）
+            progress=SessionProgress(),
         )
 
         await self.firestore.save_session(session)
+        if self.cache is not None:
+            self.cache.put(session)
         return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
-        """セッションを取得"""
-        return await self.firestore.get_session(session_id)
+        """セッションを取得（キャッシュがあれば読み込みを省略）"""
+        await self._flush_writes(session_id)
+        if self.cache is None:
+            session = await self.firestore.get_session(session_id)
+        else:
+            session = await self.cache.get(session_id, self.firestore)
+        if session is not None and "progress" not in session.model_fields_set:
+            session = await self._backfill_progress(session)
+        return session
+
+    async def _backfill_progress(self, session: Session) -> Session:
+        """
+        progress のないセッション（集計の導入前に作成）の集計を手続きから作り直して保存
+
+        読み込みと書き込みはストアの1トランザクションで行い、集計がないセッションへの
+        差分の加算はストア側で省くため、並行する更新があっても集計はずれません。
+        """
+        session_id = session.session_id
+        progress = await self.firestore.backfill_progress(session_id)
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
+        if progress is None:
+            # 他のリクエストが先に集計した
+            return await self.firestore.get_session(session_id) or session
+        metrics.increment("session_progress_backfills_total")
+        logger.info(f"Backfilled progress of session {session_id}")
+        return session.model_copy(update={"progress": progress})
+
+    async def session_exists(self, session_id: str) -> bool:
+        """
+        セッションの存在を確認
+
+        セッションは削除されないため、キャッシュにあれば読み込みません。
+        get_session と違い、書き込みバッファを書き出しません。
+        """
+        if self.cache is not None and self.cache.contains(session_id):
+            return True
+        return await self.firestore.get_session_version(session_id) is not None
+
+    async def _flush_writes(self, session_id: str) -> None:
+        """バッファ中の完了状態を書き出す（進捗集計や一覧を読む前に呼ぶ）"""
+        if self.write_buffer is not None:
+            await self.write_buffer.flush(session_id)
+
+    async def _update_session(self, session_id: str, updates: dict) -> None:
+        """セッションを更新し、キャッシュを破棄"""
+        await self.firestore.update_session(session_id, updates)
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
 
     async def update_interview(self, session_id: str, interview: Interview) -> None:
         """インタビュー情報を更新"""
         interview.completed_at = datetime.utcnow()
         interview_dict = interview.model_dump(by_alias=True, mode="json")
 
-        await self.firestore.update_session(
+        await self._update_session(
             session_id,
             {
                 "interview": interview_dict,
@@ -55,7 +129,25 @@ class SessionService:
         await self.firestore.save_procedures_batch(session_id, procedures)
 
         # セッションステータスを更新
-        await self.firestore.update_session(
+        await self._update_session(
+            session_id,
+            {
+                "status": SessionStatus.PROCEDURES_GENERATED.value,
+            },
+        )
+
+    async def save_procedures_chunk(self, session_id: str, procedures: List[Procedure]) -> None:
+        """ストリーミング生成中の手続きを小分けに保存"""
+        await self.firestore.save_procedures_batch(session_id, procedures)
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
+
+    async def complete_procedures(self, session_id: str, procedures: List[Procedure]) -> None:
+        """ストリーミング生成の完了後に依存関係を検証し、ステータスを更新"""
+        if not self.firestore.validate_dependencies(procedures):
+            logger.error(f"Invalid dependencies in procedures for session {session_id}")
+
+        await self._update_session(
             session_id,
             {
                 "status": SessionStatus.PROCEDURES_GENERATED.value,
@@ -64,20 +156,158 @@ class SessionService:
 
     async def get_procedures(self, session_id: str) -> List[Procedure]:
         """手続き一覧をサブコレクションから取得"""
+        await self._flush_writes(session_id)
         return await self.firestore.get_all_procedures(session_id)
 
+    async def get_procedure_summaries(self, session_id: str) -> List[ProcedureSummary]:
+        """手続き一覧を概要フィールドのみ取得（一覧・タイムライン表示用）"""
+        await self._flush_writes(session_id)
+        return await self.firestore.get_procedure_summaries(session_id)
+
+    async def query_procedures(
+        self,
+        session_id: str,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+        limit: Optional[int] = None,
+        start_after: Optional[List[Any]] = None,
+    ) -> Tuple[List[ProcedureSummary], Optional[str]]:
+        """
+        手続きの概要を条件で絞り込み、期限順にページ単位で取得
+
+        Args:
+            session_id: セッションID
+            category: カテゴリ
+            priority: 優先度
+            completed: 完了状態
+            limit: 1ページの件数（None で全件）
+            start_after: 前ページの next_cursor を decode_cursor で戻した並びキー
+
+        Returns:
+            (手続きの概要リスト, 次ページのカーソル。最後のページでは None)
+        """
+        await self._flush_writes(session_id)
+        procedures = await self.firestore.query_procedure_summaries(
+            session_id,
+            category=category,
+            priority=priority,
+            completed=completed,
+            start_after=start_after,
+            # 次ページの有無を判定するため1件多く取得
+            limit=limit + 1 if limit is not None else None,
+        )
+
+        if limit is None or len(procedures) <= limit:
+            return procedures, None
+        procedures = procedures[:limit]
+        return procedures, encode_cursor(procedure_order_key(procedures[-1]))
+
+    async def count_procedures(
+        self,
+        session: Session,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+    ) -> Tuple[int, int]:
+        """
+        絞り込み条件に一致する手続きの (全件数, 完了数)（ページ分割に関係なく全体の件数）
+
+        セッションの進捗集計から求めます。集計にない組み合わせ（カテゴリと優先度の両方）
+        の場合だけ、一致する手続きの概要を読んで数えます。
+        """
+        if category is not None and priority is not None:
+            procedures = await self.firestore.query_procedure_summaries(
+                session.session_id, category=category, priority=priority, completed=completed
+            )
+            return len(procedures), sum(1 for p in procedures if p.is_completed)
+
+        progress = session.progress
+        if category is not None:
+            count = progress.by_category.get(category, ProgressCount())
+        elif priority is not None:
+            count = progress.by_priority.get(priority, ProgressCount())
+        else:
+            count = progress
+
+        if completed is None:
+            return count.total, count.completed
+        if completed:
+            return count.completed, count.completed
+        return count.total - count.completed, 0
+
+    async def get_session_with_procedures(
+        self, session_id: str, summary: bool = False
+    ) -> Tuple[Optional[Session], List[ProcedureSummary]]:
+        """
+        セッションと手続き一覧を並行して取得（往復1回分の待ち時間）
+
+        summary=True の場合は手続きを概要フィールドのみで取得します。
+        """
+        procedures_task = (
+            self.get_procedure_summaries(session_id)
+            if summary
+            else self.get_procedures(session_id)
+        )
+        session, procedures = await asyncio.gather(self.get_session(session_id), procedures_task)
+        return session, procedures
+
+    async def get_timeline_view(self, session: Session) -> Optional[dict]:
+        """
+        実体化したタイムラインを取得（by_alias の JSON）
+
+        セッションと同じバージョンでない（手続きの生成などで古くなった）場合は None を返します。
+        """
+        view = await self.firestore.get_timeline(session.session_id)
+        if view is None or session_version(view["version"]) != session_version(session.updated_at):
+            metrics.increment("timeline_view_misses_total")
+            return None
+        metrics.increment("timeline_view_hits_total")
+        return view["timeline"]
+
+    async def save_timeline_view(self, session: Session, timeline: Timeline) -> dict:
+        """タイムラインをセッションのバージョン付きで保存し、保存した JSON を返す"""
+        data = timeline.model_dump(by_alias=True, mode="json")
+        await self.firestore.save_timeline(session.session_id, session.updated_at, data)
+        return data
+
     async def get_procedure(self, session_id: str, procedure_id: str) -> Optional[Procedure]:
-        """手続きをサブコレクションから取得"""
-        return await self.firestore.get_procedure(session_id, procedure_id)
+        """手続きをサブコレクションから取得（バッファ中の完了状態を反映）"""
+        procedure = await self.firestore.get_procedure(session_id, procedure_id)
+        if self.write_buffer is not None:
+            procedure = self.write_buffer.overlay(session_id, procedure)
+        return procedure
 
     async def update_procedure_completion(
-        self, session_id: str, procedure_id: str, is_completed: bool
-    ) -> None:
-        """手続きの完了状態を更新"""
-        updates = {
-            "isCompleted": is_completed,
-            "completedAt": datetime.utcnow() if is_completed else None,
-        }
-
-        # サブコレクション構造のため、トランザクション不要
-        await self.firestore.update_procedure(session_id, procedure_id, updates)
+        self,
+        session_id: str,
+        procedure_id: str,
+        is_completed: bool,
+        return_updated: bool = False,
+    ) -> Optional[Procedure]:
+        """
+        手続きの完了状態を更新
+
+        完了状態とセッションの進捗集計を1トランザクションで更新します。
+        書き込みバッファがある場合は手続きを読んで存在を確認し、書き込みはバッファに登録して
+        短い間隔でまとめて行います（同じセッションの連続した更新は1回の書き込みになる）。
+        return_updated=True の場合は更新後の手続きを返します（手続きが存在しない場合は None）。
+        """
+        completed_at = datetime.utcnow() if is_completed else None
+        if self.write_buffer is not None:
+            procedure = await self.get_procedure(session_id, procedure_id)
+            if procedure is None:
+                return None
+            if procedure.is_completed != is_completed:
+                self.write_buffer.submit(session_id, procedure_id, is_completed, completed_at)
+                procedure = procedure.model_copy(
+                    update={"is_completed": is_completed, "completed_at": completed_at}
+                )
+            return procedure if return_updated else None
+
+        procedure = await self.firestore.set_procedure_completion(
+            session_id, procedure_id, is_completed, completed_at
+        )
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
+        return procedure if return_updated else None
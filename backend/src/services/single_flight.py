@@ -0,0 +1,50 @@
+"""同一リクエストの重複実行を抑止する single-flight"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    同じキーの処理が実行中であれば、新たに実行せず結果を共有します。
+
+    実行は独立したタスクとして行うため、最初の呼び出し元がキャンセルされても
+    後続の呼び出し元は結果を受け取れます。
+    """
+
+    def __init__(self, name: str = "llm"):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """キーごとに fn を高々1つだけ実行し、その結果を返す"""
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.increment(f"{self.name}_single_flight_coalesced_total")
+        else:
+            metrics.increment(f"{self.name}_single_flight_executions_total")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            metrics.set_gauge(f"{self.name}_single_flight_inflight", len(self._inflight))
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        metrics.set_gauge(f"{self.name}_single_flight_inflight", len(self._inflight))
+
+        # 呼び出し元が全てキャンセルされた場合の未取得例外警告を抑止
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight task failed for key {key[:32]}: {task.exception()}")
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,580 @@
+"""SQLite ストレージエンジン（セルフホスト・複数ワーカー用）"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from models.domain import (
+    Procedure,
+    ProcedureSummary,
+    Session,
+    SessionProgress,
+    procedure_order_key,
+)
+from services.dependency_graph import check_dependencies
+from services.progress import (
+    apply_increments,
+    compute_progress,
+    has_progress,
+    progress_increments,
+)
+from services.timeline_view import patch_completions
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS procedures (
+    session_id TEXT NOT NULL,
+    procedure_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    is_completed INTEGER NOT NULL,
+    deadline_date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, procedure_id)
+);
+CREATE INDEX IF NOT EXISTS idx_procedures_order
+    ON procedures (session_id, deadline_date, procedure_id);
+CREATE INDEX IF NOT EXISTS idx_procedures_category
+    ON procedures (session_id, category, deadline_date, procedure_id);
+CREATE INDEX IF NOT EXISTS idx_procedures_priority
+    ON procedures (session_id, priority, deadline_date, procedure_id);
+CREATE INDEX IF NOT EXISTS idx_procedures_completed
+    ON procedures (session_id, is_completed, deadline_date, procedure_id);
+CREATE TABLE IF NOT EXISTS timelines (
+    session_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offices (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+"""
+
+_UPSERT_PROCEDURE = """
+INSERT INTO procedures
+    (session_id, procedure_id, category, priority, is_completed, deadline_date, data)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id, procedure_id) DO UPDATE SET
+    category = excluded.category,
+    priority = excluded.priority,
+    is_completed = excluded.is_completed,
+    deadline_date = excluded.deadline_date,
+    data = excluded.data
+"""
+
+
+class ConnectionPool:
+    """
+    sqlite3 接続の非同期プール
+
+    接続ごとに1スレッドで実行し（asyncio.to_thread）、イベントループを塞ぎません。
+    WAL モードのため読み込みは並行に進み、書き込みは busy_timeout の範囲で待ち合わせます。
+    """
+
+    def __init__(self, path: str, size: int = 4, busy_timeout_ms: int = 5000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connections: List[sqlite3.Connection] = []
+        self._idle: asyncio.Queue[sqlite3.Connection] = asyncio.Queue()
+        for _ in range(max(1, size)):
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {busy_timeout_ms}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._connections.append(conn)
+            self._idle.put_nowait(conn)
+        self._connections[0].executescript(_SCHEMA)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        空いている接続で fn をワーカースレッドから実行
+
+        呼び出し元がキャンセルされてもスレッドは止まらないため、
+        接続はスレッドの終了後にプールへ戻します（実行中の接続を他に渡さない）。
+        """
+        conn = await self._idle.get()
+        future = asyncio.ensure_future(asyncio.to_thread(fn, conn))
+        future.add_done_callback(lambda f: self._release(conn, f))
+        return await asyncio.shield(future)
+
+    def _release(self, conn: sqlite3.Connection, future: asyncio.Future) -> None:
+        self._idle.put_nowait(conn)
+        # 呼び出し元がキャンセル済みの場合の未取得例外警告を抑止
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"SQLite call failed after its caller left: {future.exception()}")
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """書き込みトランザクション（BEGIN IMMEDIATE で開始時に書き込みロックを取得）"""
+
+        def _run(conn: sqlite3.Connection) -> T:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+        return await self.run(_run)
+
+    def close(self) -> None:
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _procedure_row(session_id: str, procedure: Procedure) -> tuple:
+    return (
+        session_id,
+        procedure.id,
+        procedure.category.value,
+        procedure.priority.value,
+        int(procedure.is_completed),
+        procedure_order_key(procedure)[0],
+        procedure.model_dump_json(by_alias=True),
+    )
+
+
+def _increment_progress(
+    conn: sqlite3.Connection,
+    session_id: str,
+    increments: dict,
+    completions: Optional[Dict[str, bool]] = None,
+) -> None:
+    """
+    進捗集計に差分を加算（トランザクション内で呼ぶ）
+
+    completions を渡した場合、実体化したタイムラインが最新なら完了状態を書き換えて
+    セッションと同じバージョンに進めます。
+    """
+    if not increments:
+        return
+    row = conn.execute(
+        "SELECT data, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+    ).fetchone()
+    if row is None:
+        return
+    data = json.loads(row[0])
+    # 集計のないセッションは加算せず、次の取得時に集計し直す（backfill_progress）
+    if has_progress(data):
+        apply_increments(data, increments)
+    updated_at = _write_session(conn, session_id, data)
+
+    if not completions:
+        return
+    view = conn.execute(
+        "SELECT data FROM timelines WHERE session_id = ? AND version = ?", (session_id, row[1])
+    ).fetchone()
+    if view is not None:
+        timeline = json.loads(view[0])
+        patch_completions(timeline, completions)
+        conn.execute(
+            "UPDATE timelines SET version = ?, data = ? WHERE session_id = ?",
+            (updated_at, _dumps(timeline), session_id),
+        )
+
+
+def _write_session(conn: sqlite3.Connection, session_id: str, data: dict) -> str:
+    """セッションを書き込み、新しい updatedAt を返す"""
+    updated_at = datetime.utcnow().isoformat()
+    data["updatedAt"] = updated_at
+    conn.execute(
+        "UPDATE sessions SET data = ?, updated_at = ? WHERE session_id = ?",
+        (_dumps(data), updated_at, session_id),
+    )
+    return updated_at
+
+
+class SQLiteFirestoreService:
+    """
+    SQLite（WAL モード）によるデータストア（FirestoreService と同じインターフェース）
+
+    文書は JSON 列に保存し、絞り込みと並び順に使う列だけを別に持ってインデックスを張ります。
+    ファイルを共有すれば uvicorn の複数ワーカーから同じデータを読み書きでき、再起動後も残ります。
+    進捗集計の加算など読み込み→書き込みの更新は1トランザクションで行います。
+    """
+
+    def __init__(self, path: str = "data/tetsunavi.db", pool_size: int = 4):
+        self.path = path
+        self.pool = ConnectionPool(path, size=pool_size)
+        logger.info(f"SQLiteFirestoreService initialized ({path})")
+
+    async def close(self) -> None:
+        """全接続を閉じる"""
+        self.pool.close()
+
+    async def save_session(self, session: Session) -> None:
+        """セッションを保存"""
+        session.updated_at = datetime.utcnow()
+        data = session.model_dump_json(by_alias=True)
+        updated_at = session.updated_at.isoformat()
+
+        def _save(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session.session_id, data, updated_at),
+            )
+
+        await self.pool.run(_save)
+
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        """セッションを取得"""
+        row = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return Session.model_validate_json(row[0])
+
+    async def get_session_version(self, session_id: str) -> Optional[datetime]:
+        """セッションの updatedAt のみを取得（キャッシュの照合用）"""
+        row = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return datetime.fromisoformat(row[0])
+
+    async def update_session(self, session_id: str, updates: dict) -> None:
+        """セッションを部分的に更新"""
+
+        def _update(conn: sqlite3.Connection) -> None:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return
+            data = json.loads(row[0])
+            data.update(updates)
+            _write_session(conn, session_id, data)
+
+        await self.pool.transaction(_update)
+
+    async def save_procedure(self, session_id: str, procedure: Procedure) -> None:
+        """手続きの詳細を保存（完了状態は上書きしない）"""
+        procedure.updated_at = datetime.utcnow()
+
+        def _save(conn: sqlite3.Connection) -> None:
+            stored = procedure
+            row = conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ? AND procedure_id = ?",
+                (session_id, procedure.id),
+            ).fetchone()
+            if row is not None:
+                current = Procedure.model_validate_json(row[0])
+                stored = procedure.model_copy(
+                    update={
+                        "is_completed": current.is_completed,
+                        "completed_at": current.completed_at,
+                    }
+                )
+            conn.execute(_UPSERT_PROCEDURE, _procedure_row(session_id, stored))
+
+        await self.pool.transaction(_save)
+
+    async def save_procedures_batch(self, session_id: str, procedures: List[Procedure]) -> None:
+        """複数の手続きを1トランザクションで保存し、進捗集計に差分を加算"""
+        now = datetime.utcnow()
+        for procedure in procedures:
+            procedure.updated_at = now
+        rows = [_procedure_row(session_id, procedure) for procedure in procedures]
+        ids = [procedure.id for procedure in procedures]
+
+        def _save(conn: sqlite3.Connection) -> None:
+            existing = []
+            # SQLite の変数上限（既定 999）を超えないよう分割して既存の手続きを取得
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                existing.extend(
+                    ProcedureSummary.model_validate_json(data)
+                    for (data,) in conn.execute(
+                        f"SELECT data FROM procedures WHERE session_id = ? "
+                        f"AND procedure_id IN ({placeholders})",
+                        (session_id, *chunk),
+                    )
+                )
+            conn.executemany(_UPSERT_PROCEDURE, rows)
+            _increment_progress(
+                conn, session_id, progress_increments(added=procedures, removed=existing)
+            )
+
+        await self.pool.transaction(_save)
+
+    async def get_procedure(self, session_id: str, procedure_id: str) -> Optional[Procedure]:
+        """特定の手続きを取得"""
+        row = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ? AND procedure_id = ?",
+                (session_id, procedure_id),
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return Procedure.model_validate_json(row[0])
+
+    async def get_all_procedures(self, session_id: str) -> List[Procedure]:
+        """セッションの全手続きを取得"""
+        rows = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        )
+        return [Procedure.model_validate_json(data) for (data,) in rows]
+
+    async def get_procedure_summaries(self, session_id: str) -> List[ProcedureSummary]:
+        """セッションの全手続きを概要として取得"""
+        rows = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        )
+        return [ProcedureSummary.model_validate_json(data) for (data,) in rows]
+
+    async def query_procedure_summaries(
+        self,
+        session_id: str,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+        start_after: Optional[list] = None,
+        limit: Optional[int] = None,
+    ) -> List[ProcedureSummary]:
+        """手続きの概要を条件で絞り込み、期限順に取得（Firestore のクエリと同じ意味）"""
+        clauses = ["session_id = ?"]
+        params: list = [session_id]
+        filters = {"category": category, "priority": priority, "is_completed": completed}
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(int(value) if isinstance(value, bool) else value)
+
+        if start_after is not None:
+            # SQLite も NULL を先頭に並べるため、Firestore の startAfter と同じ範囲になる
+            absolute_date, procedure_id = start_after
+            if absolute_date is None:
+                clauses.append("(deadline_date IS NOT NULL OR procedure_id > ?)")
+                params.append(procedure_id)
+            else:
+                clauses.append(
+                    "(deadline_date > ? OR (deadline_date = ? AND procedure_id > ?))"
+                )
+                params.extend([absolute_date, absolute_date, procedure_id])
+
+        sql = (
+            f"SELECT data FROM procedures WHERE {' AND '.join(clauses)} "
+            "ORDER BY deadline_date, procedure_id"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = await self.pool.run(lambda conn: conn.execute(sql, params).fetchall())
+        return [ProcedureSummary.model_validate_json(data) for (data,) in rows]
+
+    async def update_procedure(self, session_id: str, procedure_id: str, updates: dict) -> None:
+        """手続きを更新"""
+
+        def _update(conn: sqlite3.Connection) -> None:
+            row = conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ? AND procedure_id = ?",
+                (session_id, procedure_id),
+            ).fetchone()
+            if row is None:
+                return
+            data = json.loads(row[0])
+            data.update(updates)
+            data["updatedAt"] = datetime.utcnow()
+            procedure = Procedure.model_validate(data)
+            conn.execute(_UPSERT_PROCEDURE, _procedure_row(session_id, procedure))
+
+        await self.pool.transaction(_update)
+
+    async def set_procedure_completion(
+        self,
+        session_id: str,
+        procedure_id: str,
+        is_completed: bool,
+        completed_at: Optional[datetime],
+    ) -> Optional[Procedure]:
+        """手続きの完了状態を更新し、更新後の内容を返す（状態が変わった場合のみ集計を加算）"""
+
+        def _update(conn: sqlite3.Connection) -> Optional[Procedure]:
+            row = conn.execute(
+                "SELECT data FROM procedures WHERE session_id = ? AND procedure_id = ?",
+                (session_id, procedure_id),
+            ).fetchone()
+            if row is None:
+                return None
+            before = Procedure.model_validate_json(row[0])
+            if before.is_completed == is_completed:
+                return before
+
+            after = before.model_copy(
+                update={
+                    "is_completed": is_completed,
+                    "completed_at": completed_at,
+                    "updated_at": datetime.utcnow(),
+                }
+            )
+            conn.execute(_UPSERT_PROCEDURE, _procedure_row(session_id, after))
+            _increment_progress(
+                conn,
+                session_id,
+                progress_increments(added=[after], removed=[before]),
+                completions={procedure_id: is_completed},
+            )
+            return after
+
+        return await self.pool.transaction(_update)
+
+    async def set_procedure_completions(
+        self, session_id: str, changes: Dict[str, Tuple[bool, Optional[datetime]]]
+    ) -> int:
+        """複数の手続きの完了状態を1トランザクションで更新し、状態が変わった手続きの数を返す"""
+        ids = list(changes)
+
+        def _update(conn: sqlite3.Connection) -> int:
+            now = datetime.utcnow()
+            added, removed = [], []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for (data,) in conn.execute(
+                    f"SELECT data FROM procedures WHERE session_id = ? "
+                    f"AND procedure_id IN ({placeholders})",
+                    (session_id, *chunk),
+                ).fetchall():
+                    before = Procedure.model_validate_json(data)
+                    is_completed, completed_at = changes[before.id]
+                    if before.is_completed == is_completed:
+                        continue
+                    removed.append(before)
+                    added.append(
+                        before.model_copy(
+                            update={
+                                "is_completed": is_completed,
+                                "completed_at": completed_at,
+                                "updated_at": now,
+                            }
+                        )
+                    )
+            conn.executemany(
+                _UPSERT_PROCEDURE, [_procedure_row(session_id, p) for p in added]
+            )
+            _increment_progress(
+                conn,
+                session_id,
+                progress_increments(added=added, removed=removed),
+                completions={p.id: p.is_completed for p in added},
+            )
+            return len(added)
+
+        return await self.pool.transaction(_update)
+
+    async def backfill_progress(self, session_id: str) -> Optional[SessionProgress]:
+        """
+        progress のないセッションの集計を手続きから作り直して保存（1トランザクション）
+
+        Returns:
+            保存した集計（セッションがない・すでに集計がある場合は None）
+        """
+
+        def _backfill(conn: sqlite3.Connection) -> Optional[SessionProgress]:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            data = json.loads(row[0])
+            if has_progress(data):
+                return None
+            progress = compute_progress(
+                ProcedureSummary.model_validate_json(procedure)
+                for (procedure,) in conn.execute(
+                    "SELECT data FROM procedures WHERE session_id = ?", (session_id,)
+                )
+            )
+            data["progress"] = progress.model_dump(by_alias=True)
+            _write_session(conn, session_id, data)
+            return progress
+
+        return await self.pool.transaction(_backfill)
+
+    async def get_timeline(self, session_id: str) -> Optional[dict]:
+        """実体化したタイムラインを取得（{"version", "timeline"}）"""
+        row = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT version, data FROM timelines WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return {"version": datetime.fromisoformat(row[0]), "timeline": json.loads(row[1])}
+
+    async def save_timeline(self, session_id: str, version: datetime, timeline: dict) -> None:
+        """実体化したタイムラインを保存"""
+        data = _dumps(timeline)
+        await self.pool.run(
+            lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO timelines (session_id, version, data) VALUES (?, ?, ?)",
+                (session_id, version.replace(tzinfo=None).isoformat(), data),
+            )
+        )
+
+    async def get_office(self, key: str) -> Optional[dict]:
+        """窓口ディレクトリから取得（期限切れは None）"""
+        row = await self.pool.run(
+            lambda conn: conn.execute(
+                "SELECT data FROM offices WHERE key = ? AND expires_at >= ?",
+                (key, datetime.utcnow().isoformat()),
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    async def save_office(self, key: str, office: dict, expires_at: datetime) -> None:
+        """窓口ディレクトリに保存"""
+        data = _dumps(office)
+        expires = expires_at.replace(tzinfo=None).isoformat()
+        await self.pool.run(
+            lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO offices (key, data, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires),
+            )
+        )
+
+    def validate_dependencies(self, procedures: List[Procedure]) -> bool:
+        """依存関係に循環がないか検証（循環があれば該当する手続き ID をログに出す）"""
+        return check_dependencies(procedures)
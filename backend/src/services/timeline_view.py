@@ -0,0 +1,46 @@
+"""タイムラインの実体化ビュー
+
+生成したタイムラインをセッションごとに JSON で保存し、セッションの updatedAt を
+バージョンとして持たせます。手続きの完了状態が変わったときは、ストアが同じ
+トランザクションで該当する手続きの isCompleted だけを書き換えてバージョンを進めます。
+手続きの生成などそれ以外の更新ではバージョンがずれるため、次の取得時に作り直します。
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from models.domain import Session
+from services.session_cache import session_version
+
+TIMELINE_VIEW_ID = "timeline"
+
+
+def timeline_etag(session: Session) -> str:
+    """タイムラインの ETag（セッションのバージョンから決まる）"""
+    version = session_version(session.updated_at).isoformat()
+    digest = hashlib.sha1(f"{session.session_id}:{version}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match ヘッダーが ETag に一致するか（弱い比較）"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def patch_completions(timeline: dict, changes: Dict[str, bool]) -> None:
+    """
+    実体化したタイムライン（by_alias の JSON）の完了状態を書き換えます。
+
+    Args:
+        timeline: {"timeline": [...], "milestones": [...]}
+        changes: {手続きID: 完了状態}
+    """
+    for item in timeline["timeline"]:
+        for procedure in item["procedures"]:
+            if procedure["id"] in changes:
+                procedure["isCompleted"] = changes[procedure["id"]]
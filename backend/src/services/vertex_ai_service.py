@@ -1,27 +1,90 @@
 """Vertex AI クライアント"""
 
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from google.api_core import exceptions as google_exceptions
 from google.cloud import aiplatform
 from core.config import settings
-from core.exceptions import AIServiceError
-from tenacity import retry, stop_after_attempt, wait_exponential
+from core.exceptions import AIServiceError, ServiceOverloadedError
+from services.llm_cache import LLMResponseCache, make_cache_key
+from services.rate_limiter import AdaptiveConcurrencyLimiter, TokenBucket
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+from utils.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Retry-After が得られない 429 の待機秒数
+DEFAULT_RATE_LIMIT_PAUSE_SECONDS = 2.0
 
-class VertexAIService:
-    """Vertex AI クライアント"""
 
-    def __init__(self):
+def _is_rate_limited(error: Exception) -> bool:
+    """上流のレート制限（429 / RESOURCE_EXHAUSTED）か判定"""
+    if isinstance(error, (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted)):
+        return True
+    return getattr(error, "code", None) == 429
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After ヘッダー、または gRPC の RetryInfo から待機秒数を取得"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            pass
+
+    for detail in getattr(error, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+
+    return None
+
+
+class VertexAIService:
+    """Vertex AI クライアント（プロセス内で1インスタンスを共有）"""
+
+    def __init__(
+        self,
+        cache: Optional[LLMResponseCache] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        token_budget: Optional[TokenBucket] = None,
+    ):
         aiplatform.init(
             project=settings.GOOGLE_CLOUD_PROJECT, location=settings.VERTEX_AI_LOCATION
         )
         self.model_name = settings.VERTEX_AI_MODEL
+        self.cache = cache
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            initial_limit=settings.VERTEX_AI_INITIAL_CONCURRENCY,
+            max_limit=settings.VERTEX_AI_MAX_CONCURRENCY,
+        )
+        self.token_budget = token_budget or TokenBucket(
+            tokens_per_minute=settings.VERTEX_AI_TOKENS_PER_MINUTE
+        )
+        self._model = None
+
+    @property
+    def model(self):
+        """GenerativeModel ハンドル（初回アクセス時に生成して再利用）"""
+        if self._model is None:
+            from vertexai.generative_models import GenerativeModel
+
+            self._model = GenerativeModel(self.model_name)
+        return self._model
+
+    def warm_up(self) -> None:
+        """起動時にモデルハンドルを生成しておく"""
+        _ = self.model
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def generate_text(
-        self, prompt: str, temperature: float = 0.7, max_tokens: int = 2048
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        use_cache: bool = True,
     ) -> str:
         """
         Gemini 2.0 Flash でテキスト生成します。
@@ -30,16 +93,56 @@ class VertexAIService:
             prompt: プロンプト
             temperature: 温度（0.0-1.0）
             max_tokens: 最大トークン数
+            use_cache: レスポンスキャッシュを使用するか
 
         Returns:
             生成されたテキスト
         """
+        if self.cache is None or not use_cache:
+            return await self._generate_content(prompt, temperature, max_tokens)
+
+        key = make_cache_key(prompt, self.model_name, temperature, max_tokens)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = await self._generate_content(prompt, temperature, max_tokens)
+        await self.cache.set(key, text)
+        return text
+
+    async def _acquire(self, prompt: str) -> None:
+        """トークン予算と実行枠を取得（待ち行列の期限を超えたら負荷遮断）"""
+        deadline = time.monotonic() + settings.VERTEX_AI_QUEUE_TIMEOUT_SECONDS
+        tokens = estimate_tokens(prompt)
+        await self.token_budget.acquire(tokens, deadline - time.monotonic())
         try:
-            from vertexai.generative_models import GenerativeModel
-
-            model = GenerativeModel(self.model_name)
-
-            response = await model.generate_content_async(
+            await self.limiter.acquire(deadline - time.monotonic())
+        except BaseException:
+            # 実行枠を取れなかった（負荷遮断・キャンセル）呼び出しは予算を消費しない
+            self.token_budget.refund(tokens)
+            raise
+
+    def _on_error(self, error: Exception) -> bool:
+        """エラーを記録し、レート制限なら Retry-After に従ってリミッターを停止する"""
+        if not _is_rate_limited(error):
+            return False
+        pause = _retry_after_seconds(error)
+        self.limiter.pause(pause if pause is not None else DEFAULT_RATE_LIMIT_PAUSE_SECONDS)
+        return True
+
+    # 負荷遮断（ServiceOverloadedError）は再試行しない。
+    # 再試行も毎回リミッターを通るため、429 時は Retry-After 明けまで待機する。
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(ServiceOverloadedError),
+    )
+    async def _generate_content(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Gemini を呼び出す（流量制御・リトライ付き）"""
+        await self._acquire(prompt)
+        rate_limited = False
+        try:
+            response = await self.model.generate_content_async(
                 prompt,
                 generation_config={
                     "temperature": temperature,
@@ -47,12 +150,75 @@ class VertexAIService:
                 },
             )
 
-            return response.text
+            text = response.text
+            self.token_budget.charge(estimate_tokens(text))
+            return text
 
         except Exception as e:
+            rate_limited = self._on_error(e)
             logger.error(f"Vertex AI text generation failed: {e}", exc_info=True)
             raise AIServiceError(f"テキスト生成に失敗しました: {str(e)}")
 
+        finally:
+            await self.limiter.release(overloaded=rate_limited)
+
+    async def stream_text(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Gemini の出力をチャンク単位でストリーミングします。
+
+        キャッシュにヒットした場合は全文を1チャンクで返し、
+        ストリームを最後まで受信できた場合は全文をキャッシュに保存します。
+
+        Args:
+            prompt: プロンプト
+            temperature: 温度（0.0-1.0）
+            max_tokens: 最大トークン数
+            use_cache: レスポンスキャッシュを使用するか
+
+        Yields:
+            生成されたテキストの断片
+        """
+        key = None
+        if self.cache is not None and use_cache:
+            key = make_cache_key(prompt, self.model_name, temperature, max_tokens)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        await self._acquire(prompt)
+        rate_limited = False
+        chunks = []
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={
+                    "temperature": temperature,
+                    "max_output_tokens": max_tokens,
+                },
+                stream=True,
+            )
+            async for chunk in response:
+                text = chunk.text
+                chunks.append(text)
+                yield text
+        except Exception as e:
+            rate_limited = self._on_error(e)
+            logger.error(f"Vertex AI streaming generation failed: {e}", exc_info=True)
+            raise AIServiceError(f"テキスト生成に失敗しました: {str(e)}")
+        finally:
+            self.token_budget.charge(estimate_tokens("".join(chunks)))
+            await self.limiter.release(overloaded=rate_limited)
+
+        if key is not None:
+            await self.cache.set(key, "".join(chunks))
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def search_knowledge(self, query: str, max_results: int = 10) -> list[Dict[str, Any]]:
         """
@@ -0,0 +1,199 @@
+"""手続き完了状態の書き込みバッファ
+
+チェックボックスの連続操作など、短時間に集中する完了状態の更新をセッション単位で溜め、
+一定時間（ウィンドウ）ごとに1回の書き込み（1トランザクション）へまとめます。
+同じ手続きへの更新は最後の状態だけが書き込まれ、進捗集計を持つセッション文書への
+書き込みもセッションごとに1回で済みます。
+
+バッファはプロセスごとに持つため、書き込み前の状態が読み込みに反映される（read-your-writes）
+のは同じプロセス内だけです。他のワーカー・インスタンスからは、書き込みまで
+（ウィンドウの分、書き込みに失敗した場合は再試行が成功するまで）古い状態が見えます。
+書き込みに失敗した更新はバッファに戻し、間隔を延ばしながら再試行します。
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple, TypeVar
+
+from core.metrics import metrics
+from models.domain import ProcedureSummary
+
+logger = logging.getLogger(__name__)
+
+Completion = Tuple[bool, Optional[datetime]]
+P = TypeVar("P", bound=ProcedureSummary)
+
+# 書き込みに失敗したときの再試行間隔の上限（秒）
+RETRY_MAX_SECONDS = 30.0
+
+
+@dataclass
+class _Pending:
+    changes: Dict[str, Completion] = field(default_factory=dict)
+    submitted: int = 0
+
+
+class CompletionWriteBuffer:
+    """
+    完了状態の更新をまとめて書き込むセッション単位のバッファ
+
+    submit() はストアに書き込まずに戻ります。書き込み前の状態は overlay() で
+    読み込み結果に重ねて返し、集計を含む読み込みの前には flush() で書き出します。
+    シャットダウン時は close() で残りをすべて書き出します。
+    """
+
+    def __init__(self, store, window_seconds: float = 0.25, max_batch: int = 200, cache=None):
+        self.store = store
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.cache = cache
+        self._pending: Dict[str, _Pending] = {}
+        self._inflight: Dict[str, Dict[str, Completion]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._flushers: Dict[str, int] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._failures: Dict[str, int] = {}
+        self._closed = False
+
+    def submit(
+        self,
+        session_id: str,
+        procedure_id: str,
+        is_completed: bool,
+        completed_at: Optional[datetime],
+    ) -> None:
+        """完了状態の更新を登録（同じ手続きへの更新は後勝ちでまとめる）"""
+        pending = self._pending.setdefault(session_id, _Pending())
+        pending.changes[procedure_id] = (is_completed, completed_at)
+        pending.submitted += 1
+        metrics.increment("completion_writes_submitted_total")
+        self._update_gauge()
+
+        if len(pending.changes) >= self.max_batch:
+            self._schedule(session_id, delay=0)
+        elif session_id not in self._timers:
+            self._schedule(session_id, delay=self.window_seconds)
+
+    def overlay(self, session_id: str, procedure: Optional[P]) -> Optional[P]:
+        """未書き込みの完了状態を読み込み結果に重ねる（read-your-writes）"""
+        if procedure is None:
+            return None
+        pending = self._pending.get(session_id)
+        state = pending.changes.get(procedure.id) if pending else None
+        if state is None:
+            state = self._inflight.get(session_id, {}).get(procedure.id)
+        if state is None or state[0] == procedure.is_completed:
+            return procedure
+        return procedure.model_copy(update={"is_completed": state[0], "completed_at": state[1]})
+
+    def has_pending(self, session_id: str) -> bool:
+        """未書き込み（書き込み中を含む）の更新があるか"""
+        return session_id in self._pending or session_id in self._inflight
+
+    async def flush(self, session_id: str) -> None:
+        """
+        セッションの未書き込みの更新を書き出す（書き込み中のものは完了を待つ）
+
+        書き込みは別タスクで行うため、呼び出し元がキャンセルされても（クライアントの切断など）
+        書き込みと失敗時のバッファへの戻しは最後まで行われます。
+        """
+        if not self.has_pending(session_id):
+            return
+        task = asyncio.ensure_future(self._flush(session_id))
+        task.add_done_callback(_retrieve_exception)
+        await asyncio.shield(task)
+
+    async def _flush(self, session_id: str) -> None:
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._flushers[session_id] = self._flushers.get(session_id, 0) + 1
+        try:
+            async with lock:
+                pending = self._pending.pop(session_id, None)
+                if pending is None:
+                    return
+                self._inflight[session_id] = pending.changes
+                try:
+                    await self.store.set_procedure_completions(session_id, pending.changes)
+                except BaseException as e:
+                    # 失敗した更新は、その後に登録された更新を優先して戻す
+                    metrics.increment("completion_write_errors_total")
+                    retry = self._pending.setdefault(session_id, _Pending())
+                    retry.changes = {**pending.changes, **retry.changes}
+                    retry.submitted += pending.submitted
+                    if isinstance(e, Exception):
+                        self._schedule_retry(session_id)
+                    raise
+                finally:
+                    del self._inflight[session_id]
+                    self._update_gauge()
+        finally:
+            self._flushers[session_id] -= 1
+            if not self._flushers[session_id]:
+                del self._flushers[session_id]
+                del self._locks[session_id]
+
+        self._failures.pop(session_id, None)
+        if self.cache is not None:
+            self.cache.invalidate(session_id)
+        metrics.increment("completion_write_batches_total")
+        metrics.increment("completion_writes_saved_total", pending.submitted - 1)
+
+    def _schedule_retry(self, session_id: str) -> None:
+        """失敗した書き込みを、失敗の回数に応じて間隔を延ばして再試行する"""
+        if self._closed:
+            return
+        failures = self._failures.get(session_id, 0) + 1
+        self._failures[session_id] = failures
+        delay = min(max(self.window_seconds, 0.1) * 2**failures, RETRY_MAX_SECONDS)
+        metrics.increment("completion_write_retries_total")
+        self._schedule(session_id, delay=delay)
+
+    async def close(self) -> None:
+        """タイマーを止め、すべての未書き込みの更新を書き出す"""
+        self._closed = True
+        timers = list(self._timers.values())
+        self._timers.clear()
+        for timer in timers:
+            timer.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+
+        for session_id in set(self._pending) | set(self._inflight):
+            try:
+                await self.flush(session_id)
+            except Exception:
+                logger.exception(f"Failed to flush completion writes for session {session_id}")
+
+    def _schedule(self, session_id: str, delay: float) -> None:
+        timer = self._timers.get(session_id)
+        if timer is not None:
+            if delay > 0:
+                return
+            timer.cancel()
+        self._timers[session_id] = asyncio.create_task(self._flush_later(session_id, delay))
+
+    async def _flush_later(self, session_id: str, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        # 以降の flush は取り消さない（書き込み中のキャンセルで更新を失わないため）
+        if self._timers.get(session_id) is asyncio.current_task():
+            del self._timers[session_id]
+        try:
+            await self.flush(session_id)
+        except Exception:
+            logger.exception(f"Failed to flush completion writes for session {session_id}")
+
+    def _update_gauge(self) -> None:
+        metrics.set_gauge(
+            "completion_writes_pending",
+            sum(len(p.changes) for p in self._pending.values()),
+        )
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """呼び出し元がキャンセル済みの書き込みの未取得例外警告を抑止（失敗はメトリクスとログに残る）"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Completion write failed after its caller left: {task.exception()}")
@@ -0,0 +1,245 @@
+"""行政機関の開庁日カレンダー
+
+土日・国民の祝日（振替休日・国民の休日を含む）・年末年始（12/29〜1/3）を閉庁日とします。
+祝日は祝日法の規則から計算するため、外部の API やデータファイルは使いません。
+
+年ごとに開庁日のビット列（1/1 からの日数がビット位置）と、そこから作った
+累積の開庁日数・次/前の開庁日の表を1回だけ作って保持します。
+各問い合わせは表を引くだけの O(1)（年をまたぐ場合は年数に比例）です。
+
+祝日を計算できない年（YEAR_MIN〜YEAR_MAX の外）は、土日と年末年始だけを閉庁日とします。
+"""
+
+import logging
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# 現行の祝日法（昭和の日・振替休日の拡張）と春分・秋分の近似式が使える範囲
+YEAR_MIN = 2007
+YEAR_MAX = 2099
+
+_FIXED_HOLIDAYS = {
+    (1, 1): "元日",
+    (2, 11): "建国記念の日",
+    (4, 29): "昭和の日",
+    (5, 3): "憲法記念日",
+    (5, 4): "みどりの日",
+    (5, 5): "こどもの日",
+    (11, 3): "文化の日",
+    (11, 23): "勤労感謝の日",
+}
+
+# 特別措置法などで移動・追加された祝日
+_SPECIAL_HOLIDAYS = {
+    2019: {(5, 1): "即位の日", (10, 22): "即位礼正殿の儀の行われる日"},
+    2020: {(7, 23): "海の日", (7, 24): "スポーツの日", (8, 10): "山の日"},
+    2021: {(7, 22): "海の日", (7, 23): "スポーツの日", (8, 8): "山の日"},
+}
+
+
+def _nth_monday(year: int, month: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(7 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _equinox_day(year: int, base: float) -> int:
+    return int(base + 0.242194 * (year - 1980)) - (year - 1980) // 4
+
+
+def _in_range(year: int) -> bool:
+    return YEAR_MIN <= year <= YEAR_MAX
+
+
+@lru_cache(maxsize=None)
+def _national_holidays(year: int) -> Dict[date, str]:
+    """国民の祝日（振替休日・国民の休日を除く）"""
+    holidays = {date(year, m, d): name for (m, d), name in _FIXED_HOLIDAYS.items()}
+    holidays[_nth_monday(year, 1, 2)] = "成人の日"
+    holidays[date(year, 3, _equinox_day(year, 20.8431))] = "春分の日"
+    holidays[date(year, 9, _equinox_day(year, 23.2488))] = "秋分の日"
+    holidays[_nth_monday(year, 9, 3)] = "敬老の日"
+
+    if year <= 2018:
+        holidays[date(year, 12, 23)] = "天皇誕生日"
+    elif year >= 2020:
+        holidays[date(year, 2, 23)] = "天皇誕生日"
+
+    if year in _SPECIAL_HOLIDAYS:
+        for (m, d), name in _SPECIAL_HOLIDAYS[year].items():
+            holidays[date(year, m, d)] = name
+    if year not in (2020, 2021):
+        holidays[_nth_monday(year, 7, 3)] = "海の日"
+        holidays[_nth_monday(year, 10, 2)] = "スポーツの日" if year >= 2020 else "体育の日"
+        if year >= 2016:
+            holidays[date(year, 8, 11)] = "山の日"
+    return holidays
+
+
+def japanese_holidays(year: int) -> Dict[date, str]:
+    """
+    その年の休日（国民の祝日・振替休日・国民の休日）
+
+    対象外の年は祝日を計算できないため空の辞書を返します。
+    """
+    if not _in_range(year):
+        return {}
+    national = _national_holidays(year)
+    holidays = dict(national)
+    for day in sorted(national):
+        # 祝日が日曜日なら、その後の最も近い祝日でない日が振替休日
+        if day.weekday() == 6:
+            substitute = day + timedelta(days=1)
+            while substitute in national:
+                substitute += timedelta(days=1)
+            holidays[substitute] = "振替休日"
+        # 前日と翌日が祝日の日は国民の休日
+        between = day + timedelta(days=1)
+        if between not in national and between + timedelta(days=1) in national:
+            holidays.setdefault(between, "国民の休日")
+    return dict(sorted(holidays.items()))
+
+
+def _is_year_end_closure(day: date) -> bool:
+    return (day.month == 12 and day.day >= 29) or (day.month == 1 and day.day <= 3)
+
+
+@dataclass(frozen=True)
+class _YearTable:
+    """1年分の開庁日の表"""
+
+    # 1/1 の序数（date.toordinal）
+    start: int
+    # 1/1 からの日数をビット位置とする開庁日のビット列
+    bits: int
+    # 同じく休日（祝日・振替休日・国民の休日・年末年始）のビット列
+    holidays: int
+    # counts[i]: 1/1 から i 日目の前日までの開庁日数（長さは日数 + 1）
+    counts: array
+    # next_open[i]: i 日目以降の最初の開庁日（年内になければ日数）
+    next_open: array
+    # prev_open[i] + 1: i 日目以前の最後の開庁日 + 1（年内になければ 0）
+    prev_open: array
+
+    @property
+    def days(self) -> int:
+        return len(self.counts) - 1
+
+
+@lru_cache(maxsize=None)
+def _year_table(year: int) -> _YearTable:
+    if not _in_range(year):
+        logger.warning(
+            f"Holidays are not computed for {year} ({YEAR_MIN}-{YEAR_MAX}); "
+            "using weekends and year-end closure only"
+        )
+    holidays = japanese_holidays(year)
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+
+    bits = closed = 0
+    for i in range(days):
+        day = first + timedelta(days=i)
+        if day in holidays or _is_year_end_closure(day):
+            closed |= 1 << i
+        elif day.weekday() < 5:
+            bits |= 1 << i
+
+    counts = array("H", [0]) * (days + 1)
+    prev_open = array("H", [0]) * days
+    last = 0
+    for i in range(days):
+        is_open = (bits >> i) & 1
+        counts[i + 1] = counts[i] + is_open
+        if is_open:
+            last = i + 1
+        prev_open[i] = last
+
+    next_open = array("H", [days]) * days
+    following = days
+    for i in reversed(range(days)):
+        if (bits >> i) & 1:
+            following = i
+        next_open[i] = following
+
+    return _YearTable(
+        start=first.toordinal(),
+        bits=bits,
+        holidays=closed,
+        counts=counts,
+        next_open=next_open,
+        prev_open=prev_open,
+    )
+
+
+def _locate(day: date):
+    table = _year_table(day.year)
+    return table, day.toordinal() - table.start
+
+
+def is_business_day(day: date) -> bool:
+    """開庁日か"""
+    table, i = _locate(day)
+    return bool((table.bits >> i) & 1)
+
+
+def is_holiday(day: date) -> bool:
+    """祝日・年末年始か（土日は含まない）"""
+    table, i = _locate(day)
+    return bool((table.holidays >> i) & 1)
+
+
+def next_business_day(day: date) -> date:
+    """その日以降で最初の開庁日（開庁日ならその日）"""
+    year = day.year
+    table, i = _locate(day)
+    while table.next_open[i] == table.days:
+        year += 1
+        table, i = _year_table(year), 0
+    return date.fromordinal(table.start + table.next_open[i])
+
+
+def previous_business_day(day: date) -> date:
+    """その日以前で最後の開庁日（開庁日ならその日）"""
+    year = day.year
+    table, i = _locate(day)
+    while table.prev_open[i] == 0:
+        year -= 1
+        table = _year_table(year)
+        i = table.days - 1
+    return date.fromordinal(table.start + table.prev_open[i] - 1)
+
+
+def business_days_between(start: date, end: date) -> int:
+    """start 以上 end 未満の開庁日数（end が前なら負数）"""
+    if end < start:
+        return -business_days_between(end, start)
+    start_table, i = _locate(start)
+    end_table, j = _locate(end)
+    if start.year == end.year:
+        return end_table.counts[j] - start_table.counts[i]
+    total = start_table.counts[-1] - start_table.counts[i] + end_table.counts[j]
+    for year in range(start.year + 1, end.year):
+        total += _year_table(year).counts[-1]
+    return total
+
+
+def next_business_days(days: Iterable[date]) -> List[date]:
+    """next_business_day の一括版（年の表は1回ずつ引く）"""
+    tables: Dict[int, _YearTable] = {}
+    result = []
+    for day in days:
+        table = tables.get(day.year)
+        if table is None:
+            table = tables[day.year] = _year_table(day.year)
+        i = day.toordinal() - table.start
+        offset = table.next_open[i]
+        if offset < table.days:
+            result.append(date.fromordinal(table.start + offset))
+        else:
+            result.append(next_business_day(day))
+    return result
@@ -0,0 +1,31 @@
+"""ページネーション用カーソル
+
+並び順のキー（最後に返した要素の値）を URL セーフな不透明文字列にします。
+"""
+
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """並び順のキーをカーソル文字列に変換"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    カーソル文字列を並び順のキーに戻す
+
+    Raises:
+        ValueError: 不正なカーソル
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
@@ -1,7 +1,9 @@
 """日付計算ユーティリティ"""
 
 from datetime import datetime, timedelta
-from models.domain import DeadlineType
+from typing import List, Optional, Sequence, Tuple
+from models.domain import Deadline, DeadlineType
+from utils.business_calendar import next_business_days, previous_business_day
 
 
 def calculate_deadline(
@@ -10,6 +12,9 @@ def calculate_deadline(
     """
     引越し日から期限を計算します。
 
+    期限が閉庁日（土日祝・年末年始）に当たる場合、引越し前は直前の開庁日に、
+    引越し後は翌開庁日にずらします（行政機関の休日に関する法律と同じ扱い）。
+
     Args:
         move_date: 引越し日
         deadline_type: 期限タイプ
@@ -18,16 +23,71 @@ def calculate_deadline(
     Returns:
         計算された期限日時
     """
-    if deadline_type == DeadlineType.BEFORE_MOVE:
-        # 引越し前の場合は引越し日の前日
-        return move_date - timedelta(days=1)
-    elif deadline_type == DeadlineType.ON_MOVE_DATE:
-        # 引越し当日
-        return move_date
-    elif deadline_type == DeadlineType.AFTER_MOVE:
-        # 引越し後の場合は指定日数後
-        if days_after is None:
-            raise ValueError("AFTER_MOVE の場合は days_after が必要です")
-        return move_date + timedelta(days=days_after)
-    else:
-        raise ValueError(f"不明な期限タイプ: {deadline_type}")
+    return calculate_deadlines(move_date, [(deadline_type, days_after)])[0]
+
+
+def calculate_deadlines(
+    move_date: datetime, deadlines: Sequence[Tuple[DeadlineType, Optional[int]]]
+) -> List[datetime]:
+    """
+    calculate_deadline の一括版（セッションの手続きの期限をまとめて計算）
+
+    Args:
+        move_date: 引越し日
+        deadlines: (期限タイプ, 引越し後の日数) のリスト
+
+    Returns:
+        計算された期限日時のリスト（同じ順序）
+    """
+    move_day = move_date.date()
+    before_move: Optional[datetime] = None
+    after_move: List[int] = []
+
+    for deadline_type, days_after in deadlines:
+        if deadline_type == DeadlineType.AFTER_MOVE:
+            if days_after is None:
+                raise ValueError("AFTER_MOVE の場合は days_after が必要です")
+            after_move.append(days_after)
+        elif deadline_type not in (DeadlineType.BEFORE_MOVE, DeadlineType.ON_MOVE_DATE):
+            raise ValueError(f"不明な期限タイプ: {deadline_type}")
+
+    # 引越し後の期限は翌開庁日に（同じ日数はまとめて1回だけ引く）
+    offsets = sorted(set(after_move))
+    shifted = next_business_days(move_day + timedelta(days=days) for days in offsets)
+    after_dates = {
+        days: move_date + (day - move_day) for days, day in zip(offsets, shifted)
+    }
+
+    results = []
+    for deadline_type, days_after in deadlines:
+        if deadline_type == DeadlineType.BEFORE_MOVE:
+            # 引越し前の場合は引越し日の前日（閉庁日なら直前の開庁日）
+            if before_move is None:
+                day = previous_business_day(move_day - timedelta(days=1))
+                before_move = move_date + (day - move_day)
+            results.append(before_move)
+        elif deadline_type == DeadlineType.ON_MOVE_DATE:
+            # 引越し当日
+            results.append(move_date)
+        else:
+            results.append(after_dates[days_after])
+    return results
+
+
+def fill_deadline_dates(move_date: datetime, deadlines: Sequence[Deadline]) -> None:
+    """
+    absolute_date が未設定の期限に、計算した期限日時をまとめて設定します。
+
+    時期の幅がある BEFORE_MOVE と、days_after のない AFTER_MOVE の期限はそのままにします
+    （ProcedureAgent と同じ扱い）。
+    """
+    targets = [
+        d
+        for d in deadlines
+        if d.absolute_date is None
+        and d.type != DeadlineType.BEFORE_MOVE
+        and not (d.type == DeadlineType.AFTER_MOVE and d.days_after is None)
+    ]
+    dates = calculate_deadlines(move_date, [(d.type, d.days_after) for d in targets])
+    for deadline, absolute_date in zip(targets, dates):
+        deadline.absolute_date = absolute_date
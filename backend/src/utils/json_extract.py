@@ -0,0 +1,112 @@
+"""LLM 出力からの JSON 抽出"""
+
+import json
+import re
+from enum import Enum
+from typing import Any, Optional, Tuple
+
+from utils.json_stream import JSONArrayStreamParser
+
+_CODE_FENCE = re.compile(r"```[a-zA-Z]*[ \t]*\n?")
+_CLOSERS = {"{": "}", "[": "]"}
+_TOKEN = re.compile(r'[{}\[\]"]')
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+# 説明文中の「[20] 件」などと区別するため、走査時は [ の直後が { か ] の場合だけ配列とみなす
+_OPENER = re.compile(r"\{|\[(?=\s*[{\]])")
+
+
+class ExtractStatus(str, Enum):
+    """抽出結果"""
+
+    OK = "ok"
+    RECOVERED = "recovered"
+    FAILED = "failed"
+
+
+def strip_code_fences(text: str) -> str:
+    """コードフェンスで囲まれていれば中身だけを返す（閉じフェンスがなくても可）"""
+    match = _CODE_FENCE.search(text)
+    if not match:
+        return text
+    body = text[match.end():]
+    end = body.find("```")
+    return body if end == -1 else body[:end]
+
+
+def extract_json(text: str) -> Tuple[Optional[Any], ExtractStatus]:
+    """
+    LLM 出力から最も外側の JSON 値を抽出します。
+
+    先頭から括弧の対応を数えながら1回走査し、最初に閉じた値をデコードします。
+    説明文中の括弧などでデコードできなかった場合は次の開き括弧から再開します。
+    走査時はオブジェクトと、オブジェクトの配列（空の配列を含む）だけを対象にします。
+    出力が途中で切れた配列は、閉じている要素だけを残して復元します。
+
+    Args:
+        text: LLM の出力
+
+    Returns:
+        (抽出した値, ステータス)。抽出できなければ (None, FAILED)
+    """
+    body = strip_code_fences(text).strip()
+
+    # 大半の出力は JSON のみなので、そのままデコードできれば走査しない
+    try:
+        return json.loads(body), ExtractStatus.OK
+    except json.JSONDecodeError:
+        pass
+
+    start = _next_opener(body, 0)
+
+    while start != -1:
+        end = _find_matching_close(body, start)
+        if end == -1:
+            # 閉じないまま終端に達した（出力の打ち切り）
+            if body[start] != "[":
+                return None, ExtractStatus.FAILED
+            items = JSONArrayStreamParser().feed(body[start:])
+            if items:
+                return items, ExtractStatus.RECOVERED
+            start = _next_opener(body, start + 1)
+            continue
+
+        try:
+            return json.loads(body[start : end + 1]), ExtractStatus.OK
+        except json.JSONDecodeError:
+            start = _next_opener(body, start + 1)
+
+    return None, ExtractStatus.FAILED
+
+
+def _next_opener(text: str, pos: int) -> int:
+    """pos 以降で最初のオブジェクトまたはオブジェクトの配列の開始位置"""
+    match = _OPENER.search(text, pos)
+    return match.start() if match else -1
+
+
+def _find_matching_close(text: str, start: int) -> int:
+    """start の開き括弧に対応する閉じ括弧の位置（見つからなければ -1）"""
+    stack = [_CLOSERS[text[start]]]
+    pos = start + 1
+
+    while True:
+        match = _TOKEN.search(text, pos)
+        if not match:
+            return -1
+
+        char = match.group()
+        if char == '"':
+            # 文字列リテラルは閉じ引用符まで読み飛ばす
+            rest = _STRING_REST.match(text, match.end())
+            if not rest:
+                return -1
+            pos = rest.end()
+            continue
+
+        pos = match.end()
+        if char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char != stack.pop():
+            return match.start()  # 括弧の不整合はデコード側で検出させる
+        elif not stack:
+            return match.start()
@@ -0,0 +1,94 @@
+"""ストリーミング JSON パーサー"""
+
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class JSONArrayStreamParser:
+    """
+    LLM のストリーミング出力から JSON 配列の要素を逐次取り出すパーサー。
+
+    チャンクを feed() するたびに、閉じ括弧まで届いたトップレベル要素の
+    オブジェクトを返します。配列の前後にあるコードフェンスや説明文は無視します。
+    説明文中の括弧（「[20] 件」など）と区別するため、次の空白以外の文字が
+    { か ] の [ だけを配列の開始とみなします。
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._started = False
+        self._opening = False  # [ を読み、次の文字で配列の開始か判定する
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """チャンクを追加し、完成した要素のリストを返す"""
+        items: List[Dict[str, Any]] = []
+
+        for char in chunk:
+            if self._finished:
+                break
+
+            if not self._started:
+                if self._opening and not char.isspace():
+                    self._opening = False
+                    if char == "]":
+                        # 空の配列
+                        self._finished = True
+                        continue
+                    if char == "{":
+                        self._started = True
+                if not self._started:
+                    if char == "[":
+                        self._opening = True
+                    continue
+
+            if self._depth > 0:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # トップレベル配列の終端
+                    self._finished = True
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._decode("".join(self._buffer))
+                    if item is not None:
+                        items.append(item)
+                    self._buffer = []
+
+        return items
+
+    @property
+    def finished(self) -> bool:
+        """トップレベル配列が閉じたか"""
+        return self._finished
+
+    def _decode(self, text: str) -> Dict[str, Any] | None:
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed array element: {e}")
+            return None
+        return value if isinstance(value, dict) else None
@@ -0,0 +1,9 @@
+"""トークン数の概算"""
+
+# 日本語 JSON 出力の文字数あたりトークン数の概算
+CHARS_PER_TOKEN = 1.5
+
+
+def estimate_tokens(text: str) -> int:
+    """文字数からトークン数を概算"""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
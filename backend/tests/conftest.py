@@ -0,0 +1,51 @@
+"""テスト共通のフィクスチャ"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.domain import (
+    Deadline,
+    DeadlineType,
+    Location,
+    Procedure,
+    ProcedureCategory,
+    ProcedurePriority,
+    Session,
+)
+
+
+@pytest.fixture
+def make_session():
+    """Session を作る（既定は 東京都渋谷区 → 神奈川県横浜市、60日後）"""
+
+    def make(**overrides) -> Session:
+        values = {
+            "move_from": Location(prefecture="東京都", city="渋谷区"),
+            "move_to": Location(prefecture="神奈川県", city="横浜市"),
+            "move_date": datetime.utcnow() + timedelta(days=60),
+        }
+        values.update(overrides)
+        return Session(**values)
+
+    return make
+
+
+@pytest.fixture
+def make_procedure():
+    """Procedure を作る（既定は引越し後 14 日以内の行政手続き）"""
+
+    def make(title: str = "転入届", **overrides) -> Procedure:
+        values = {
+            "title": title,
+            "category": ProcedureCategory.ADMINISTRATIVE,
+            "priority": ProcedurePriority.HIGH,
+            "deadline": Deadline(
+                type=DeadlineType.AFTER_MOVE, days_after=14, description="引越し後14日以内"
+            ),
+            "estimated_duration": 30,
+        }
+        values.update(overrides)
+        return Procedure(**values)
+
+    return make
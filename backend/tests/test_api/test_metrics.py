@@ -0,0 +1,31 @@
+"""/metrics エンドポイントのテスト"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.config import settings
+from main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_requires_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+
+def test_metrics_with_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "counters" in response.json()
@@ -0,0 +1,83 @@
+"""手続き API のテスト（モックモード・インメモリストア）"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def session_id(client):
+    response = client.post(
+        "/api/v1/sessions",
+        json={
+            "moveFrom": {"prefecture": "東京都", "city": "渋谷区"},
+            "moveTo": {"prefecture": "神奈川県", "city": "横浜市"},
+            "moveDate": (datetime.utcnow() + timedelta(days=60)).isoformat(),
+        },
+    )
+    session_id = response.json()["data"]["sessionId"]
+    client.post(
+        f"/api/v1/sessions/{session_id}/interview",
+        json={"answers": [{"questionId": "has_car", "value": True}]},
+    )
+    assert client.post(f"/api/v1/sessions/{session_id}/procedures").status_code == 200
+    return session_id
+
+
+def list_procedures(client, session_id, **params):
+    response = client.get(f"/api/v1/sessions/{session_id}/procedures", params=params)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+def test_counts_cover_all_pages(client, session_id):
+    everything = list_procedures(client, session_id)
+    total = len(everything["procedures"])
+    assert everything["totalCount"] == total
+
+    page = list_procedures(client, session_id, limit=5)
+    assert len(page["procedures"]) == 5
+    assert page["totalCount"] == total
+    assert page["nextCursor"]
+
+
+def test_counts_follow_filters(client, session_id):
+    everything = list_procedures(client, session_id)["procedures"]
+    first = everything[0]
+    response = client.patch(
+        f"/api/v1/sessions/{session_id}/procedures/{first['id']}", json={"isCompleted": True}
+    )
+    assert response.status_code == 200
+
+    administrative = [p for p in everything if p["category"] == "行政"]
+    data = list_procedures(client, session_id, category="行政", limit=2)
+    assert data["totalCount"] == len(administrative)
+
+    both = [p for p in administrative if p["priority"] == "高"]
+    data = list_procedures(client, session_id, category="行政", priority="高", limit=2)
+    assert data["totalCount"] == len(both)
+
+    data = list_procedures(client, session_id, completed=True)
+    assert (data["totalCount"], data["completedCount"]) == (1, 1)
+    data = list_procedures(client, session_id, completed=False, limit=3)
+    assert (data["totalCount"], data["completedCount"]) == (len(everything) - 1, 0)
+
+
+def test_invalid_cursor(client, session_id):
+    response = client.get(f"/api/v1/sessions/{session_id}/procedures", params={"cursor": "zzz"})
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_unknown_session(client):
+    response = client.get("/api/v1/sessions/missing/procedures", params={"limit": 5})
+    assert response.status_code == 404
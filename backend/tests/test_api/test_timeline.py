@@ -0,0 +1,101 @@
+"""タイムライン API のテスト（モックモード・インメモリストア）"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.metrics import metrics
+from main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def session_id(client):
+    response = client.post(
+        "/api/v1/sessions",
+        json={
+            "moveFrom": {"prefecture": "東京都", "city": "渋谷区"},
+            "moveTo": {"prefecture": "神奈川県", "city": "横浜市"},
+            "moveDate": (datetime.utcnow() + timedelta(days=60)).isoformat(),
+        },
+    )
+    session_id = response.json()["data"]["sessionId"]
+    client.post(
+        f"/api/v1/sessions/{session_id}/interview",
+        json={"answers": [{"questionId": "has_car", "value": True}]},
+    )
+    assert client.post(f"/api/v1/sessions/{session_id}/procedures").status_code == 200
+    return session_id
+
+
+def timeline_procedures(response) -> dict:
+    """タイムラインの {手続きID: 完了状態}"""
+    return {
+        procedure["id"]: procedure["isCompleted"]
+        for item in response.json()["data"]["timeline"]
+        for procedure in item["procedures"]
+    }
+
+
+def test_not_modified_with_matching_etag(client, session_id):
+    first = client.get(f"/api/v1/sessions/{session_id}/timeline")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get(
+        f"/api/v1/sessions/{session_id}/timeline", headers={"If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert client.get(
+        f"/api/v1/sessions/{session_id}/timeline", headers={"If-None-Match": f"W/{etag}"}
+    ).status_code == 304
+
+
+def test_completion_patches_view(client, session_id):
+    first = client.get(f"/api/v1/sessions/{session_id}/timeline")
+    procedure_id, completed = next(iter(timeline_procedures(first).items()))
+    assert completed is False
+
+    response = client.patch(
+        f"/api/v1/sessions/{session_id}/procedures/{procedure_id}", json={"isCompleted": True}
+    )
+    assert response.status_code == 200
+
+    hits = metrics.get("timeline_view_hits_total")
+    second = client.get(
+        f"/api/v1/sessions/{session_id}/timeline",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert timeline_procedures(second)[procedure_id] is True
+    # 再生成せず、実体化したタイムラインの書き換えで応答する
+    assert metrics.get("timeline_view_hits_total") == hits + 1
+
+
+def test_regenerating_procedures_rebuilds_view(client, session_id):
+    first = client.get(f"/api/v1/sessions/{session_id}/timeline")
+    response = client.post(f"/api/v1/sessions/{session_id}/procedures")
+    assert response.status_code == 200
+    generated = {
+        p["id"] for p in response.json()["data"]["procedures"] if p["deadline"].get("absoluteDate")
+    }
+
+    misses = metrics.get("timeline_view_misses_total")
+    second = client.get(
+        f"/api/v1/sessions/{session_id}/timeline",
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert metrics.get("timeline_view_misses_total") == misses + 1
+    assert generated
+    assert generated <= set(timeline_procedures(second))
+    assert not generated & set(timeline_procedures(first))
@@ -0,0 +1,85 @@
+"""手続きの依存関係グラフのテスト"""
+
+import pytest
+
+from services.dependency_graph import (
+    analyze_dependencies,
+    check_dependencies,
+    topological_order,
+)
+
+
+@pytest.fixture
+def chain(make_procedure):
+    """c → b → a の順に依存する手続き（入力は依存元が先）"""
+
+    def make():
+        a = make_procedure("a", id="a")
+        b = make_procedure("b", id="b", dependencies=["a"])
+        c = make_procedure("c", id="c", dependencies=["b"])
+        return [c, b, a]
+
+    return make
+
+
+def test_order_puts_dependencies_first(chain):
+    procedures = chain()
+    assert [p.id for p in topological_order(procedures)] == ["a", "b", "c"]
+    assert check_dependencies(procedures)
+
+
+def test_independent_procedures_keep_input_order(make_procedure):
+    procedures = [make_procedure(id=procedure_id) for procedure_id in ["x", "y", "z"]]
+    assert [p.id for p in topological_order(procedures)] == ["x", "y", "z"]
+
+
+def test_unknown_dependencies_are_ignored(make_procedure):
+    procedures = [make_procedure(id="a", dependencies=["missing", "missing"])]
+    graph = analyze_dependencies(procedures)
+    assert graph.is_acyclic
+    assert graph.order == ("a",)
+
+
+def test_cycle_is_reported(chain):
+    procedures = chain()
+    procedures[2].dependencies = ["c"]
+    graph = analyze_dependencies(procedures)
+    assert not graph.is_acyclic
+    assert set(graph.cycle) == {"a", "b", "c"}
+    assert not check_dependencies(procedures)
+    # 循環がある場合は元の順序
+    assert topological_order(procedures) == procedures
+
+
+def test_duplicate_ids_are_merged(make_procedure):
+    procedures = [
+        make_procedure(id="a"),
+        make_procedure(id="b", dependencies=["a"]),
+        make_procedure(id="a"),
+    ]
+    graph = analyze_dependencies(procedures)
+    assert graph.is_acyclic
+    assert graph.order == ("a", "b")
+    # 同じ ID の手続きはどちらも失わずに並べる
+    assert [p.id for p in topological_order(procedures)] == ["a", "a", "b"]
+
+
+def test_duplicate_ids_with_cycle_do_not_raise(make_procedure):
+    procedures = [
+        make_procedure(id="a", dependencies=["b"]),
+        make_procedure(id="b", dependencies=["a"]),
+        make_procedure(id="b", dependencies=["a"]),
+    ]
+    graph = analyze_dependencies(procedures)
+    assert set(graph.cycle) == {"a", "b"}
+
+
+def test_long_chain_does_not_recurse(make_procedure):
+    n = 5000
+    procedures = [
+        make_procedure(id=f"p{i}", dependencies=[f"p{i + 1}"] if i + 1 < n else [])
+        for i in range(n)
+    ]
+    graph = analyze_dependencies(procedures)
+    assert graph.order[0] == f"p{n - 1}"
+    assert graph.order[-1] == "p0"
@@ -0,0 +1,72 @@
+"""手続き詳細の先読みのテスト"""
+
+import asyncio
+
+from models.domain import Document
+from services.detail_prefetcher import DetailPrefetcher
+
+
+class _FakeStore:
+    def __init__(self):
+        self.saved = []
+
+    async def save_procedure(self, session_id, procedure):
+        self.saved.append(procedure.id)
+
+
+class _FakeSessionService:
+    def __init__(self, procedures):
+        self.procedures = {p.id: p for p in procedures}
+        self.firestore = _FakeStore()
+
+    async def get_procedure(self, session_id, procedure_id):
+        return self.procedures.get(procedure_id)
+
+
+class _SlowRootAgent:
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+
+    def detail_batch_size(self):
+        return 1
+
+    async def get_procedure_details_batch(self, session, procedures):
+        await self.release.wait()
+        documents = [Document(name="本人確認書類", description="運転免許証など")]
+        return [p.model_copy(update={"documents": documents}) for p in procedures]
+
+
+async def test_wait_for_returns_prefetched_detail(make_session, make_procedure):
+    session = make_session()
+    procedure = make_procedure()
+    release = asyncio.Event()
+    prefetcher = DetailPrefetcher(_SlowRootAgent(release), wait_timeout_seconds=1.0)
+    prefetcher.schedule(session, [procedure], _FakeSessionService([procedure]))
+
+    waiter = asyncio.create_task(prefetcher.wait_for(session.session_id, procedure.id))
+    await asyncio.sleep(0)
+    release.set()
+
+    result = await waiter
+    assert result is not None and result.documents
+    await prefetcher.shutdown()
+
+
+async def test_wait_for_is_bounded_while_queued(make_session, make_procedure):
+    session = make_session()
+    procedures = [make_procedure("転入届"), make_procedure("国民健康保険")]
+    release = asyncio.Event()
+    prefetcher = DetailPrefetcher(
+        _SlowRootAgent(release), concurrency=1, wait_timeout_seconds=0.05
+    )
+    prefetcher.schedule(session, procedures, _FakeSessionService(procedures))
+
+    # 2件目は1件目の後ろで順番待ちのまま、期限で None を返す
+    assert await prefetcher.wait_for(session.session_id, procedures[1].id) is None
+    release.set()
+    await prefetcher.shutdown()
+
+
+async def test_wait_for_unknown_procedure(make_session):
+    prefetcher = DetailPrefetcher(_SlowRootAgent(asyncio.Event()))
+    assert await prefetcher.wait_for(make_session().session_id, "missing") is None
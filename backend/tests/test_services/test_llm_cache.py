@@ -0,0 +1,67 @@
+"""LLM レスポンスキャッシュのテスト"""
+
+import pytest
+
+from services import llm_cache
+from services.llm_cache import InMemoryLLMCache, LLMCacheBackend, LLMResponseCache, make_cache_key
+
+
+def test_cache_key_ignores_whitespace_differences():
+    a = make_cache_key("東京都  渋谷区\n\n  手続き ", "gemini", 0.2, 1024)
+    b = make_cache_key("東京都 渋谷区\n手続き", "gemini", 0.2, 1024)
+    assert a == b
+
+
+def test_cache_key_depends_on_model_settings():
+    base = make_cache_key("prompt", "gemini", 0.2, 1024)
+    assert base != make_cache_key("prompt", "other", 0.2, 1024)
+    assert base != make_cache_key("prompt", "gemini", 0.7, 1024)
+    assert base != make_cache_key("prompt", "gemini", 0.2, 2048)
+    assert base != make_cache_key("other prompt", "gemini", 0.2, 1024)
+
+
+async def test_in_memory_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+    cache = InMemoryLLMCache(ttl_seconds=10)
+
+    await cache.set("key", "value")
+    assert await cache.get("key") == "value"
+    now[0] += 11
+    assert await cache.get("key") is None
+    assert len(cache) == 0
+
+
+async def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemoryLLMCache(max_entries=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+
+    assert await cache.get("a") == "1"
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "3"
+
+
+class _BrokenBackend(LLMCacheBackend):
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, key, value):
+        raise ConnectionError("down")
+
+
+async def test_backend_failure_is_a_miss():
+    cache = LLMResponseCache(_BrokenBackend())
+    await cache.set("key", "value")
+    assert await cache.get("key") is None
+
+
+def test_backend_without_all_methods_cannot_be_created():
+    class _GetOnly(LLMCacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        _GetOnly()
@@ -0,0 +1,70 @@
+"""市区町村の正規化のテスト"""
+
+import pytest
+from pydantic import ValidationError
+
+from models.domain import Location
+from services.municipalities import MunicipalityIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return MunicipalityIndex.load()
+
+
+@pytest.mark.parametrize(
+    ("prefecture", "city", "code"),
+    [
+        ("東京都", "渋谷区", "131130"),
+        ("東京", "渋谷", "131130"),
+        ("東京都　", " 渋谷区", "131130"),
+        ("東京都", "東京都渋谷区", "131130"),
+        ("東京都", "渋谷区神南1-2-3", "131130"),
+        ("東京都", "渋谷１－２－３", "131130"),
+        ("不明", "東京都渋谷区", "131130"),
+        ("神奈川県", "横浜市中区", "141003"),
+        ("神奈川", "横浜中区", "141003"),
+        ("埼玉県", "さいたま", "111007"),
+        ("東京都", "府中市", "132063"),
+        ("広島県", "府中市", "342084"),
+        ("東京都", "中央区", "131024"),
+    ],
+)
+def test_resolves_variants(index, prefecture, city, code):
+    assert index.resolve(prefecture, city) == code
+    assert index.normalize(Location(prefecture=prefecture, city=city)).code == code
+
+
+@pytest.mark.parametrize(
+    ("prefecture", "city"),
+    [
+        ("大阪府", "大阪狭山市"),  # 大阪市 の語幹で始まる別の市
+        ("広島県", "府中町"),  # 府中市 の語幹で始まる別の町
+        ("不明", "中央区"),  # 都道府県が分からない
+        ("東京都", "ＡＢＣ市"),
+    ],
+)
+def test_keeps_unknown_input_unchanged(index, prefecture, city):
+    location = Location(prefecture=prefecture, city=city)
+    assert index.resolve(prefecture, city) is None
+    assert index.normalize(location) == location
+    assert index.normalize(location).code is None
+
+
+def test_drops_unknown_code(index):
+    location = Location(prefecture="東京都", city="架空市", code="999999")
+    assert index.normalize(location) == Location(prefecture="東京都", city="架空市")
+
+
+def test_normalized_locations_are_shared_and_frozen(index):
+    shibuya = index.normalize(Location(prefecture="東京", city="渋谷"))
+    assert shibuya == Location(prefecture="東京都", city="渋谷区", code="131130")
+    assert index.normalize(Location(prefecture="東京都", city="渋谷区")) is shibuya
+    with pytest.raises(ValidationError):
+        shibuya.city = "新宿区"
+
+
+def test_empty_index_resolves_nothing(tmp_path):
+    index = MunicipalityIndex.load(str(tmp_path / "missing.json"))
+    location = Location(prefecture="東京都", city="渋谷区")
+    assert index.normalize(location) is location
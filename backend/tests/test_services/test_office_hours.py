@@ -0,0 +1,106 @@
+"""窓口の受付時間のテスト"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+from models.domain import Location
+from services.office_hours import DEFAULT_SCHEDULE, OfficeHours, parse_schedule
+
+SCHEDULE_DATA = {
+    "weekly": {"mon-fri": ["08:30-17:15"], "fri": ["08:30-19:00"]},
+    "monthly": [{"weekday": "sat", "weeks": [2, 4], "hours": ["09:00-12:00"]}],
+    "closed": ["2026-11-13"],
+}
+
+
+@pytest.fixture
+def schedule():
+    return parse_schedule(SCHEDULE_DATA)
+
+
+def test_same_data_shares_instance(schedule):
+    assert parse_schedule(json.loads(json.dumps(SCHEDULE_DATA))) is schedule
+    assert parse_schedule({"weekly": {"mon-fri": ["08:30-17:15"]}}) is DEFAULT_SCHEDULE
+
+
+@pytest.mark.parametrize(
+    ("moment", "expected"),
+    [
+        (datetime(2026, 11, 2, 8, 29), False),  # 月曜の開始前
+        (datetime(2026, 11, 2, 8, 30), True),
+        (datetime(2026, 11, 2, 17, 14), True),
+        (datetime(2026, 11, 2, 17, 15), False),
+        (datetime(2026, 11, 5, 18, 30), False),  # 木曜
+        (datetime(2026, 11, 6, 18, 30), True),  # 金曜は延長
+        (datetime(2026, 11, 7, 10, 0), False),  # 第1土曜
+        (datetime(2026, 11, 14, 10, 0), True),  # 第2土曜
+        (datetime(2026, 11, 3, 10, 0), False),  # 文化の日
+        (datetime(2026, 11, 13, 10, 0), False),  # 臨時の閉庁日
+        (datetime(2026, 12, 29, 10, 0), False),  # 年末年始
+        (datetime(2100, 2, 11, 10, 0), True),  # 祝日を計算できない年も例外にしない
+    ],
+)
+def test_is_open_at(schedule, moment, expected):
+    assert schedule.is_open_at(moment) is expected
+
+
+def test_minutes_on(schedule):
+    assert schedule.minutes_on(date(2026, 11, 2)) == 525
+    assert schedule.minutes_on(date(2026, 11, 6)) == 630
+    assert schedule.minutes_on(date(2026, 11, 14)) == 180
+    assert schedule.minutes_on(date(2026, 11, 7)) == 0
+    assert schedule.minutes_on(date(2026, 11, 3)) == 0
+    assert schedule.minutes_on(date(2026, 11, 13)) == 0
+
+
+def test_describe(schedule):
+    assert schedule.describe() == (
+        "月〜木 8:30〜17:15 / 金 8:30〜19:00 / 第2・第4土曜 9:00〜12:00"
+    )
+    assert DEFAULT_SCHEDULE.describe() == "平日 8:30〜17:15"
+    assert parse_schedule({}).describe() == "お問い合わせください"
+
+
+def test_invalid_hours_raise():
+    with pytest.raises(ValueError):
+        parse_schedule({"weekly": {"mon": ["17:00-09:00"]}})
+
+
+def test_load_and_fallbacks(tmp_path):
+    path = tmp_path / "office_hours.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "dataVersion": "test",
+                "defaults": {"POLICE": {"weekly": {"mon-fri": ["09:00-17:00"]}}},
+                "municipalities": {
+                    "131130": {
+                        "prefecture": "東京都",
+                        "city": "渋谷区",
+                        "offices": {"CITY_HALL": SCHEDULE_DATA},
+                    }
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    office_hours = OfficeHours.load(str(path))
+    shibuya = Location(prefecture="東京都", city="渋谷区")
+
+    assert office_hours.data_version == "test"
+    assert office_hours.municipality_code(shibuya) == "131130"
+    assert office_hours.schedule(shibuya, "CITY_HALL") is parse_schedule(SCHEDULE_DATA)
+    assert office_hours.hours_text(shibuya, "POLICE") == "平日 9:00〜17:00"
+    assert office_hours.schedule(shibuya, "PENSION_OFFICE") is DEFAULT_SCHEDULE
+    assert office_hours.is_open_at(shibuya, "CITY_HALL", datetime(2026, 11, 6, 18, 30))
+
+
+def test_load_ignores_unknown_version(tmp_path):
+    path = tmp_path / "office_hours.json"
+    path.write_text(json.dumps({"version": 99}), encoding="utf-8")
+    office_hours = OfficeHours.load(str(path))
+    assert office_hours.schedules == {}
+    assert OfficeHours.load(str(tmp_path / "missing.json")).defaults == {}
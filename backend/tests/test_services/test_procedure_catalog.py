@@ -0,0 +1,20 @@
+"""手続きカタログのテスト"""
+
+from services.procedure_catalog import ProcedureCatalog
+
+
+def test_procedures_are_hydrated_for_each_session(make_session, make_procedure):
+    catalog = ProcedureCatalog()
+    source = make_session()
+    catalog.add_procedures(
+        source, [make_procedure(visit_location=f"{source.move_to.city}役所 {{2階}}")]
+    )
+
+    session = make_session()
+    (procedure,) = catalog.get_procedures(session)
+    assert procedure.visit_location == f"{session.move_to.city}役所 {{2階}}"
+    assert procedure.deadline.absolute_date is not None
+
+
+def test_unknown_route_is_a_miss(make_session):
+    assert ProcedureCatalog().get_procedures(make_session()) is None
@@ -0,0 +1,121 @@
+"""進捗集計のテスト"""
+
+import asyncio
+import json
+
+from models.domain import DeadlineType, Location, ProcedurePriority
+from models.requests import CreateSessionRequest
+from services.mock_firestore_service import InMemoryFirestoreService
+from services.progress import compute_progress, progress_increments
+from services.session_cache import SessionCache
+from services.session_service import SessionService
+from services.sqlite_store import SQLiteFirestoreService
+
+
+def test_increments_for_completion_change(make_procedure):
+    before = make_procedure()
+    after = before.model_copy(update={"is_completed": True})
+    increments = progress_increments(added=[after], removed=[before])
+    assert increments == {
+        ("progress", "completed"): 1,
+        ("progress", "byCategory", "行政", "completed"): 1,
+        ("progress", "byPriority", "高", "completed"): 1,
+        ("progress", "byDeadlineType", "引越し後", "completed"): 1,
+    }
+
+
+def test_compute_progress(make_procedure):
+    procedures = [
+        make_procedure("転入届", is_completed=True),
+        make_procedure("印鑑登録", priority=ProcedurePriority.MEDIUM),
+    ]
+    progress = compute_progress(procedures)
+    assert (progress.total, progress.completed) == (2, 1)
+    assert progress.by_priority["中"].total == 1
+    assert progress.by_deadline_type[DeadlineType.AFTER_MOVE.value].completed == 1
+    assert compute_progress([]).total == 0
+
+
+async def test_new_sessions_keep_counters(make_session, make_procedure):
+    store = InMemoryFirestoreService()
+    service = SessionService(store, cache=SessionCache())
+    session = await service.create_session(
+        CreateSessionRequest(
+            move_from=Location(prefecture="東京都", city="渋谷区"),
+            move_to=Location(prefecture="神奈川県", city="横浜市"),
+            move_date=make_session().move_date,
+        )
+    )
+    await service.add_procedures(session.session_id, [make_procedure()])
+
+    loaded = await service.get_session(session.session_id)
+    assert (loaded.progress.total, loaded.progress.completed) == (1, 0)
+
+
+async def _legacy_session(store, make_session, procedures):
+    """progress のないセッション（集計の導入前に作成）を保存"""
+    legacy = make_session()
+    store._sessions[legacy.session_id] = legacy
+    store._put_procedures(legacy.session_id, procedures)
+    assert "progress" not in (await store.get_session(legacy.session_id)).model_fields_set
+    return legacy
+
+
+async def test_sessions_without_progress_are_backfilled(make_session, make_procedure):
+    store = InMemoryFirestoreService()
+    procedures = [make_procedure("転入届", is_completed=True), make_procedure("印鑑登録")]
+    legacy = await _legacy_session(store, make_session, procedures)
+
+    service = SessionService(store)
+    session = await service.get_session(legacy.session_id)
+    assert (session.progress.total, session.progress.completed) == (2, 1)
+
+    stored = await store.get_session(legacy.session_id)
+    assert "progress" in stored.model_fields_set
+    assert (stored.progress.total, stored.progress.completed) == (2, 1)
+    # 2回目は集計し直さない
+    assert await store.backfill_progress(legacy.session_id) is None
+
+
+async def test_updates_before_backfill_are_not_lost(make_session, make_procedure):
+    store = InMemoryFirestoreService()
+    procedures = [make_procedure("転入届"), make_procedure("印鑑登録")]
+    legacy = await _legacy_session(store, make_session, procedures)
+
+    # 集計のないセッションへの差分は加算しない（部分的な集計を作らない）
+    await store.set_procedure_completion(legacy.session_id, procedures[0].id, True, None)
+    await store.update_session(legacy.session_id, {"status": "interview_completed"})
+    assert "progress" not in (await store.get_session(legacy.session_id)).model_fields_set
+
+    service = SessionService(store)
+    results = await asyncio.gather(
+        service.get_session(legacy.session_id),
+        store.set_procedure_completion(legacy.session_id, procedures[1].id, True, None),
+        service.get_session(legacy.session_id),
+    )
+    assert all(result is not None for result in results)
+    stored = await store.get_session(legacy.session_id)
+    assert (stored.progress.total, stored.progress.completed) == (2, 2)
+
+
+async def test_sqlite_backfill(tmp_path, make_session, make_procedure):
+    store = SQLiteFirestoreService(path=str(tmp_path / "test.db"), pool_size=2)
+    legacy = make_session()
+    await store.save_session(legacy)
+
+    def drop_progress(conn):
+        (data,) = conn.execute("SELECT data FROM sessions").fetchone()
+        data = json.loads(data)
+        del data["progress"]
+        conn.execute("UPDATE sessions SET data = ?", (json.dumps(data),))
+
+    await store.pool.transaction(drop_progress)
+    await store.save_procedures_batch(
+        legacy.session_id, [make_procedure("転入届", is_completed=True), make_procedure()]
+    )
+    assert "progress" not in (await store.get_session(legacy.session_id)).model_fields_set
+
+    session = await SessionService(store).get_session(legacy.session_id)
+    assert (session.progress.total, session.progress.completed) == (2, 1)
+    assert await store.backfill_progress(legacy.session_id) is None
+    await store.close()
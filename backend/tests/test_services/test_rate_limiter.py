@@ -0,0 +1,63 @@
+"""Vertex AI 流量制御のテスト"""
+
+import asyncio
+
+import pytest
+
+from core.config import settings
+from core.exceptions import ServiceOverloadedError
+from services.rate_limiter import AdaptiveConcurrencyLimiter, TokenBucket
+from services.vertex_ai_service import VertexAIService
+from utils.tokens import estimate_tokens
+
+
+async def test_limiter_sheds_when_queue_times_out():
+    limiter = AdaptiveConcurrencyLimiter(name="test", initial_limit=1, max_limit=1)
+    await limiter.acquire(timeout=1.0)
+    with pytest.raises(ServiceOverloadedError):
+        await limiter.acquire(timeout=0.01)
+    await limiter.release()
+    await limiter.acquire(timeout=0.01)
+
+
+async def test_limiter_halves_on_overload():
+    limiter = AdaptiveConcurrencyLimiter(name="test", initial_limit=8, max_limit=8)
+    await limiter.acquire(timeout=1.0)
+    await limiter.release(overloaded=True)
+    assert limiter.limit == 4
+
+
+async def test_token_bucket_refund_is_capped():
+    bucket = TokenBucket(name="test", tokens_per_minute=600)
+    await bucket.acquire(500, timeout=1.0)
+    bucket.refund(500)
+    bucket.refund(500)
+    assert bucket._tokens == pytest.approx(600, abs=1)
+
+
+async def test_tokens_are_refunded_when_limiter_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "VERTEX_AI_QUEUE_TIMEOUT_SECONDS", 0.01)
+    limiter = AdaptiveConcurrencyLimiter(name="test", initial_limit=1, max_limit=1)
+    bucket = TokenBucket(name="test", tokens_per_minute=10_000)
+    service = VertexAIService(limiter=limiter, token_budget=bucket)
+    prompt = "東京都渋谷区から神奈川県横浜市への引越し" * 20
+    assert estimate_tokens(prompt) > 0
+
+    await limiter.acquire(timeout=1.0)
+    with pytest.raises(ServiceOverloadedError):
+        await service._acquire(prompt)
+    assert bucket._tokens == pytest.approx(10_000, abs=5)
+
+
+async def test_tokens_are_refunded_when_cancelled_while_queued():
+    limiter = AdaptiveConcurrencyLimiter(name="test", initial_limit=1, max_limit=1)
+    bucket = TokenBucket(name="test", tokens_per_minute=10_000)
+    service = VertexAIService(limiter=limiter, token_budget=bucket)
+
+    await limiter.acquire(timeout=1.0)
+    task = asyncio.create_task(service._acquire("引越し" * 100))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert bucket._tokens == pytest.approx(10_000, abs=5)
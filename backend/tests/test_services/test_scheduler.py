@@ -0,0 +1,127 @@
+"""手続きのスケジューリングのテスト"""
+
+from datetime import date, datetime
+
+from models.domain import Deadline, DeadlineType
+from services.office_hours import DEFAULT_SCHEDULE
+from services.scheduler import ScheduleOptions, optimize_schedule, schedule_stats
+
+OPTIONS = ScheduleOptions(daily_budget_minutes=240, visit_overhead_minutes=60)
+
+
+def on_move_date():
+    return Deadline(type=DeadlineType.ON_MOVE_DATE, description="引越し当日")
+
+
+def test_dependents_follow_dependencies_across_days(make_procedure):
+    first = make_procedure("転出届", estimated_duration=200)
+    second = make_procedure("転入届", estimated_duration=200, dependencies=[first.id])
+    schedule = optimize_schedule([second, first], date(2026, 10, 19), OPTIONS)
+
+    assert schedule.assignments[second.id] > schedule.assignments[first.id]
+    assert schedule.stats.dependency_violations == 0
+
+
+def test_visits_skip_weekends_holidays_and_year_end(make_procedure):
+    # 2026-09-19〜23 は土日・敬老の日・国民の休日・秋分の日
+    visit = make_procedure(visit_location="新住所の市役所")
+    schedule = optimize_schedule([visit], date(2026, 9, 18), OPTIONS)
+    assert schedule.assignments[visit.id] == date(2026, 9, 24)
+
+    visits = [
+        make_procedure(f"手続き{i}", visit_location=f"窓口{i}", estimated_duration=60)
+        for i in range(10)
+    ]
+    schedule = optimize_schedule(visits, date(2026, 12, 25), OPTIONS)
+    assert all(DEFAULT_SCHEDULE.minutes_on(day) for day in schedule.assignments.values())
+    assert schedule.stats.closed_day_visits == 0
+    assert schedule.stats.late == 0
+
+
+def test_same_office_visits_share_a_trip(make_procedure):
+    procedures = [
+        make_procedure("転入届", visit_location="新住所の市役所"),
+        make_procedure("国民健康保険", visit_location="新住所の市役所"),
+        make_procedure("運転免許証の住所変更", visit_location="警察署"),
+    ]
+    schedule = optimize_schedule(procedures, date(2026, 10, 19), OPTIONS)
+
+    city_hall = {schedule.assignments[p.id] for p in procedures[:2]}
+    assert len(city_hall) == 1
+    assert schedule.stats.office_trips == 2
+
+
+def test_daily_budget_is_respected(make_procedure):
+    procedures = [make_procedure(f"手続き{i}", estimated_duration=100) for i in range(6)]
+    schedule = optimize_schedule(procedures, date(2026, 10, 19), OPTIONS)
+
+    assert schedule.stats.max_daily_minutes <= OPTIONS.daily_budget_minutes
+    assert schedule.stats.days_used == 3
+
+
+def test_deadlines_win_over_daily_budget(make_procedure):
+    # 期限までの開庁日は 10/20・10/21 の2日だけで、1日に1件分しか上限に収まらない
+    procedures = [
+        make_procedure(
+            f"手続き{i}",
+            visit_location=f"窓口{i}",
+            estimated_duration=120,
+            deadline=Deadline(type=DeadlineType.AFTER_MOVE, days_after=2, description=""),
+        )
+        for i in range(6)
+    ]
+    schedule = optimize_schedule(procedures, date(2026, 10, 19), OPTIONS)
+
+    assert schedule.stats.late == 0
+    assert set(schedule.assignments.values()) == {date(2026, 10, 20), date(2026, 10, 21)}
+
+
+def test_late_only_without_an_open_day(make_procedure):
+    # 引越し当日（土曜日）の窓口の手続きは、期限内に開いている日がない
+    visit = make_procedure(visit_location="新住所の市役所", deadline=on_move_date())
+    online = make_procedure(
+        "オンライン手続き", visit_location="オンライン", deadline=on_move_date()
+    )
+    schedule = optimize_schedule([visit, online], date(2026, 10, 24), OPTIONS)
+
+    assert schedule.assignments[visit.id] == date(2026, 10, 26)
+    assert schedule.assignments[online.id] == date(2026, 10, 24)
+    assert schedule.stats.late == 1
+
+
+def test_schedule_stats_counts(make_procedure):
+    online = make_procedure("オンライン手続き", visit_location="オンライン")
+    weekend = make_procedure("転入届", visit_location="新住所の市役所")
+    dependent = make_procedure(
+        "印鑑登録", visit_location="新住所の市役所", dependencies=[online.id]
+    )
+    assignments = {
+        weekend.id: date(2026, 10, 24),  # 土曜日
+        dependent.id: date(2026, 10, 20),  # 依存先より前
+        online.id: date(2026, 11, 30),  # 期限（11/2）後
+    }
+    stats = schedule_stats(
+        [online, weekend, dependent], assignments, date(2026, 10, 19), OPTIONS
+    )
+
+    assert stats.procedures == 3
+    assert stats.days_used == 3
+    assert stats.office_trips == 2
+    assert stats.late == 1
+    assert stats.dependency_violations == 1
+    assert stats.max_daily_minutes == 90
+    assert stats.closed_day_visits == 1
+
+
+def test_absolute_deadline_bounds_the_window(make_procedure):
+    procedure = make_procedure(
+        deadline=Deadline(
+            type=DeadlineType.AFTER_MOVE,
+            days_after=14,
+            absolute_date=datetime(2026, 10, 22),
+            description="",
+        ),
+        visit_location="新住所の市役所",
+    )
+    schedule = optimize_schedule([procedure], date(2026, 10, 19), OPTIONS)
+    assert date(2026, 10, 20) <= schedule.assignments[procedure.id] <= date(2026, 10, 22)
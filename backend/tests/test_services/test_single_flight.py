@@ -0,0 +1,79 @@
+"""single-flight のテスト"""
+
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(name="test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.create_task(flight.do("key", fn)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert len(flight) == 1
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["result"] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+async def test_different_keys_run_separately():
+    flight = SingleFlight(name="test")
+
+    async def fn(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(flight.do("a", lambda: fn(1)), flight.do("b", lambda: fn(2)))
+    assert results == [1, 2]
+
+
+async def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight(name="test")
+    calls = 0
+
+    async def fails():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", fails), flight.do("key", fails), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 1
+
+    with pytest.raises(RuntimeError):
+        await flight.do("key", fails)
+    assert calls == 2
+
+
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight(name="test")
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", fn))
+    second = asyncio.create_task(flight.do("key", fn))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,135 @@
+"""SQLite ストレージエンジンのテスト"""
+
+import asyncio
+import threading
+
+import pytest
+
+from models.domain import ProcedureCategory, procedure_order_key
+from services.sqlite_store import ConnectionPool, SQLiteFirestoreService
+
+
+@pytest.fixture
+async def store(tmp_path):
+    store = SQLiteFirestoreService(path=str(tmp_path / "test.db"), pool_size=2)
+    yield store
+    await store.close()
+
+
+async def test_cancelled_call_keeps_connection_until_thread_finishes(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        started.set()
+        release.wait(5)
+        conn.execute("COMMIT")
+        return "slow"
+
+    task = asyncio.create_task(pool.run(slow))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # 唯一の接続はまだスレッドで使用中なので、次の呼び出しは待たされる
+    follower = asyncio.create_task(pool.run(lambda conn: conn.in_transaction))
+    await asyncio.sleep(0.05)
+    assert not follower.done()
+
+    release.set()
+    assert await asyncio.wait_for(follower, 5) is False
+    pool.close()
+
+
+async def test_transaction_rolls_back_on_error(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+
+    def fails(conn):
+        conn.execute(
+            "INSERT INTO offices (key, data, expires_at) VALUES ('k', '{}', '2099-01-01')"
+        )
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await pool.transaction(fails)
+    count = await pool.run(lambda conn: conn.execute("SELECT COUNT(*) FROM offices").fetchone())
+    assert count == (0,)
+    pool.close()
+
+
+async def test_session_round_trip(store, make_session):
+    session = make_session()
+    await store.save_session(session)
+    loaded = await store.get_session(session.session_id)
+    assert loaded.move_to == session.move_to
+    assert await store.get_session_version(session.session_id) == loaded.updated_at
+    assert await store.get_session("missing") is None
+
+
+async def test_query_pages_and_progress(store, make_session, make_procedure):
+    session = make_session()
+    await store.save_session(session)
+    procedures = [
+        make_procedure(f"手続き{i}", category=ProcedureCategory.PRIVATE)
+        if i % 2
+        else make_procedure(f"手続き{i}")
+        for i in range(5)
+    ]
+    await store.save_procedures_batch(session.session_id, procedures)
+
+    first = await store.query_procedure_summaries(session.session_id, limit=2)
+    rest = await store.query_procedure_summaries(
+        session.session_id,
+        start_after=procedure_order_key(first[-1]),
+    )
+    assert len(first) == 2 and len(rest) == 3
+    assert {p.id for p in first + rest} == {p.id for p in procedures}
+
+    private = await store.query_procedure_summaries(session.session_id, category="民間")
+    assert len(private) == 2
+
+    changed = await store.set_procedure_completions(
+        session.session_id, {procedures[0].id: (True, None), procedures[1].id: (False, None)}
+    )
+    assert changed == 1
+    loaded = await store.get_session(session.session_id)
+    assert (loaded.progress.total, loaded.progress.completed) == (5, 1)
+    assert loaded.progress.by_category["民間"].total == 2
+
+
+async def test_completion_patches_current_timeline(store, make_session, make_procedure):
+    session = make_session()
+    await store.save_session(session)
+    procedure = make_procedure()
+    await store.save_procedures_batch(session.session_id, [procedure])
+    version = await store.get_session_version(session.session_id)
+    timeline = {
+        "timeline": [{"procedures": [{"id": procedure.id, "isCompleted": False}]}],
+        "milestones": [],
+    }
+    await store.save_timeline(session.session_id, version, timeline)
+
+    await store.set_procedure_completion(session.session_id, procedure.id, True, None)
+    view = await store.get_timeline(session.session_id)
+    assert view["timeline"]["timeline"][0]["procedures"][0]["isCompleted"] is True
+    # 書き換えたタイムラインはセッションと同じバージョンに進む
+    assert view["version"] == await store.get_session_version(session.session_id)
+
+
+async def test_stale_timeline_is_not_patched(store, make_session, make_procedure):
+    session = make_session()
+    await store.save_session(session)
+    procedure = make_procedure()
+    await store.save_procedures_batch(session.session_id, [procedure])
+    timeline = {
+        "timeline": [{"procedures": [{"id": procedure.id, "isCompleted": False}]}],
+        "milestones": [],
+    }
+    await store.save_timeline(session.session_id, session.created_at, timeline)
+
+    await store.set_procedure_completion(session.session_id, procedure.id, True, None)
+    view = await store.get_timeline(session.session_id)
+    assert view["timeline"]["timeline"][0]["procedures"][0]["isCompleted"] is False
@@ -0,0 +1,122 @@
+"""完了状態の書き込みバッファのテスト"""
+
+import asyncio
+
+import pytest
+
+from services.write_buffer import CompletionWriteBuffer
+
+
+class _FakeStore:
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.writes = []
+
+    async def set_procedure_completions(self, session_id, changes):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("store unavailable")
+        self.writes.append((session_id, dict(changes)))
+        return len(changes)
+
+
+async def wait_until(condition, timeout: float = 2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_updates_are_coalesced_per_session():
+    store = _FakeStore()
+    buffer = CompletionWriteBuffer(store, window_seconds=0.01)
+    buffer.submit("s1", "p1", True, None)
+    buffer.submit("s1", "p2", True, None)
+    buffer.submit("s1", "p1", False, None)
+
+    await wait_until(lambda: store.writes)
+    assert store.writes == [("s1", {"p1": (False, None), "p2": (True, None)})]
+    assert not buffer.has_pending("s1")
+
+
+async def test_overlay_reflects_pending_state(make_procedure):
+    buffer = CompletionWriteBuffer(_FakeStore(), window_seconds=10)
+    procedure = make_procedure()
+    buffer.submit("s1", procedure.id, True, None)
+
+    assert buffer.overlay("s1", procedure).is_completed
+    assert not buffer.overlay("s2", procedure).is_completed
+    assert buffer.overlay("s1", None) is None
+    await buffer.close()
+
+
+async def test_failed_write_is_retried_with_backoff():
+    store = _FakeStore(failures=2)
+    buffer = CompletionWriteBuffer(store, window_seconds=0.01)
+    buffer.submit("s1", "p1", True, None)
+
+    await wait_until(lambda: store.writes)
+    assert store.writes == [("s1", {"p1": (True, None)})]
+    assert not buffer.has_pending("s1")
+
+
+async def test_failed_flush_keeps_newer_updates():
+    store = _FakeStore(failures=1, delay=0.05)
+    buffer = CompletionWriteBuffer(store, window_seconds=10)
+    buffer.submit("s1", "p1", True, None)
+
+    flush = asyncio.create_task(buffer.flush("s1"))
+    await asyncio.sleep(0.01)
+    buffer.submit("s1", "p1", False, None)
+    with pytest.raises(ConnectionError):
+        await flush
+
+    await buffer.flush("s1")
+    assert store.writes == [("s1", {"p1": (False, None)})]
+    await buffer.close()
+
+
+async def test_cancelled_caller_does_not_drop_updates():
+    store = _FakeStore(delay=0.05)
+    buffer = CompletionWriteBuffer(store, window_seconds=10)
+    buffer.submit("s1", "p1", True, None)
+
+    flush = asyncio.create_task(buffer.flush("s1"))
+    await asyncio.sleep(0.01)
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+
+    await wait_until(lambda: store.writes)
+    assert store.writes == [("s1", {"p1": (True, None)})]
+    await buffer.close()
+
+
+async def test_cancelled_caller_requeues_failed_write():
+    store = _FakeStore(failures=1, delay=0.05)
+    buffer = CompletionWriteBuffer(store, window_seconds=0.01)
+    buffer.submit("s1", "p1", True, None)
+    await asyncio.sleep(0)
+
+    flush = asyncio.create_task(buffer.flush("s1"))
+    await asyncio.sleep(0.01)
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flush
+
+    await wait_until(lambda: store.writes)
+    assert store.writes == [("s1", {"p1": (True, None)})]
+    await buffer.close()
+
+
+async def test_close_flushes_everything():
+    store = _FakeStore()
+    buffer = CompletionWriteBuffer(store, window_seconds=10)
+    buffer.submit("s1", "p1", True, None)
+    buffer.submit("s2", "p1", True, None)
+
+    await buffer.close()
+    assert sorted(session_id for session_id, _ in store.writes) == ["s1", "s2"]
@@ -0,0 +1,70 @@
+"""開庁日カレンダーのテスト"""
+
+from datetime import date
+
+import pytest
+
+from utils.business_calendar import (
+    business_days_between,
+    is_business_day,
+    is_holiday,
+    japanese_holidays,
+    next_business_day,
+    next_business_days,
+    previous_business_day,
+)
+
+
+@pytest.mark.parametrize(
+    ("day", "name"),
+    [
+        (date(2019, 4, 30), "国民の休日"),
+        (date(2019, 5, 1), "即位の日"),
+        (date(2019, 5, 6), "振替休日"),
+        (date(2019, 10, 14), "体育の日"),
+        (date(2021, 7, 22), "海の日"),
+        (date(2024, 2, 12), "振替休日"),
+        (date(2025, 3, 20), "春分の日"),
+        (date(2026, 9, 22), "国民の休日"),
+        (date(2026, 9, 23), "秋分の日"),
+    ],
+)
+def test_known_holidays(day, name):
+    assert japanese_holidays(day.year)[day] == name
+    assert is_holiday(day)
+    assert not is_business_day(day)
+
+
+def test_weekends_and_year_end_are_closed():
+    assert not is_business_day(date(2026, 10, 17))  # 土曜日
+    assert not is_holiday(date(2026, 10, 17))
+    assert is_holiday(date(2026, 12, 29))
+    assert is_business_day(date(2026, 12, 28))
+    assert is_business_day(date(2027, 1, 4))
+
+
+def test_next_and_previous_business_day():
+    assert next_business_day(date(2026, 12, 29)) == date(2027, 1, 4)
+    assert next_business_day(date(2026, 12, 28)) == date(2026, 12, 28)
+    assert previous_business_day(date(2027, 1, 3)) == date(2026, 12, 28)
+    assert next_business_days([date(2026, 9, 19), date(2026, 12, 31)]) == [
+        date(2026, 9, 24),
+        date(2027, 1, 4),
+    ]
+
+
+def test_business_days_between_across_years():
+    assert business_days_between(date(2026, 12, 28), date(2027, 1, 5)) == 2
+    assert business_days_between(date(2027, 1, 5), date(2026, 12, 28)) == -2
+    assert business_days_between(date(2026, 1, 1), date(2026, 1, 1)) == 0
+
+
+def test_years_out_of_range_fall_back_to_weekends():
+    # 祝日を計算できない年は例外にせず、土日と年末年始だけを閉庁日とする
+    assert japanese_holidays(2100) == {}
+    assert is_business_day(date(2100, 2, 11))
+    assert not is_holiday(date(2100, 2, 11))
+    assert not is_business_day(date(2100, 1, 1))
+    assert next_business_day(date(2099, 12, 29)) == date(2100, 1, 4)
+    assert previous_business_day(date(2100, 1, 3)) == date(2099, 12, 28)
+    assert business_days_between(date(2006, 12, 25), date(2007, 1, 5)) == 5
@@ -0,0 +1,51 @@
+"""期限計算のテスト"""
+
+from datetime import datetime
+
+from models.domain import Deadline, DeadlineType
+from utils.date_utils import calculate_deadline, calculate_deadlines, fill_deadline_dates
+
+MOVE_DATE = datetime(2026, 12, 25, 10, 0)  # 金曜日
+
+
+def test_after_move_moves_to_next_business_day():
+    assert calculate_deadline(MOVE_DATE, DeadlineType.AFTER_MOVE, 14) == datetime(2027, 1, 8, 10)
+    # 1/1 は年末年始の閉庁日なので 1/4 まで延びる
+    assert calculate_deadline(MOVE_DATE, DeadlineType.AFTER_MOVE, 7) == datetime(2027, 1, 4, 10)
+
+
+def test_before_move_and_move_date():
+    assert calculate_deadline(MOVE_DATE, DeadlineType.BEFORE_MOVE) == datetime(2026, 12, 24, 10)
+    assert calculate_deadline(MOVE_DATE, DeadlineType.ON_MOVE_DATE) == MOVE_DATE
+
+
+def test_batch_matches_single():
+    deadlines = [
+        (DeadlineType.AFTER_MOVE, 14),
+        (DeadlineType.BEFORE_MOVE, None),
+        (DeadlineType.AFTER_MOVE, 7),
+        (DeadlineType.AFTER_MOVE, 14),
+        (DeadlineType.ON_MOVE_DATE, None),
+    ]
+    assert calculate_deadlines(MOVE_DATE, deadlines) == [
+        calculate_deadline(MOVE_DATE, *d) for d in deadlines
+    ]
+
+
+def test_years_out_of_range_do_not_raise():
+    move_date = datetime(2099, 12, 25)
+    assert calculate_deadline(move_date, DeadlineType.AFTER_MOVE, 14) == datetime(2100, 1, 8)
+
+
+def test_fill_deadline_dates_skips_open_ended():
+    filled = Deadline(type=DeadlineType.AFTER_MOVE, days_after=14, description="")
+    before = Deadline(type=DeadlineType.BEFORE_MOVE, description="")
+    open_ended = Deadline(type=DeadlineType.AFTER_MOVE, description="")
+    preset = Deadline(
+        type=DeadlineType.ON_MOVE_DATE, absolute_date=datetime(2026, 1, 1), description=""
+    )
+    fill_deadline_dates(MOVE_DATE, [filled, before, open_ended, preset])
+    assert filled.absolute_date == datetime(2027, 1, 8, 10)
+    assert before.absolute_date is None
+    assert open_ended.absolute_date is None
+    assert preset.absolute_date == datetime(2026, 1, 1)
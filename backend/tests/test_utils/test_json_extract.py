@@ -0,0 +1,38 @@
+"""LLM 出力からの JSON 抽出のテスト"""
+
+from utils.json_extract import ExtractStatus, extract_json, strip_code_fences
+
+
+def test_plain_json():
+    assert extract_json('{"a": 1}') == ({"a": 1}, ExtractStatus.OK)
+
+
+def test_code_fence_without_closing_fence():
+    assert strip_code_fences('```json\n[1, 2]') == "[1, 2]"
+    assert extract_json('```json\n[{"a": 1}]\n```') == ([{"a": 1}], ExtractStatus.OK)
+
+
+def test_prose_around_json():
+    text = '以下の通りです。\n{"title": "転出届", "note": "} や ] を含む"}\nご確認ください。'
+    assert extract_json(text) == (
+        {"title": "転出届", "note": "} や ] を含む"},
+        ExtractStatus.OK,
+    )
+
+
+def test_brackets_in_prose_are_skipped():
+    text = 'Here are [20] items: [{"id": 1}, {"id": 2}]'
+    assert extract_json(text) == ([{"id": 1}, {"id": 2}], ExtractStatus.OK)
+
+
+def test_truncated_array_is_recovered():
+    text = '[{"id": 1}, {"id": 2}, {"id": 3, "title": "途中で切'
+    assert extract_json(text) == ([{"id": 1}, {"id": 2}], ExtractStatus.RECOVERED)
+
+
+def test_truncated_object_fails():
+    assert extract_json('{"id": 1, "title": "途中') == (None, ExtractStatus.FAILED)
+
+
+def test_no_json():
+    assert extract_json("申し訳ありません。") == (None, ExtractStatus.FAILED)
@@ -0,0 +1,52 @@
+"""ストリーミング JSON パーサーのテスト"""
+
+from utils.json_stream import JSONArrayStreamParser
+
+
+def feed_all(chunks):
+    parser = JSONArrayStreamParser()
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items, parser
+
+
+def test_items_are_returned_as_they_close():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"id": 1}, {"id"') == [{"id": 1}]
+    assert parser.feed(': 2}]') == [{"id": 2}]
+    assert parser.finished
+
+
+def test_single_character_chunks():
+    text = '```json\n[{"title": "転出届", "tags": ["a", "]"]}, {"title": "\\"x\\""}]\n```'
+    items, parser = feed_all(text)
+    assert items == [{"title": "転出届", "tags": ["a", "]"]}, {"title": '"x"'}]
+    assert parser.finished
+
+
+def test_brackets_in_preamble_are_ignored():
+    items, parser = feed_all(['Here are [20] items:\n', '[{"id": 1}, {"id": 2}]'])
+    assert items == [{"id": 1}, {"id": 2}]
+    assert parser.finished
+
+
+def test_preamble_bracket_split_across_chunks():
+    items, _ = feed_all(["手続き [", "全", "件] です\n[", "\n  ", '{"id": 1}]'])
+    assert items == [{"id": 1}]
+
+
+def test_empty_array_after_preamble():
+    items, parser = feed_all(["結果 [なし]: [ ]"])
+    assert items == []
+    assert parser.finished
+
+
+def test_malformed_element_is_skipped():
+    items, _ = feed_all(['[{"id": 1,}, {"id": 2}]'])
+    assert items == [{"id": 2}]
+
+
+def test_text_after_array_is_ignored():
+    items, _ = feed_all(['[{"id": 1}] 以上です [{"id": 2}]'])
+    assert items == [{"id": 1}]